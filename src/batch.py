@@ -0,0 +1,145 @@
+"""
+Solves many puzzles at once, spread over a pool of worker processes.
+
+Puzzles are read in the text format of :meth:`Board.load`, from files, directories of
+``*.txt`` files, glob patterns or standard input (``-``). A file may hold several
+puzzles one after another, and is read a puzzle at a time. Binary corpora written by
+:mod:`corpus` (``*.ddc``) are read too. One JSON object is written per line for each puzzle as soon
+as it is done, so results come out in the order they finish, not the order they went in::
+
+    python src/batch.py tests/testdata --workers 8 --timeout 5 > results.jsonl
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Iterable, Iterator, TextIO
+
+from board import Board
+from corpus import CORPUS_SUFFIX, Corpus, iter_puzzles, split_puzzles
+from errors import NoSolutionError
+from search import SearchLimitError
+from solver import Solver
+
+
+def _read_puzzles(source: str, puzzles: Iterator[str]) -> Iterator[tuple[str, str]]:
+    first = next(puzzles, None)
+    second = next(puzzles, None)
+    if first is None:
+        return
+    if second is None:
+        yield source, first
+        return
+    yield f"{source}:0", first
+    yield f"{source}:1", second
+    for i, maze in enumerate(puzzles, start=2):
+        yield f"{source}:{i}", maze
+
+
+def read_inputs(inputs: Iterable[str], stdin: TextIO = None) -> Iterator[tuple[str, str]]:
+    """
+    Yields (source, maze) for every puzzle named by ``inputs``, which may be files,
+    directories, glob patterns, or ``-`` for standard input.
+    """
+    for name in inputs:
+        if name == "-":
+            yield from _read_puzzles("<stdin>", iter_puzzles(stdin or sys.stdin))
+            continue
+        if os.path.isdir(name):
+            paths = sorted(glob.glob(os.path.join(name, "*.txt")))
+        elif glob.has_magic(name):
+            paths = sorted(glob.glob(name, recursive=True))
+        else:
+            paths = [name]
+        for path in paths:
+            if path.endswith(CORPUS_SUFFIX):
+                with Corpus(path) as corpus:
+                    for i, maze in enumerate(corpus):
+                        yield f"{path}:{i}", maze
+                continue
+            with open(path, "r") as f:
+                yield from _read_puzzles(path, iter_puzzles(f))
+
+
+def _rows(board: Board) -> list[str]:
+    return [" ".join(str(c) for c in board.get_row(r)) for r in range(board.height)]
+
+
+def solve_puzzle(source: str, maze: str, timeout: float = None) -> dict:
+    """
+    Solves one puzzle and describes the outcome. Runs in a worker process.
+
+    :param timeout: Seconds to spend on the puzzle before giving up on it. A puzzle that
+        times out is given as far as it was deduced, as ``partial``, with ``?`` for the
+        cells still unknown.
+    """
+    result = {"source": source, "comment": None, "status": None, "solution": None}
+    start = time.perf_counter()
+    deadline = time.monotonic() + timeout if timeout else None
+    try:
+        solver = Solver(maze)
+        result["comment"] = solver.board.comment
+        board = solver.solve(deadline=deadline)
+        result["status"] = "solved"
+        result["solution"] = _rows(board)
+    except NoSolutionError:
+        result["status"] = "no_solution"
+    except SearchLimitError as e:
+        if e.reason == "deadline":
+            result["status"] = "timeout"
+            result["partial"] = _rows(e.board)
+        else:
+            result["status"] = "gave_up"
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 6)
+    return result
+
+
+def solve_all(puzzles: Iterable[tuple[str, str]], *, workers: int = None,
+              timeout: float = None) -> Iterator[dict]:
+    """
+    Solves puzzles across a process pool, yielding each result as it completes. Only
+    a few puzzles per worker are handed out at a time, so a long input stream is never
+    read in all at once.
+    """
+    workers = workers or os.cpu_count() or 1
+    puzzles = iter(puzzles)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: set[Future] = set()
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < workers * 4:
+                try:
+                    source, maze = next(puzzles)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(executor.submit(solve_puzzle, source, maze, timeout))
+            if not pending:
+                return
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Solve Dungeons and Diagrams puzzles in bulk.")
+    parser.add_argument("inputs", nargs="+", help="puzzle files, directories, glob patterns, or - for stdin")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="seconds allowed per puzzle")
+    args = parser.parse_args(argv)
+
+    for result in solve_all(read_inputs(args.inputs), workers=args.workers, timeout=args.timeout):
+        sys.stdout.write(json.dumps(result) + "\n")
+        sys.stdout.flush()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Checks many boards against the rules at once, with NumPy.
+
+Boards are given as an (N, H, W) integer array of :class:`CellType` values, with their
+row counts as (N, H) and column counts as (N, W), or (H,) and (W,) when every board is
+for the same puzzle. Each board gets the same verdict and reason code as
+:meth:`Board.validate`, but the checks run over every board together: wall counts are
+sums along an axis, the dead end and monster checks count neighbors by shifting the
+whole array, and connectivity flood fills every board at once, a step in each direction
+at a time, until nothing changes. Boards can be at most :data:`MAX_WIDTH` cells wide.
+
+NumPy is optional, and only needed for this module::
+
+    pip install dungeons-and-diagrams-solver[fast]
+"""
+from typing import Iterable
+
+from board import Board
+from cell import CellType
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MAX_WIDTH = 64
+"""Each row of a board is held in a 64-bit integer while checking connectivity."""
+
+
+def _require_numpy() -> None:
+    if np is None:
+        raise ImportError("Batch validation needs NumPy: pip install dungeons-and-diagrams-solver[fast]")
+
+
+def board_arrays(boards: Iterable[Board]) -> tuple["np.ndarray", "np.ndarray", "np.ndarray"]:
+    """
+    Packs boards of the same size into arrays for :func:`validate_boards`.
+
+    :return: The cells, the row counts and the column counts
+    """
+    _require_numpy()
+    boards = list(boards)
+    cells = np.array([[[cell.contents.value for cell in board.get_row(r)] for r in range(board.height)]
+                      for board in boards], dtype=np.int8)
+    rows = np.array([board.wall_counts_rows for board in boards], dtype=np.int16)
+    columns = np.array([board.wall_counts_columns for board in boards], dtype=np.int16)
+    return cells, rows, columns
+
+
+def _neighbor_counts(mask: "np.ndarray") -> "np.ndarray":
+    """
+    For every cell, how many of its orthogonal neighbors are set in ``mask``.
+    """
+    m = mask.astype(np.int8)
+    counts = np.zeros_like(m)
+    counts[:, 1:, :] += m[:, :-1, :]
+    counts[:, :-1, :] += m[:, 1:, :]
+    counts[:, :, 1:] += m[:, :, :-1]
+    counts[:, :, :-1] += m[:, :, 1:]
+    return counts
+
+
+def _first_index(mask: "np.ndarray") -> "np.ndarray":
+    """
+    The flat index of the first cell set in each board's mask, or past the end if none.
+    """
+    flat = mask.reshape(len(mask), mask.shape[1] * mask.shape[2])
+    return np.where(flat.any(axis=1), flat.argmax(axis=1), flat.shape[1])
+
+
+def _connected(is_open: "np.ndarray") -> "np.ndarray":
+    """
+    Whether all the open cells of each board are reachable from each other. Every
+    board is flood filled at once from its first open cell, with each row held as the
+    bits of one integer, so a step in all four directions is a few shifts.
+    """
+    n, height, width = is_open.shape
+    if width > MAX_WIDTH:
+        raise ValueError(f"Boards can be at most {MAX_WIDTH} cells wide")
+    bits = np.left_shift(np.uint64(1), np.arange(width, dtype=np.uint64))
+    open_rows = (is_open * bits).sum(axis=2, dtype=np.uint64)
+    full = np.uint64((1 << width) - 1)
+    one = np.uint64(1)
+
+    first = is_open.reshape(n, height * width).argmax(axis=1)
+    reached = np.zeros_like(open_rows)
+    reached[np.arange(n), first // width] = bits[first % width]
+    reached &= open_rows
+    # Boards drop out as soon as their fill stops growing
+    active = np.arange(n)
+    current, current_open = reached, open_rows
+    while active.size:
+        spread = current | ((current << one) & full) | (current >> one)
+        spread[:, 1:] |= current[:, :-1]
+        spread[:, :-1] |= current[:, 1:]
+        spread &= current_open
+        growing = (spread != current).any(axis=1)
+        reached[active] = spread
+        active = active[growing]
+        current, current_open = spread[growing], current_open[growing]
+    return (reached == open_rows).all(axis=1)
+
+
+def validate_boards(cells, rows, columns) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    Checks every board against the rules, as far as they can be checked with the cells
+    resolved so far. Unknown cells could still be walls.
+
+    :param cells: (N, H, W) array of :class:`CellType` values.
+    :param rows: Row wall counts, (N, H), or (H,) for the same counts on every board.
+    :param columns: Column wall counts, (N, W), or (W,) for every board.
+    :return: Whether each board is valid, and the code for the first rule it breaks,
+        as from :meth:`Board.validate`, or an empty string if none
+    """
+    _require_numpy()
+    cells = np.asarray(cells)
+    n, height, width = cells.shape
+    rows = np.broadcast_to(np.asarray(rows), (n, height))
+    columns = np.broadcast_to(np.asarray(columns), (n, width))
+
+    walls = cells == CellType.WALL.value
+    unknown = cells == CellType.UNKNOWN.value
+    floors = cells == CellType.FLOOR.value
+    monsters = cells == CellType.MONSTER.value
+
+    wall_count_broken = np.zeros(n, dtype=bool)
+    for axis, counts in ((2, rows), (1, columns)):
+        placed = walls.sum(axis=axis)
+        placeable = unknown.sum(axis=axis)
+        wall_count_broken |= ((placed > counts) | (placed + placeable < counts)).any(axis=1)
+
+    neighbors = _neighbor_counts(np.ones((1, height, width), dtype=bool))
+    walls_around = _neighbor_counts(walls)
+    floors_around = _neighbor_counts(floors)
+    unknown_around = _neighbor_counts(unknown)
+    dead_end = floors & (walls_around >= neighbors - 1)
+    monster_stuck = monsters & ((floors_around > 1) | ((floors_around == 0) & (unknown_around == 0)))
+    # The board reports whichever comes first in reading order
+    first_dead_end = _first_index(dead_end)
+    first_monster = _first_index(monster_stuck)
+
+    cell_broken = np.minimum(first_dead_end, first_monster) < height * width
+
+    # Connectivity is the slowest check, and only decides boards that pass the others
+    reasons = np.full(n, "", dtype="<U3")
+    unsettled = ~(wall_count_broken | cell_broken)
+    reasons[np.flatnonzero(unsettled)[~_connected(~walls[unsettled])]] = "nc"
+    reasons[cell_broken] = np.where(first_dead_end < first_monster, "dnm", "mnd")[cell_broken]
+    reasons[wall_count_broken] = "wcc"
+    return reasons == "", reasons
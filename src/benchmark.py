@@ -0,0 +1,168 @@
+"""
+Times the solver on a set of puzzles, and checks for regressions against a baseline.
+
+For every puzzle the wall time, search nodes and backtracks are recorded, along with
+how often each rule was checked, how many cells it resolved and how long it took.
+Results can be saved as a JSON baseline, and later runs compared against it::
+
+    python src/benchmark.py tests/testdata/input_*.txt --save benchmark.json
+    python src/benchmark.py tests/testdata/input_*.txt --baseline benchmark.json
+
+A run regresses when a puzzle gets slower than ``--threshold`` times its baseline, or
+needs more search nodes than that, or stops being solved. The exit status is 1 if any
+puzzle regressed.
+"""
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from typing import Iterable
+
+from batch import read_inputs
+from errors import NoSolutionError
+from instrumentation import CountingObserver
+from search import SearchLimitError
+from solver import BACKENDS, Solver
+
+DEFAULT_THRESHOLD = 1.5
+NOISE_SECONDS = 0.005
+"""Slowdowns smaller than this are put down to timer noise."""
+
+
+def _solve(maze: str, backend: str, **kwargs) -> tuple[str, Solver]:
+    solver = Solver(maze, **kwargs)
+    try:
+        solver.solve(backend=backend)
+        return "solved", solver
+    except NoSolutionError:
+        return "no_solution", solver
+    except SearchLimitError:
+        return "gave_up", solver
+
+
+def benchmark_puzzle(source: str, maze: str, *, repeat: int = 3, max_nodes: int = None,
+                     backend: str = "native") -> dict:
+    """
+    Benchmarks one puzzle. The wall time is the best of ``repeat`` solves without an
+    observer, so the timing isn't skewed by the rule counting, which is done in one
+    extra solve. With the SAT backend, the nodes are the SAT solver's conflicts.
+
+    :raises ValueError: if ``repeat`` is less than 1
+    """
+    if repeat < 1:
+        raise ValueError(f"repeat must be at least 1, not {repeat}")
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        status, solver = _solve(maze, backend, max_nodes=max_nodes)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    observer = CountingObserver()
+    _solve(maze, backend, max_nodes=max_nodes, observer=observer)
+    return {
+        "source": source,
+        "status": status,
+        "seconds": round(best, 6),
+        "nodes": solver.engine.nodes,
+        "backtracks": solver.engine.backtracks,
+        "rules": {name: asdict(counter) for name, counter in sorted(observer.rules.items())},
+    }
+
+
+def run_benchmarks(puzzles: Iterable[tuple[str, str]], **kwargs) -> list[dict]:
+    return [benchmark_puzzle(source, maze, **kwargs) for source, maze in puzzles]
+
+
+def save_baseline(path: str, results: list[dict]) -> None:
+    with open(path, "w") as f:
+        json.dump({"puzzles": {r["source"]: r for r in results}}, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_baseline(path: str) -> dict[str, dict]:
+    with open(path, "r") as f:
+        return json.load(f)["puzzles"]
+
+
+def find_regressions(results: list[dict], baseline: dict[str, dict], *,
+                     threshold: float = DEFAULT_THRESHOLD) -> list[str]:
+    """
+    Compares results against a baseline. Puzzles missing from the baseline are ignored.
+
+    :return: A description of each regression found
+    """
+    regressions = []
+    for result in results:
+        before = baseline.get(result["source"])
+        if before is None:
+            continue
+        source = result["source"]
+        if before["status"] == "solved" and result["status"] != "solved":
+            regressions.append(f"{source}: was solved, now {result['status']}")
+        if result["seconds"] > before["seconds"] * threshold and \
+                result["seconds"] - before["seconds"] > NOISE_SECONDS:
+            regressions.append(f"{source}: {before['seconds']:.6f}s -> {result['seconds']:.6f}s")
+        if result["nodes"] > max(before["nodes"], 1) * threshold:
+            regressions.append(f"{source}: {before['nodes']} -> {result['nodes']} search nodes")
+    return regressions
+
+
+def format_results(results: list[dict]) -> str:
+    lines = [f"{'puzzle':<40} {'status':<12} {'seconds':>10} {'nodes':>7} {'backtracks':>10}"]
+    for r in results:
+        lines.append(f"{r['source']:<40} {r['status']:<12} {r['seconds']:>10.6f} {r['nodes']:>7} {r['backtracks']:>10}")
+
+    totals = {}
+    for r in results:
+        for name, counter in r["rules"].items():
+            total = totals.setdefault(name, {"checks": 0, "fires": 0, "cells": 0, "seconds": 0.0})
+            for key in total:
+                total[key] += counter[key]
+    lines.append("")
+    lines.append(f"{'rule':<40} {'checks':>10} {'fires':>7} {'cells':>10} {'seconds':>10}")
+    for name, total in sorted(totals.items()):
+        lines.append(f"{name:<40} {total['checks']:>10} {total['fires']:>7} {total['cells']:>10} {total['seconds']:>10.6f}")
+    return "\n".join(lines)
+
+
+def _at_least_one(value: str) -> int:
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, not {number}")
+    return number
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the solver, and check for regressions.")
+    parser.add_argument("inputs", nargs="+", help="puzzle files, directories, glob patterns, or - for stdin")
+    parser.add_argument("-r", "--repeat", type=_at_least_one, default=3, help="solves per puzzle to take the best time of")
+    parser.add_argument("--max-nodes", type=int, default=None, help="give up on a puzzle after this many guesses")
+    parser.add_argument("-b", "--backend", choices=BACKENDS, default="native", help="how to solve each puzzle")
+    parser.add_argument("--save", metavar="PATH", help="write the results as a new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="compare the results against this baseline")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"how many times worse than the baseline counts as a regression (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(read_inputs(args.inputs), repeat=args.repeat, max_nodes=args.max_nodes,
+                             backend=args.backend)
+    print(format_results(results))
+
+    if args.save:
+        save_baseline(args.save, results)
+
+    if args.baseline:
+        regressions = find_regressions(results, load_baseline(args.baseline), threshold=args.threshold)
+        if regressions:
+            print()
+            print("Regressions:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
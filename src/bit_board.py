@@ -0,0 +1,327 @@
+from typing import Iterator, Optional
+
+from board import Board
+from cell import CellType
+from connectivity import Connectivity
+from errors import NoCandidatesError
+from trail import Trail
+from zobrist import ZobristKeys, zobrist_keys
+
+CANDIDATE_TYPES = (CellType.FLOOR, CellType.WALL, CellType.MONSTER, CellType.CHEST)
+
+TYPE_CODES = {t: 1 << i for i, t in enumerate(CANDIDATE_TYPES)}
+"""The bit each candidate sets in a cell's code."""
+
+CODE_CANDIDATES = tuple(frozenset(t for t in CANDIDATE_TYPES if code & TYPE_CODES[t]) for code in range(16))
+CODE_CONTENTS = tuple(next(iter(c)) if len(c) == 1 else CellType.UNKNOWN for c in CODE_CANDIDATES)
+
+
+class BitCell:
+    """
+    A view onto one tile of a :class:`BitBoard`. Behaves like a :class:`Cell`, but
+    reads and writes the board's bitmasks rather than holding any state itself.
+    """
+
+    def __init__(self, board: "BitBoard", index: int):
+        self.board = board
+        self.index = index
+        self.bit = 1 << index
+
+    @property
+    def candidates(self) -> frozenset[CellType]:
+        return CODE_CANDIDATES[self.board.codes[self.index]]
+
+    @property
+    def resolved(self) -> bool:
+        return not self.board.unknowns & self.bit
+
+    @property
+    def contents(self) -> CellType:
+        return CODE_CONTENTS[self.board.codes[self.index]]
+
+    def resolve(self, cell_type: CellType) -> None:
+        """
+        Marks the cell as only containing the particular cell type.
+        :param cell_type: The cell type to set this cell to.
+        """
+        if cell_type == CellType.UNKNOWN:
+            raise ValueError("Cannot resolve cell to unknown.")
+        self.board.set_code(self.index, TYPE_CODES[cell_type])
+
+    def eliminate(self, cell_type: CellType) -> None:
+        """
+        Removes from the possible candidates of what this cell could be.
+        :param cell_type: The type to remove.
+        """
+        code = self.board.codes[self.index]
+        remaining = code & ~TYPE_CODES[cell_type]
+        if remaining != code:
+            self.board.set_code(self.index, remaining)
+        if not remaining:
+            raise NoCandidatesError()
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, BitCell) and other.board is self.board and other.index == self.index
+
+    def __hash__(self) -> int:
+        return hash((id(self.board), self.index))
+
+    def __str__(self) -> str:
+        if not self.resolved:
+            return "?"
+        match self.contents:
+            case CellType.WALL: return "#"
+            case CellType.FLOOR: return "_"
+            case CellType.MONSTER: return "m"
+            case CellType.CHEST: return "c"
+
+    def __repr__(self) -> str:
+        return f"{self.__str__()}"
+
+
+class BitBoard(Board):
+    """
+    A :class:`Board` that stores its tiles as integer bitmasks, one bit per cell,
+    with bit ``row * width + column`` standing for the cell at that position.
+
+    For every :class:`CellType` a cell could still be, ``candidate_masks`` has the
+    cell's bit set, and ``unknowns`` has the bits of the cells that are not resolved
+    yet. Each cell's candidates are also kept as a small code in ``codes``, one bit per
+    :data:`CANDIDATE_TYPES`, so that reading a single cell doesn't touch the masks.
+    Cells handed out by :meth:`get_cell` are :class:`BitCell` views onto the board,
+    so rules written against :class:`Board` run unchanged, while whole-board checks
+    are done with shifts and masks.
+    """
+    candidate_masks: dict[CellType, int]
+    unknowns: int
+    codes: bytearray
+    full_mask: int
+    keys: tuple[ZobristKeys, ...]
+
+    def __init__(self):
+        self.height = 0
+        self.width = 0
+        self.wall_counts_rows = []
+        self.wall_counts_columns = []
+        self.comment = ""
+        self.candidate_masks = {t: 0 for t in CANDIDATE_TYPES}
+        self.unknowns = 0
+        self.codes = bytearray()
+        self.full_mask = 0
+        self.keys = ()
+        self.trail = Trail()
+        self.connectivity = Connectivity()
+        self._cells = []
+        self._row_masks = []
+        self._column_masks = []
+        self._neighbor_masks = []
+
+    def load(self, maze: str) -> None:
+        board = Board()
+        board.load(maze)
+
+        self.source = maze
+        self.height = board.height
+        self.width = board.width
+        self.wall_counts_rows = board.wall_counts_rows
+        self.wall_counts_columns = board.wall_counts_columns
+        self.comment = board.comment
+        self.full_mask = (1 << (self.width * self.height)) - 1
+        self.connectivity = Connectivity(self.width, self.height)
+        self._cells = [BitCell(self, index) for index in range(self.width * self.height)]
+        self._row_masks = [((1 << self.width) - 1) << (r * self.width) for r in range(self.height)]
+        self._column_masks = [sum(1 << (r * self.width + c) for r in range(self.height)) for c in range(self.width)]
+        self._neighbor_masks = [self.spread(1 << index) for index in range(self.width * self.height)]
+
+        self.candidate_masks = {t: 0 for t in CANDIDATE_TYPES}
+        self.unknowns = 0
+        self.codes = bytearray(self.width * self.height)
+        for index, cell in enumerate(board.enumerate_cells()):
+            for t in cell.candidates:
+                self.candidate_masks[t] |= 1 << index
+                self.codes[index] |= TYPE_CODES[t]
+            if not cell.resolved:
+                self.unknowns |= 1 << index
+        self.keys = zobrist_keys(self.width * self.height)
+        self.trail = Trail()
+        self.trail.zobrist = board.trail.zobrist
+
+    def set_code(self, index: int, code: int) -> None:
+        """
+        Changes the candidates of the cell at ``index`` to those in ``code``, recording
+        the old ones on the trail.
+        """
+        old = self.codes[index]
+        if code == old:
+            return
+        self.trail.push(self, (index, old))
+        keys = self.keys[index]
+        for t in CANDIDATE_TYPES:
+            if (code ^ old) & TYPE_CODES[t]:
+                self.trail.zobrist ^= keys[t]
+        self._write(index, code)
+
+    def _write(self, index: int, code: int) -> None:
+        changed = code ^ self.codes[index]
+        bit = 1 << index
+        for t in CANDIDATE_TYPES:
+            if changed & TYPE_CODES[t]:
+                self.candidate_masks[t] ^= bit
+        self.codes[index] = code
+        if code & (code - 1):
+            self.unknowns |= bit
+        else:
+            self.unknowns &= ~bit
+
+    def undo(self, state) -> None:
+        self._write(*state)
+
+    def changes_since(self, checkpoint: int) -> set[tuple[int, int]]:
+        return {divmod(index, self.width) for _, (index, _) in self.trail.entries[checkpoint:]}
+
+    def entry_position(self, entry: int) -> tuple[int, int]:
+        return divmod(self.trail.entries[entry][1][0], self.width)
+
+    @property
+    def cells(self) -> list[list[BitCell]]:
+        return [self.get_row(r) for r in range(self.height)]
+
+    def get_cell(self, *, column: int, row: int) -> BitCell:
+        return self._cells[row * self.width + column]
+
+    def enumerate_cells(self) -> Iterator[BitCell]:
+        return iter(self._cells)
+
+    def get_row(self, row: int) -> list[BitCell]:
+        return self._cells[row * self.width:(row + 1) * self.width]
+
+    def get_column(self, column: int) -> list[BitCell]:
+        return self._cells[column::self.width]
+
+    def get_neighbors(self, *, column, row) -> list[BitCell]:
+        neighbors = []
+        index = row * self.width + column
+        if row > 0:  # Up
+            neighbors.append(self._cells[index - self.width])
+        if row < self.height - 1:  # Down
+            neighbors.append(self._cells[index + self.width])
+        if column > 0:  # Left
+            neighbors.append(self._cells[index - 1])
+        if column < self.width - 1:  # Right
+            neighbors.append(self._cells[index + 1])
+        return neighbors
+
+    def count_wall_neighbors(self, *, column, row) -> tuple[int, int]:
+        neighbors = self._neighbor_masks[row * self.width + column]
+        return (neighbors & self.walls).bit_count(), neighbors.bit_count()
+
+    def row_mask(self, row: int) -> int:
+        return self._row_masks[row]
+
+    def column_mask(self, column: int) -> int:
+        return self._column_masks[column]
+
+    def line_bits(self, mask: int, *, row: int = None, column: int = None) -> int:
+        """
+        The bits of ``mask`` along one row or column, with bit ``i`` standing for the
+        ``i``-th cell of the line, as :mod:`line_solver` numbers them.
+        """
+        if row is not None:
+            return (mask >> (row * self.width)) & ((1 << self.width) - 1)
+        mask >>= column
+        bits = 0
+        for r in range(self.height):
+            if mask & (1 << (r * self.width)):
+                bits |= 1 << r
+        return bits
+
+    def _resolved_as(self, cell_type: CellType) -> int:
+        return self.candidate_masks[cell_type] & ~self.unknowns
+
+    @property
+    def walls(self) -> int:
+        return self._resolved_as(CellType.WALL)
+
+    def wall_mask(self) -> int:
+        return self.walls
+
+    @property
+    def floors(self) -> int:
+        return self._resolved_as(CellType.FLOOR)
+
+    @property
+    def monsters(self) -> int:
+        return self._resolved_as(CellType.MONSTER)
+
+    @property
+    def chests(self) -> int:
+        return self._resolved_as(CellType.CHEST)
+
+    def shift_up(self, mask: int) -> int:
+        """
+        Moves every set bit to the cell above it; bits in the top row fall off.
+        """
+        return mask >> self.width
+
+    def shift_down(self, mask: int) -> int:
+        return (mask << self.width) & self.full_mask
+
+    def shift_left(self, mask: int) -> int:
+        return (mask & ~self._column_masks[0]) >> 1
+
+    def shift_right(self, mask: int) -> int:
+        return (mask & ~self._column_masks[-1]) << 1
+
+    def neighbor_masks(self, mask: int) -> tuple[int, int, int, int]:
+        """
+        For each direction, the cells that have a neighbor from ``mask`` on that side.
+        """
+        return self.shift_down(mask), self.shift_up(mask), self.shift_right(mask), self.shift_left(mask)
+
+    def spread(self, mask: int) -> int:
+        """
+        All cells orthogonally adjacent to at least one cell in ``mask``.
+        """
+        down, up, right, left = self.neighbor_masks(mask)
+        return down | up | right | left
+
+    def at_least_two_neighbors(self, mask: int) -> int:
+        """
+        All cells with two or more orthogonal neighbors in ``mask``.
+        """
+        a, b, c, d = self.neighbor_masks(mask)
+        return (a & b) | (a & c) | (a & d) | (b & c) | (b & d) | (c & d)
+
+    def validate(self) -> Optional[str]:
+        walls = self.walls
+        placeable = self.unknowns & self.candidate_masks[CellType.WALL]
+        for r in range(self.height):
+            row = self.row_mask(r)
+            if (walls & row).bit_count() > self.wall_counts_rows[r] or \
+                    ((walls | placeable) & row).bit_count() < self.wall_counts_rows[r]:
+                return "wcc"
+        for c in range(self.width):
+            column = self.column_mask(c)
+            if (walls & column).bit_count() > self.wall_counts_columns[c] or \
+                    ((walls | placeable) & column).bit_count() < self.wall_counts_columns[c]:
+                return "wcc"
+
+        # Floors need at least two non-wall neighbors, or they are a dead end
+        # with no monster in it
+        non_walls = self.full_mask & ~walls
+        if self.floors & ~self.at_least_two_neighbors(non_walls):
+            return "dnm"
+
+        # Monsters have exactly one floor neighbor, or could still get one
+        floors = self.floors
+        monsters = self.monsters
+        if monsters & self.at_least_two_neighbors(floors):
+            return "mnd"
+        if monsters & ~self.spread(floors | self.unknowns):
+            return "mnd"
+
+        if non_walls:
+            if self._non_walls_reachable() != non_walls.bit_count():
+                return "nc"
+
+        return None
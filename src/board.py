@@ -1,8 +1,11 @@
 import re
-from typing import Iterator
+from typing import Iterator, Optional
 
 from board_vector import BoardVector
 from cell import Cell, CellType
+from connectivity import Connectivity
+from trail import Trail
+from zobrist import zobrist_keys
 
 
 class Board:
@@ -11,6 +14,9 @@ class Board:
     wall_counts_rows: list[int]
     wall_counts_columns: list[int]
     cells: list[list[Cell]]
+    positions: dict[Cell, tuple[int, int]]
+    trail: Trail
+    connectivity: Connectivity
     source: str
     comment: ""
 
@@ -20,6 +26,9 @@ class Board:
         self.wall_counts_rows = []
         self.wall_counts_columns = []
         self.cells = []
+        self.positions = {}
+        self.trail = Trail()
+        self.connectivity = Connectivity()
         self.comment = ""
 
     def load(self, maze: str) -> None:
@@ -32,20 +41,21 @@ class Board:
         self.cells = []
         self.comment = ""
 
+        column_counts = []
         for line in maze.split("\n"):
-            orig_line = line
-            line = re.sub(r'\s', '', line)
+            line = line.strip()
             if not line:
                 continue
             if line.startswith("//"):
-                self.comment = orig_line.strip()[2:].strip()
+                self.comment = line[2:].strip()
                 continue
             if line.startswith("*"):
-                self.wall_counts_columns = [int(c) for c in line[1:]]
+                column_counts = line[1:].split()
             elif line[0] in "0123456789":
-                self.wall_counts_rows.append(int(line[0]))
+                count = re.match(r"\d+", line).group()
+                self.wall_counts_rows.append(int(count))
                 new_row = []
-                for c in line[1:]:
+                for c in "".join(line[len(count):].split()):
                     new_cell = Cell()
                     if c == "m":
                         new_cell.resolve(CellType.MONSTER)
@@ -65,8 +75,24 @@ class Board:
             else:
                 raise ValueError(f"Unexpected input: {line}")
 
+        if len(column_counts) == 1 and self.cells and len(column_counts[0]) == len(self.cells[0]):
+            # Written without spaces, one digit per column
+            column_counts = list(column_counts[0])
+        self.wall_counts_columns = [int(c) for c in column_counts]
         self.width = len(self.wall_counts_columns)
         self.height = len(self.wall_counts_rows)
+        self.connectivity = Connectivity(self.width, self.height)
+
+        # Changes from here on are journaled, so they can be rolled back
+        self.trail = Trail()
+        self.positions = {}
+        keys = zobrist_keys(self.width * self.height)
+        for r, row in enumerate(self.cells):
+            for c, cell in enumerate(row):
+                cell.trail = self.trail
+                cell.keys = keys[r * self.width + c]
+                self.positions[cell] = (r, c)
+        self.trail.zobrist = self.zobrist_hash()
 
     def get_wall_count(self, *, row: int = None, column: int = None) -> int:
         if row is None and column is None:
@@ -92,7 +118,7 @@ class Board:
         output += "├───┼" + "──" * self.width + "─┤\n"
         for r in range(self.height):
             output += f"│ {self.wall_counts_rows[r]} │ "
-            for c in self.cells[r]:
+            for c in self.get_row(r):
                 output += f"{c} "
             output += "│\n"
         output += "└───┴" + "──" * self.width + "─┘\n"
@@ -110,18 +136,19 @@ class Board:
             row[column] for row in self.cells
         ]
 
+    def get_vector(self, *, row: int = None, column: int = None) -> BoardVector:
+        if row is not None:
+            return BoardVector(cells=self.get_row(row), wall_count=self.get_wall_count(row=row), row=row)
+        return BoardVector(cells=self.get_column(column), wall_count=self.get_wall_count(column=column), column=column)
+
     def enumerate_vectors(self) -> Iterator[BoardVector]:
         """
         Enumerate all rows and columns
         """
         for r in range(self.height):
-            row = self.get_row(r)
-            wall_count = self.get_wall_count(row=r)
-            yield BoardVector(cells=row, wall_count=wall_count)
+            yield self.get_vector(row=r)
         for c in range(self.width):
-            col = self.get_column(c)
-            wall_count = self.get_wall_count(column=c)
-            yield BoardVector(cells=col, wall_count=wall_count)
+            yield self.get_vector(column=c)
 
     def get_neighbors(self, *, column, row) -> list[Cell]:
         neighbors = []
@@ -135,13 +162,29 @@ class Board:
             neighbors.append(self.get_cell(column=column + 1, row=row))
         return neighbors
 
+    def count_wall_neighbors(self, *, column, row) -> tuple[int, int]:
+        """
+        How many of a cell's neighbors are walls, and how many neighbors it has.
+        """
+        neighbors = self.get_neighbors(column=column, row=row)
+        return len([n for n in neighbors if n.contents == CellType.WALL]), len(neighbors)
+
     def is_valid(self) -> bool:
+        return self.validate() is None
+
+    def validate(self) -> Optional[str]:
+        """
+        Checks the board against the rules, as far as they can be checked with the cells
+        resolved so far.
+
+        :return: None if the board is valid, otherwise a code for the first rule broken:
+            ``wcc`` (wall count), ``dnm`` (dead end with no monster), ``mnd`` (monster
+            not in a dead end) or ``nc`` (not contiguous)
+        """
         for v in self.enumerate_vectors():
             if v.get_walls_placed() > v.wall_count or v.get_walls_placed() + v.get_walls_placeable() < v.wall_count:
                 # Wall count constraint not satisfied
-                print("INVALID (wcc):")
-                print(self)
-                return False
+                return "wcc"
 
         for r, row in enumerate(self.cells):
             for c, cell in enumerate(row):
@@ -152,23 +195,17 @@ class Board:
 
                     walls_around_cell = len([c for c in neighbors if c.contents == CellType.WALL])
                     if walls_around_cell >= len(neighbors) - 1:
-                        print("INVALID (dnm):")
-                        print(self)
-                        return False
+                        return "dnm"
                 elif cell.contents == CellType.MONSTER:
                     # Ensure monsters have exactly one floor neighbor
                     neighbors = self.get_neighbors(column=c, row=r)
                     floors_around_cell = len([n for n in neighbors if n.contents == CellType.FLOOR])
                     if floors_around_cell > 1:
-                        print("INVALID (mnd):")
-                        print(self)
-                        return False
+                        return "mnd"
                     if floors_around_cell == 0:
                         # If no floor is found, and there's no chance for a floor to be found
                         if all([n.resolved for n in neighbors]):
-                            print("INVALID (mnd):")
-                            print(self)
-                            return False
+                            return "mnd"
 
         # Contiguity check:
         # Number of non-wall spaces should be == the number of spaces
@@ -177,59 +214,66 @@ class Board:
         if non_walls:
             non_walls_reachable = self._non_walls_reachable()
             if non_walls_reachable != len(non_walls):
-                print("INVALID (nc):")
-                print(self)
-                return False
+                return "nc"
 
-        return True
+        return None
 
     def _non_walls_reachable(self) -> int:
-        for r, row in enumerate(self.cells):
-            for c, cell in enumerate(row):
-                if cell.contents != CellType.WALL:
-                    reachable_from = self._non_walls_reachable_from(row=r, column=c, visited=[])
-                    return reachable_from
-        return 0
-
-    def _non_walls_reachable_from(self, *, row, column, visited) -> int:
-        """
-        Calculate the number of non-wall spaces that are reachable from this cell,
-        including the current cell
-        :return:
-        """
-        this_cell = self.get_cell(row=row, column=column)
-        if this_cell in visited:
-            return 0
-        visited.append(this_cell)
-
-        if this_cell.contents == CellType.WALL:
-            return 0
-
-        # Up
-        if row > 0:
-            reachable_up = self._non_walls_reachable_from(row=row - 1, column=column, visited=visited)
-        else:
-            reachable_up = 0
-
-        # Down
-        if row < self.height - 1:
-            reachable_down = self._non_walls_reachable_from(row=row + 1, column=column, visited=visited)
-        else:
-            reachable_down = 0
-
-        # Left
-        if column > 0:
-            reachable_left = self._non_walls_reachable_from(row=row, column=column - 1, visited=visited)
-        else:
-            reachable_left = 0
-
-        # Right
-        if column < self.width - 1:
-            reachable_right = self._non_walls_reachable_from(row=row, column=column + 1, visited=visited)
-        else:
-            reachable_right = 0
-
-        return 1 + reachable_up + reachable_down + reachable_left + reachable_right
+        """
+        Calculate the number of non-wall spaces that are reachable from the first
+        non-wall space on the board
+        """
+        return self.connectivity.non_walls_reachable(self.wall_mask())
+
+    def wall_mask(self) -> int:
+        """
+        The cells that are walls, as a bitmask with bit ``row * width + column`` set
+        for each.
+        """
+        mask = 0
+        for index, cell in enumerate(self.enumerate_cells()):
+            if cell.contents == CellType.WALL:
+                mask |= 1 << index
+        return mask
+
+    def zobrist_hash(self) -> int:
+        """
+        Works out the Zobrist hash of the board from scratch. The trail keeps the same
+        hash up to date as cells change.
+        """
+        keys = zobrist_keys(self.width * self.height)
+        value = 0
+        for index, cell in enumerate(self.enumerate_cells()):
+            for t in cell.candidates:
+                value ^= keys[index][t]
+        return value
+
+    def checkpoint(self) -> int:
+        """
+        Marks the current state of the board, to come back to with :meth:`rollback`.
+        """
+        return self.trail.mark()
+
+    def rollback(self, checkpoint: int) -> None:
+        """
+        Undoes every cell change made since ``checkpoint`` was taken.
+        """
+        self.trail.rollback(checkpoint)
+
+    def changes_since(self, checkpoint: int) -> set[tuple[int, int]]:
+        """
+        The (row, column) of every cell that has changed since ``checkpoint``.
+        """
+        return {self.positions[cell] for cell, _ in self.trail.entries[checkpoint:]}
+
+    def entry_position(self, entry: int) -> tuple[int, int]:
+        """
+        The (row, column) of the cell changed by the ``entry``-th trail entry.
+        """
+        return self.positions[self.trail.entries[entry][0]]
 
     def reload(self):
-        self.load(self.source)
+        """
+        Puts the board back to the puzzle as loaded, by undoing every change since.
+        """
+        self.rollback(0)
@@ -7,6 +7,8 @@ from cell import Cell, CellType
 class BoardVector:
     cells: list[Cell]
     wall_count: int
+    row: int = None
+    column: int = None
 
     def get_walls_placed(self):
         return len([c for c in self.cells if c.contents == CellType.WALL])
@@ -0,0 +1,316 @@
+"""
+A small conflict-driven clause learning SAT solver, in pure Python.
+
+Variables are numbered from 1 and literals are non-zero ints, negative for a negated
+variable, as in DIMACS. Clauses are watched by two literals each, conflicts are
+analysed to their first unique implication point and learnt, decisions follow VSIDS
+activity with saved phases, and the search restarts on the Luby sequence.
+
+Clauses can be added between calls to :meth:`CDCLSolver.solve`, and everything learnt
+so far is kept, so a problem can be solved, refined and solved again.
+"""
+import heapq
+import time
+from typing import Iterable, Optional
+
+RESTART_BASE = 100
+"""Conflicts before the first restart, scaled by the Luby sequence after that."""
+
+ACTIVITY_DECAY = 0.95
+
+DEADLINE_INTERVAL = 64
+"""Conflicts between looks at the clock, when solving to a deadline."""
+
+
+def luby(i: int) -> int:
+    """
+    The ``i``-th term (from 1) of the Luby sequence: 1, 1, 2, 1, 1, 2, 4, 1, ...
+    """
+    k = 1
+    while (1 << k) - 1 < i:
+        k += 1
+    while (1 << k) - 1 != i:
+        i -= (1 << (k - 1)) - 1
+        k = 1
+        while (1 << k) - 1 < i:
+            k += 1
+    return 1 << (k - 1)
+
+
+class CDCLSolver:
+    num_vars: int
+    model: list[bool]
+    """After a satisfiable :meth:`solve`, the value of each variable, by number."""
+    conflicts: int
+    decisions: int
+
+    def __init__(self):
+        self.num_vars = 0
+        self.model = []
+        self.conflicts = 0
+        self.decisions = 0
+        self._ok = True
+        self._clauses: list[list[int]] = []
+        self._learnts: list[list[int]] = []
+        self._watches: dict[int, list[list[int]]] = {}
+        self._assigns = [0]
+        """1 or -1 for a variable that is true or false, 0 while unassigned."""
+        self._level = [0]
+        self._reason: list[Optional[list[int]]] = [None]
+        self._phase = [False]
+        self._activity = [0.0]
+        self._var_inc = 1.0
+        self._order: list[tuple[float, int]] = []
+        self._trail: list[int] = []
+        self._trail_lim: list[int] = []
+        self._qhead = 0
+        self._max_learnts = 1000
+
+    def new_var(self) -> int:
+        self.num_vars += 1
+        v = self.num_vars
+        self._assigns.append(0)
+        self._level.append(0)
+        self._reason.append(None)
+        self._phase.append(False)
+        self._activity.append(0.0)
+        self._watches[v] = []
+        self._watches[-v] = []
+        heapq.heappush(self._order, (0.0, v))
+        return v
+
+    def value(self, lit: int) -> int:
+        """
+        1 if the literal is true, -1 if false, 0 if unassigned.
+        """
+        return self._assigns[lit] if lit > 0 else -self._assigns[-lit]
+
+    def add_clause(self, literals: Iterable[int]) -> bool:
+        """
+        Adds a clause, simplified against what is already known for certain.
+
+        :return: False if the problem is now known to be unsatisfiable
+        """
+        if not self._ok:
+            return False
+        self._cancel_until(0)
+        clause = []
+        for lit in sorted(set(literals), key=abs):
+            if -lit in clause:
+                return True  # Always satisfied
+            value = self.value(lit)
+            if value == 1:
+                return True
+            if value == 0:
+                clause.append(lit)
+        if not clause:
+            self._ok = False
+        elif len(clause) == 1:
+            self._enqueue(clause[0], None)
+            self._ok = self._propagate() is None
+        else:
+            self._clauses.append(clause)
+            self._watch(clause)
+        return self._ok
+
+    def solve(self, max_conflicts: int = None, deadline: float = None) -> Optional[bool]:
+        """
+        :param max_conflicts: Give up after this many conflicts.
+        :param deadline: Give up at this :func:`time.monotonic` time, checked every
+            :data:`DEADLINE_INTERVAL` conflicts.
+        :return: True if satisfiable, with the assignment in :attr:`model`, False if
+            unsatisfiable, or None if the conflict budget or the deadline ran out first.
+        """
+        if not self._ok:
+            return False
+        if self._propagate() is not None:
+            self._ok = False
+            return False
+        if deadline is not None and time.monotonic() >= deadline:
+            return None
+
+        budget = None if max_conflicts is None else self.conflicts + max_conflicts
+        restarts = 1
+        until_restart = RESTART_BASE * luby(restarts)
+        while True:
+            conflict = self._propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self._trail_lim:
+                    self._ok = False
+                    return False
+                learnt, level = self._analyze(conflict)
+                self._cancel_until(level)
+                if len(learnt) == 1:
+                    self._enqueue(learnt[0], None)
+                else:
+                    self._learnts.append(learnt)
+                    self._watch(learnt)
+                    self._enqueue(learnt[0], learnt)
+                self._var_inc /= ACTIVITY_DECAY
+
+                until_restart -= 1
+                out_of_time = deadline is not None and self.conflicts % DEADLINE_INTERVAL == 0 \
+                    and time.monotonic() >= deadline
+                out_of_budget = out_of_time or (budget is not None and self.conflicts >= budget)
+                if until_restart <= 0 or out_of_budget:
+                    self._cancel_until(0)
+                    if out_of_budget:
+                        return None
+                    restarts += 1
+                    until_restart = RESTART_BASE * luby(restarts)
+                    if len(self._learnts) > self._max_learnts:
+                        self._reduce_learnts()
+                continue
+
+            var = self._pick_branch_var()
+            if var is None:
+                self.model = [False] + [a > 0 for a in self._assigns[1:]]
+                self._cancel_until(0)
+                return True
+            self.decisions += 1
+            self._trail_lim.append(len(self._trail))
+            self._enqueue(var if self._phase[var] else -var, None)
+
+    def _watch(self, clause: list[int]) -> None:
+        self._watches[clause[0]].append(clause)
+        self._watches[clause[1]].append(clause)
+
+    def _enqueue(self, lit: int, reason: Optional[list[int]]) -> None:
+        var = abs(lit)
+        self._assigns[var] = 1 if lit > 0 else -1
+        self._level[var] = len(self._trail_lim)
+        self._reason[var] = reason
+        self._trail.append(lit)
+
+    def _propagate(self) -> Optional[list[int]]:
+        """
+        Unit propagation over the watched literals.
+        :return: A clause with every literal false, or None
+        """
+        assigns = self._assigns
+        watches = self._watches
+        trail = self._trail
+        while self._qhead < len(trail):
+            false_lit = -trail[self._qhead]
+            self._qhead += 1
+            watchers = watches[false_lit]
+            kept = []
+            watches[false_lit] = kept
+            for i, clause in enumerate(watchers):
+                # Keep the false literal second
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                first_value = assigns[first] if first > 0 else -assigns[-first]
+                if first_value == 1:
+                    kept.append(clause)
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if (assigns[lit] if lit > 0 else -assigns[-lit]) != -1:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit].append(clause)
+                        break
+                else:
+                    kept.append(clause)
+                    if first_value == -1:
+                        kept.extend(watchers[i + 1:])
+                        self._qhead = len(trail)
+                        return clause
+                    self._enqueue(first, clause)
+        return None
+
+    def _analyze(self, conflict: list[int]) -> tuple[list[int], int]:
+        """
+        Works back from a conflict to the first unique implication point.
+        :return: The clause to learn, asserting its first literal, and the level to
+            jump back to
+        """
+        level = len(self._trail_lim)
+        seen = set()
+        learnt = [0]
+        pending = 0
+        index = len(self._trail) - 1
+        clause = conflict
+        lit = None
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                var = abs(q)
+                if var in seen or self._level[var] == 0:
+                    continue
+                seen.add(var)
+                self._bump(var)
+                if self._level[var] == level:
+                    pending += 1
+                else:
+                    learnt.append(q)
+            while abs(self._trail[index]) not in seen:
+                index -= 1
+            lit = self._trail[index]
+            index -= 1
+            clause = self._reason[abs(lit)]
+            pending -= 1
+            if pending == 0:
+                break
+        learnt[0] = -lit
+
+        # Drop literals implied by the rest of the clause
+        in_clause = {abs(q) for q in learnt}
+        learnt = [learnt[0]] + [q for q in learnt[1:] if not self._redundant(q, in_clause)]
+
+        if len(learnt) == 1:
+            return learnt, 0
+        deepest = max(range(1, len(learnt)), key=lambda i: self._level[abs(learnt[i])])
+        learnt[1], learnt[deepest] = learnt[deepest], learnt[1]
+        return learnt, self._level[abs(learnt[1])]
+
+    def _redundant(self, lit: int, in_clause: set[int]) -> bool:
+        reason = self._reason[abs(lit)]
+        if reason is None:
+            return False
+        return all(abs(q) in in_clause or self._level[abs(q)] == 0 for q in reason[1:])
+
+    def _bump(self, var: int) -> None:
+        self._activity[var] += self._var_inc
+        if self._activity[var] > 1e100:
+            self._activity = [a * 1e-100 for a in self._activity]
+            self._var_inc *= 1e-100
+            self._order = [(-self._activity[v], v) for v in range(1, self.num_vars + 1) if not self._assigns[v]]
+            heapq.heapify(self._order)
+        elif not self._assigns[var]:
+            heapq.heappush(self._order, (-self._activity[var], var))
+
+    def _pick_branch_var(self) -> Optional[int]:
+        while self._order:
+            _, var = heapq.heappop(self._order)
+            if not self._assigns[var]:
+                return var
+        return None
+
+    def _cancel_until(self, level: int) -> None:
+        if len(self._trail_lim) <= level:
+            return
+        start = self._trail_lim[level]
+        for lit in self._trail[start:]:
+            var = abs(lit)
+            self._phase[var] = lit > 0
+            self._assigns[var] = 0
+            self._reason[var] = None
+            heapq.heappush(self._order, (-self._activity[var], var))
+        del self._trail[start:]
+        del self._trail_lim[level:]
+        self._qhead = len(self._trail)
+
+    def _reduce_learnts(self) -> None:
+        """
+        Forgets the longer half of the learnt clauses. Only called at level 0, where no
+        learnt clause is the reason for anything still needed.
+        """
+        self._learnts.sort(key=len)
+        self._learnts = self._learnts[:len(self._learnts) // 2]
+        self._max_learnts = int(self._max_learnts * 1.1)
+        for lit in self._watches:
+            self._watches[lit] = []
+        for clause in self._clauses + self._learnts:
+            self._watch(clause)
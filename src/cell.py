@@ -1,5 +1,8 @@
 from enum import Enum
-from typing import List, Set
+from typing import Dict, List, Optional, Set
+
+from errors import NoCandidatesError
+from trail import Trail
 
 
 class CellType(Enum):
@@ -10,6 +13,15 @@ class CellType(Enum):
     CHEST = 4
 
 
+SYMBOL_TYPES = {
+    "#": CellType.WALL,
+    "_": CellType.FLOOR,
+    "m": CellType.MONSTER,
+    "c": CellType.CHEST,
+}
+"""The cell type each resolved cell is written as."""
+
+
 class Cell:
     """
     Represents one tile in the dungeon.
@@ -17,23 +29,31 @@ class Cell:
     resolved: bool
     contents: CellType
     candidates: Set[CellType]
+    trail: Optional[Trail]
+    keys: Optional[Dict[CellType, int]]
+    """The Zobrist key for each candidate, to keep the trail's hash up to date."""
 
     def __init__(self):
         self.contents = CellType.UNKNOWN
         self.resolved = False
         self.candidates = {CellType.FLOOR, CellType.WALL, CellType.MONSTER, CellType.CHEST}
+        self.trail = None
+        self.keys = None
 
     def resolve(self, cell_type: CellType) -> None:
         """
         Marks the cell as only containing the particular cell type.
         :param cell_type: The cell type to set this cell to.
         """
-        print(f"resolving as {cell_type}")
         if cell_type == CellType.UNKNOWN:
             raise ValueError("Cannot resolve cell to unknown.")
+        old = self.candidates
+        if self.trail is not None:
+            self.trail.push(self, (self.candidates, self.contents, self.resolved))
         self.candidates = {cell_type}
         self.contents = cell_type
         self.resolved = True
+        self._rehash(old)
 
     def eliminate(self, cell_type: CellType) -> None:
         """
@@ -41,14 +61,29 @@ class Cell:
         :param cell_type: The type to remove.
         """
         if cell_type in self.candidates:
-            self.candidates.remove(cell_type)
+            if self.trail is not None:
+                self.trail.push(self, (self.candidates, self.contents, self.resolved))
+            self.candidates = self.candidates - {cell_type}
+            if self.keys is not None:
+                self.trail.zobrist ^= self.keys[cell_type]
 
         if not self.candidates:
-            raise ValueError("All candidates were removed, this cell has no possibilities.")
+            raise NoCandidatesError()
 
         if len(self.candidates) == 1:
             self.resolve(next(iter(self.candidates)))
 
+    def _rehash(self, old: Set[CellType]) -> None:
+        if self.keys is not None:
+            for t in old ^ self.candidates:
+                self.trail.zobrist ^= self.keys[t]
+
+    def undo(self, state) -> None:
+        """
+        Puts back a state recorded on the trail before a change.
+        """
+        self.candidates, self.contents, self.resolved = state
+
     def __str__(self) -> str:
         if not self.resolved:
             return "?"
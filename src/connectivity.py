@@ -0,0 +1,169 @@
+"""
+Reachability between the open (non-wall) cells of a board.
+
+Cells are addressed by index, ``row * width + column``. Walls are passed in as an
+integer bitmask over those indices, the same layout :class:`BitBoard` uses, while the
+flood fill itself works on one byte per cell.
+"""
+from dataclasses import dataclass, field
+from functools import cache
+
+
+@cache
+def neighbor_table(width: int, height: int) -> tuple[tuple[int, ...], ...]:
+    """
+    For every cell index, the indices of its orthogonal neighbors.
+    """
+    table = []
+    for r in range(height):
+        for c in range(width):
+            neighbors = []
+            if r > 0:
+                neighbors.append((r - 1) * width + c)
+            if r < height - 1:
+                neighbors.append((r + 1) * width + c)
+            if c > 0:
+                neighbors.append(r * width + c - 1)
+            if c < width - 1:
+                neighbors.append(r * width + c + 1)
+            table.append(tuple(neighbors))
+    return tuple(table)
+
+
+def open_flags(walls: int, size: int) -> bytearray:
+    """
+    One byte per cell, 1 where the cell is not a wall.
+    """
+    flags = bytearray(size)
+    bits = format(walls, f"0{size}b")[::-1]
+    for index in range(size):
+        if bits[index] == "0":
+            flags[index] = 1
+    return flags
+
+
+def flood_fill(is_open: bytearray, start: int, neighbors: tuple[tuple[int, ...], ...]) -> bytearray:
+    """
+    Iterative flood fill over the open cells.
+    :return: One byte per cell, 1 where the cell is reachable from ``start``.
+    """
+    reached = bytearray(len(is_open))
+    reached[start] = 1
+    pending = [start]
+    while pending:
+        index = pending.pop()
+        for n in neighbors[index]:
+            if is_open[n] and not reached[n]:
+                reached[n] = 1
+                pending.append(n)
+    return reached
+
+
+class Connectivity:
+    """
+    Tracks whether the open cells of a board form one region.
+
+    The answer only changes when the walls do, so the last result is kept along with
+    the walls it was worked out for, and the flood fill is only rerun once a wall has
+    been added or taken away.
+    """
+    width: int
+    height: int
+
+    def __init__(self, width: int = 0, height: int = 0):
+        self.width = width
+        self.height = height
+        self._walls = None
+        self._reachable = 0
+
+    def non_walls_reachable(self, walls: int) -> int:
+        """
+        :param walls: Bitmask of the cells that are walls.
+        :return: How many open cells can be reached from the first open cell.
+        """
+        if walls != self._walls:
+            self._walls = walls
+            self._reachable = self._fill(walls)
+        return self._reachable
+
+    def _fill(self, walls: int) -> int:
+        is_open = open_flags(walls, self.width * self.height)
+        start = is_open.find(1)
+        if start < 0:
+            return 0
+        return sum(flood_fill(is_open, start, neighbor_table(self.width, self.height)))
+
+
+@dataclass
+class Separation:
+    """
+    What the open cells' connectivity says about the cells that are still unknown.
+    """
+    disconnected: bool = False
+    """Known open cells are already cut off from each other."""
+    cut_cells: list[int] = field(default_factory=list)
+    """Unknown cells that would cut known open cells off from each other as walls."""
+    stranded_cells: list[int] = field(default_factory=list)
+    """Unknown cells that can't reach any known open cell."""
+
+
+def find_separation(is_open: bytearray, is_known: bytearray,
+                    neighbors: tuple[tuple[int, ...], ...]) -> Separation:
+    """
+    Runs an iterative Tarjan articulation point search over the cells that could be
+    open, counting the known open cells below each cell of the depth-first tree.
+
+    :param is_open: One byte per cell, 1 where the cell is not a wall (yet).
+    :param is_known: One byte per cell, 1 where the cell is known not to be a wall.
+    """
+    size = len(is_open)
+    total_known = sum(is_known)
+    separation = Separation()
+    if not total_known:
+        return separation
+
+    discovered = [0] * size  # Discovery order, starting at 1
+    low = [0] * size
+    known_below = [0] * size
+    order = 0
+    for root in range(size):
+        if not is_open[root] or discovered[root]:
+            continue
+
+        order += 1
+        discovered[root] = low[root] = order
+        known_below[root] = is_known[root]
+        component = [root]
+        stack = [(root, -1, iter(neighbors[root]))]
+        while stack:
+            index, parent, pending = stack[-1]
+            for n in pending:
+                if not is_open[n]:
+                    continue
+                if not discovered[n]:
+                    order += 1
+                    discovered[n] = low[n] = order
+                    known_below[n] = is_known[n]
+                    component.append(n)
+                    stack.append((n, index, iter(neighbors[n])))
+                    break
+                if n != parent:
+                    low[index] = min(low[index], discovered[n])
+            else:
+                stack.pop()
+                if parent < 0:
+                    continue
+                low[parent] = min(low[parent], low[index])
+                known_below[parent] += known_below[index]
+                # Without the parent, this subtree is cut off from the rest
+                if low[index] >= discovered[parent] and not is_known[parent] \
+                        and 0 < known_below[index] < total_known:
+                    separation.cut_cells.append(parent)
+
+        if not known_below[root]:
+            separation.stranded_cells.extend(component)
+        elif known_below[root] < total_known:
+            separation.disconnected = True
+
+    separation.cut_cells = sorted(set(separation.cut_cells))
+    return separation
@@ -0,0 +1,254 @@
+"""
+Reads puzzles in bulk: streamed from text files, or from a compact binary corpus.
+
+Text files hold puzzles in the format of :meth:`Board.load`, back to back, and are
+read a line at a time, so a file of any size can be gone through one puzzle at a time.
+
+A binary corpus is laid out as::
+
+    header    magic "DDC1", version (uint16), puzzle count (uint32), table offset (uint64)
+    records   one per puzzle, see below
+    table     the offset of each record from the start of the file (uint64 each)
+
+and each record as::
+
+    width, height, bits per cell (one byte each), comment length (uint16)
+    comment   UTF-8
+    counts    a byte per column, then a byte per row
+    cells     bits per cell each, packed from the low bit up, row by row
+
+Cells take 2 bits, or 3 in puzzles with ``?`` cells. Numbers are little-endian. The
+file is read through ``mmap``, so any puzzle can be got at by index without reading
+the rest, and processes opening the same corpus share its pages::
+
+    python src/corpus.py corpus.ddc puzzles/*.txt
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+from typing import BinaryIO, Iterable, Iterator
+
+from board import Board
+
+CORPUS_SUFFIX = ".ddc"
+MAGIC = b"DDC1"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHIQ")
+_RECORD = struct.Struct("<BBBH")
+_OFFSET = struct.Struct("<Q")
+
+CELL_SYMBOLS = "_#mc?"
+"""The symbol for each cell code. Codes past 3 need 3 bits."""
+
+_CELL_CODES = {symbol: code for code, symbol in enumerate(CELL_SYMBOLS)}
+
+
+def iter_puzzles(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Splits lines holding several puzzles back to back into one string per puzzle,
+    without reading further ahead than the start of the next puzzle. A new puzzle
+    starts at a ``//`` comment, or at a ``*`` line when the puzzle so far already has
+    one.
+    """
+    lines_so_far = []
+    has_columns = False
+    has_cells = False
+    for line in lines:
+        line = line.rstrip("\n")
+        stripped = line.strip()
+        starts_new = stripped.startswith("//") or (stripped.startswith("*") and has_columns)
+        if starts_new and (has_columns or has_cells):
+            yield "\n".join(lines_so_far)
+            lines_so_far = []
+            has_columns = has_cells = False
+        if stripped.startswith("*"):
+            has_columns = True
+        elif stripped and not stripped.startswith("//"):
+            has_cells = True
+        lines_so_far.append(line)
+    if has_columns or has_cells:
+        yield "\n".join(lines_so_far)
+
+
+def split_puzzles(text: str) -> Iterator[str]:
+    """
+    Splits text holding several puzzles back to back into one string per puzzle.
+    """
+    return iter_puzzles(text.split("\n"))
+
+
+def read_boards(path: str, board_type: type[Board] = Board) -> Iterator[Board]:
+    """
+    Yields a board for each puzzle in a text file or binary corpus, one at a time.
+    """
+    if path.endswith(CORPUS_SUFFIX):
+        with Corpus(path) as corpus:
+            for i in range(len(corpus)):
+                yield corpus.board(i, board_type)
+        return
+    with open(path, "r") as f:
+        for maze in iter_puzzles(f):
+            board = board_type()
+            board.load(maze)
+            yield board
+
+
+def encode_puzzle(maze: str) -> bytes:
+    """
+    Packs one puzzle into a corpus record.
+    """
+    board = Board()
+    board.load(maze)
+    if board.width > 255 or board.height > 255:
+        raise ValueError("Puzzles in a corpus can be at most 255 cells across")
+    symbols = []
+    for line in maze.split("\n"):
+        line = line.strip()
+        if line and line[0] in "0123456789":
+            symbols.extend("".join(line.lstrip("0123456789").split()))
+    if len(symbols) != board.width * board.height:
+        raise ValueError("Every row of a puzzle needs a cell for each column")
+    bits = 3 if "?" in symbols else 2
+    packed = 0
+    for i, symbol in enumerate(symbols):
+        packed |= _CELL_CODES[symbol] << (i * bits)
+    comment = board.comment.encode("utf-8")
+    return (_RECORD.pack(board.width, board.height, bits, len(comment)) + comment
+            + bytes(board.wall_counts_columns) + bytes(board.wall_counts_rows)
+            + packed.to_bytes((len(symbols) * bits + 7) // 8, "little"))
+
+
+def decode_puzzle(record) -> str:
+    """
+    Unpacks a corpus record back into a puzzle in the text format.
+    """
+    width, height, bits, comment_length = _RECORD.unpack_from(record)
+    position = _RECORD.size
+    comment = bytes(record[position:position + comment_length]).decode("utf-8")
+    position += comment_length
+    columns = record[position:position + width]
+    rows = record[position + width:position + width + height]
+    position += width + height
+    packed = int.from_bytes(record[position:position + (width * height * bits + 7) // 8], "little")
+
+    mask = (1 << bits) - 1
+    lines = [f"// {comment}"] if comment else []
+    lines.append("* " + " ".join(str(count) for count in columns))
+    for r in range(height):
+        cells = []
+        for c in range(width):
+            cells.append(CELL_SYMBOLS[(packed >> ((r * width + c) * bits)) & mask])
+        lines.append(f"{rows[r]} " + " ".join(cells))
+    return "\n".join(lines)
+
+
+def write_corpus(f: BinaryIO, puzzles: Iterable[str]) -> int:
+    """
+    Writes puzzles out as a binary corpus, a puzzle at a time.
+
+    :param f: A binary file open for writing, which has to be seekable.
+    :return: The number of puzzles written
+    """
+    start = f.tell()
+    f.write(_HEADER.pack(MAGIC, VERSION, 0, 0))
+    offsets = []
+    for maze in puzzles:
+        offsets.append(f.tell() - start)
+        f.write(encode_puzzle(maze))
+    table = f.tell() - start
+    for offset in offsets:
+        f.write(_OFFSET.pack(offset))
+    end = f.tell()
+    f.seek(start)
+    f.write(_HEADER.pack(MAGIC, VERSION, len(offsets), table))
+    f.seek(end)
+    return len(offsets)
+
+
+class Corpus:
+    """
+    A binary corpus opened for random access, by index, through ``mmap``.
+    """
+    path: str
+    count: int
+
+    def __init__(self, path: str):
+        """
+        :raises ValueError: if the file isn't a corpus this version can read
+        """
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = None
+        self._view = None
+        try:
+            if os.fstat(self._file.fileno()).st_size < _HEADER.size:
+                raise ValueError()
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._view = memoryview(self._map)
+            magic, version, self.count, self._table = _HEADER.unpack_from(self._view)
+            if magic != MAGIC or version != VERSION or self._table + self.count * _OFFSET.size > len(self._map):
+                raise ValueError()
+        except (ValueError, struct.error):
+            self.close()
+            raise ValueError(f"Not a puzzle corpus: {path}") from None
+
+    def _record(self, index: int) -> memoryview:
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        offset, = _OFFSET.unpack_from(self._view, self._table + index * _OFFSET.size)
+        return self._view[offset:]
+
+    def __getitem__(self, index: int) -> str:
+        """
+        The puzzle at ``index``, in the text format.
+        """
+        return decode_puzzle(self._record(index))
+
+    def board(self, index: int, board_type: type[Board] = Board) -> Board:
+        board = board_type()
+        board.load(self[index])
+        return board
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(self.count):
+            yield self[i]
+
+    def close(self) -> None:
+        if self._view is not None:
+            self._view.release()
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "Corpus":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pack puzzles into a binary corpus.")
+    parser.add_argument("output", help=f"the corpus to write, conventionally ending in {CORPUS_SUFFIX}")
+    parser.add_argument("inputs", nargs="+", help="text files of puzzles")
+    args = parser.parse_args(argv)
+
+    def puzzles() -> Iterator[str]:
+        for path in args.inputs:
+            with open(path, "r") as f:
+                yield from iter_puzzles(f)
+
+    with open(args.output, "wb") as f:
+        count = write_corpus(f, puzzles())
+    print(f"Wrote {count} puzzles to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
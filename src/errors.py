@@ -0,0 +1,19 @@
+class NoSolutionError(Exception):
+    def __init__(self, constraint: tuple = None):
+        """
+        :param constraint: The constraint found to be broken, if known, so a search can
+            work out which of its guesses were to blame.
+        """
+        super().__init__("No solutions found")
+        self.constraint = constraint
+
+
+class NoCandidatesError(NoSolutionError, ValueError):
+    """
+    Every candidate of a cell has been ruled out. Rules don't check for this
+    themselves, so it is a :class:`NoSolutionError` to the solver, as well as the
+    ValueError it has always been to anything else.
+    """
+    def __init__(self):
+        super().__init__()
+        self.args = ("All candidates were removed, this cell has no possibilities.",)
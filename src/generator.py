@@ -0,0 +1,293 @@
+"""
+Generates random puzzles, for benchmarking and for stress testing the solver.
+
+A dungeon is carved out of solid wall: a few treasure rooms are placed first, then a
+single hallway is grown cell by cell from a random starting point, never opening up a
+2x2 area, and giving each room it reaches its one exit. Every dead end of the hallway
+gets a monster. The wall counts are read off the finished dungeon, and it is written
+out in the text format of :meth:`Board.load` with the walls and floors left blank::
+
+    python src/generator.py 16 16 --count 10 --seed 1 --rooms 2 > corpus.txt
+"""
+import argparse
+import random
+import sys
+from typing import Iterator
+
+from board import Board
+from cell import CellType
+from search import SearchLimitError
+from solver import Solver
+from treasure import ROOM_SIZE
+
+LOOP_CHANCE = 0.05
+"""How likely the hallway is to join up with itself where it could."""
+
+MIN_OPEN = 0.3
+"""The least of the board the dungeon should cover, so that it isn't mostly wall."""
+
+MIN_CELLS = 3
+"""The smallest board with room for a dungeon: a hallway with a monster at each end."""
+
+MAX_ATTEMPTS = 1000
+"""Dungeons or puzzles to throw away in a row before giving up on the size asked for."""
+
+SYMBOLS = {
+    CellType.WALL: "#",
+    CellType.FLOOR: "_",
+    CellType.MONSTER: "m",
+    CellType.CHEST: "c",
+}
+
+
+class _Dungeon:
+    """
+    A dungeon being carved, as a grid of cell types.
+    """
+
+    def __init__(self, width: int, height: int, rng: random.Random):
+        self.width = width
+        self.height = height
+        self.rng = rng
+        self.cells = [[CellType.WALL] * width for _ in range(height)]
+        self.rooms: list[tuple[int, int]] = []
+        self.room_at: dict[tuple[int, int], int] = {}
+        """The room each room interior cell belongs to."""
+        self.door_of: dict[tuple[int, int], int] = {}
+        """The room each cell that could be a room's exit leads into."""
+        self.exits: dict[int, tuple[int, int]] = {}
+
+    def neighbors(self, row: int, column: int) -> list[tuple[int, int]]:
+        return [
+            (r, c) for r, c in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1))
+            if 0 <= r < self.height and 0 <= c < self.width
+        ]
+
+    def is_open(self, row: int, column: int) -> bool:
+        # Rooms count as open from the start, so the hallway never runs alongside one
+        return self.cells[row][column] != CellType.WALL or (row, column) in self.room_at
+
+    def place_rooms(self, count: int) -> None:
+        """
+        Places up to ``count`` rooms, with at least two cells between any two of them
+        so that no cell is next to more than one room.
+        """
+        if self.width < ROOM_SIZE or self.height < ROOM_SIZE:
+            return
+        for _ in range(count * 10):
+            if len(self.rooms) == count:
+                return
+            top = self.rng.randrange(self.height - ROOM_SIZE + 1)
+            left = self.rng.randrange(self.width - ROOM_SIZE + 1)
+            if any(abs(top - t) < ROOM_SIZE + 2 and abs(left - l) < ROOM_SIZE + 2 for t, l in self.rooms):
+                continue
+            room = len(self.rooms)
+            self.rooms.append((top, left))
+            for r in range(top, top + ROOM_SIZE):
+                for c in range(left, left + ROOM_SIZE):
+                    self.room_at[(r, c)] = room
+            for i in range(ROOM_SIZE):
+                for r, c in ((top - 1, left + i), (top + ROOM_SIZE, left + i),
+                             (top + i, left - 1), (top + i, left + ROOM_SIZE)):
+                    if 0 <= r < self.height and 0 <= c < self.width:
+                        self.door_of[(r, c)] = room
+
+    def can_open(self, row: int, column: int) -> bool:
+        if self.is_open(row, column):
+            return False
+        room = self.door_of.get((row, column))
+        if room is not None and room in self.exits:
+            return False
+        for top in (row - 1, row):
+            for left in (column - 1, column):
+                if 0 <= top < self.height - 1 and 0 <= left < self.width - 1:
+                    window = [(r, c) for r in (top, top + 1) for c in (left, left + 1) if (r, c) != (row, column)]
+                    if all(self.is_open(r, c) for r, c in window):
+                        return False
+        open_neighbors = len([n for n in self.neighbors(row, column) if self.is_open(*n)])
+        if room is not None:
+            # The room itself is one of the open neighbors
+            open_neighbors -= 1
+        return open_neighbors <= 1 or self.rng.random() < LOOP_CHANCE
+
+    def grow_hallway(self) -> None:
+        """
+        Grows the hallway from a random cell outside the rooms until it can't go any
+        further.
+        """
+        starts = [(r, c) for r in range(self.height) for c in range(self.width)
+                  if (r, c) not in self.room_at and (r, c) not in self.door_of]
+        if not starts:
+            return
+        start = self.rng.choice(starts)
+        self.cells[start[0]][start[1]] = CellType.FLOOR
+        active = [start]
+        while active:
+            i = self.rng.randrange(len(active))
+            options = [n for n in self.neighbors(*active[i]) if self.can_open(*n)]
+            if not options:
+                active[i] = active[-1]
+                active.pop()
+                continue
+            r, c = self.rng.choice(options)
+            self.cells[r][c] = CellType.FLOOR
+            room = self.door_of.get((r, c))
+            if room is not None:
+                self.exits[room] = (r, c)
+            active.append((r, c))
+
+    def furnish(self) -> None:
+        """
+        Opens up the rooms the hallway reached and puts a chest in each, walls up the
+        rest, and puts a monster in every dead end.
+        """
+        for room, (top, left) in enumerate(self.rooms):
+            interior = [(top + r, left + c) for r in range(ROOM_SIZE) for c in range(ROOM_SIZE)]
+            if room not in self.exits:
+                for r, c in interior:
+                    del self.room_at[(r, c)]
+                continue
+            for r, c in interior:
+                self.cells[r][c] = CellType.FLOOR
+            r, c = self.rng.choice(interior)
+            self.cells[r][c] = CellType.CHEST
+
+        for r in range(self.height):
+            for c in range(self.width):
+                if self.cells[r][c] != CellType.FLOOR or (r, c) in self.room_at:
+                    continue
+                if len([n for n in self.neighbors(r, c) if self.is_open(*n)]) == 1:
+                    self.cells[r][c] = CellType.MONSTER
+
+
+def generate_dungeon(width: int, height: int, *, rooms: int = 0,
+                     rng: random.Random = None) -> list[list[CellType]]:
+    """
+    Carves out a random dungeon that follows the rules of the game.
+
+    :param rooms: The most treasure rooms to try to fit in.
+    :return: The contents of every cell, row by row
+    :raises ValueError: if no dungeon can be that size
+    :raises RuntimeError: if none was found in :data:`MAX_ATTEMPTS` tries
+    """
+    check_size(width, height, rooms)
+    rng = rng or random.Random()
+    for _ in range(MAX_ATTEMPTS):
+        dungeon = _Dungeon(width, height, rng)
+        dungeon.place_rooms(rooms)
+        dungeon.grow_hallway()
+        dungeon.furnish()
+        if _is_valid(dungeon.cells):
+            return dungeon.cells
+    raise RuntimeError(f"No valid {width}x{height} dungeon in {MAX_ATTEMPTS} attempts")
+
+
+def check_size(width: int, height: int, rooms: int = 0) -> None:
+    """
+    :raises ValueError: if no dungeon can be ``width`` by ``height``, or ``rooms`` is
+        negative
+    """
+    if width < 1 or height < 1 or width * height < MIN_CELLS:
+        raise ValueError(f"A dungeon needs at least {MIN_CELLS} cells, not {width}x{height}")
+    if rooms < 0:
+        raise ValueError(f"Can't have {rooms} rooms")
+
+
+def format_puzzle(cells: list[list[CellType]], comment: str = None, *, solved: bool = False) -> str:
+    """
+    Writes a dungeon out in the text format of :meth:`Board.load`.
+
+    :param solved: Whether to show the walls and floors, rather than leaving them for
+        the solver to work out.
+    """
+    lines = []
+    if comment:
+        lines.append(f"// {comment}")
+    columns = [len([row[c] for row in cells if row[c] == CellType.WALL]) for c in range(len(cells[0]))]
+    lines.append("* " + " ".join(str(count) for count in columns))
+    for row in cells:
+        symbols = [SYMBOLS[t] if solved or t in (CellType.MONSTER, CellType.CHEST) else "_" for t in row]
+        lines.append(f"{row.count(CellType.WALL)} " + " ".join(symbols))
+    return "\n".join(lines)
+
+
+def _is_valid(cells: list[list[CellType]]) -> bool:
+    board = Board()
+    board.load(format_puzzle(cells))
+    for r, row in enumerate(cells):
+        for c, contents in enumerate(row):
+            board.get_cell(column=c, row=r).resolve(contents)
+    open_cells = len([t for row in cells for t in row if t != CellType.WALL])
+    return open_cells > max(2, MIN_OPEN * board.width * board.height) and board.is_valid()
+
+
+def _is_unique(maze: str, max_nodes: int = None) -> bool:
+    try:
+        return Solver(maze, max_nodes=max_nodes).is_unique()
+    except SearchLimitError:
+        return False
+
+
+def generate_puzzles(width: int, height: int, *, count: int = None, seed: int = None, rooms: int = 0,
+                     unique: bool = False, max_nodes: int = None) -> Iterator[str]:
+    """
+    Generates puzzles in the text format of :meth:`Board.load`, each headed by a comment
+    saying how it was made. The same seed always gives the same puzzles.
+
+    :param count: How many puzzles to generate, or None to go on forever.
+    :param rooms: The most treasure rooms to put in each.
+    :param unique: Only keep puzzles with exactly one solution.
+    :param max_nodes: When checking for a unique solution, give up on puzzles that
+        need more than this many guesses.
+    :raises ValueError: if no dungeon can be that size
+    :raises RuntimeError: if :data:`MAX_ATTEMPTS` puzzles in a row were thrown away
+    """
+    check_size(width, height, rooms)
+    rng = random.Random(seed)
+    generated = 0
+    attempt = 0
+    rejected = 0
+    while count is None or generated < count:
+        cells = generate_dungeon(width, height, rooms=rooms, rng=rng)
+        comment = f"Generated {width}x{height}, seed {seed}, #{attempt}"
+        attempt += 1
+        maze = format_puzzle(cells, comment)
+        if unique and not _is_unique(maze, max_nodes):
+            rejected += 1
+            if rejected == MAX_ATTEMPTS:
+                raise RuntimeError(f"No uniquely solvable {width}x{height} puzzle in {MAX_ATTEMPTS} attempts")
+            continue
+        rejected = 0
+        generated += 1
+        yield maze
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate random Dungeons and Diagrams puzzles.")
+    parser.add_argument("width", type=int)
+    parser.add_argument("height", type=int)
+    parser.add_argument("-n", "--count", type=int, default=1, help="number of puzzles to generate")
+    parser.add_argument("-s", "--seed", type=int, default=None, help="random seed, for the same puzzles every time")
+    parser.add_argument("-r", "--rooms", type=int, default=0, help="most treasure rooms per puzzle")
+    parser.add_argument("-u", "--unique", action="store_true", help="only keep puzzles with exactly one solution")
+    parser.add_argument("--max-nodes", type=int, default=10000,
+                        help="with --unique, skip puzzles needing more guesses than this to check")
+    args = parser.parse_args(argv)
+    try:
+        check_size(args.width, args.height, args.rooms)
+    except ValueError as e:
+        parser.error(str(e))
+
+    try:
+        for maze in generate_puzzles(args.width, args.height, count=args.count, seed=args.seed, rooms=args.rooms,
+                                     unique=args.unique, max_nodes=args.max_nodes):
+            sys.stdout.write(maze + "\n\n")
+            sys.stdout.flush()
+    except RuntimeError as e:
+        sys.stderr.write(f"{e}\n")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+"""
+Hints for playing along: the next cell that follows from the board as the player has
+it, which rule forces it, and the cells the rule looked at.
+
+A :class:`HintEngine` keeps one propagated board for the whole game. Each cell the
+player sets is made on top of the deductions already there, and only the rules that
+can see it are run again. Clearing a cell, or undoing, rolls the board's trail back
+to before that cell was set, then makes the player's later cells again and propagates
+them together, so nothing is worked out from scratch.
+"""
+from dataclasses import dataclass
+from typing import Optional
+
+from board import Board
+from cell import CellType
+from errors import NoSolutionError
+from solver import RULE_NAMES, Solver
+from trail import DECISION
+
+
+@dataclass(frozen=True)
+class Hint:
+    row: int
+    column: int
+    contents: CellType
+    rule: str
+    """The rule that forces the cell, as reported to an :class:`Observer`."""
+    antecedents: tuple[tuple[int, int], ...]
+    """The (row, column) of the resolved cells the rule looked at to force it."""
+
+
+@dataclass
+class _Edit:
+    row: int
+    column: int
+    value: CellType
+    checkpoint: Optional[int]
+    """The board's checkpoint before the cell was set."""
+
+
+class HintEngine:
+    """
+    The player's board, and everything that follows from it.
+    """
+    solver: Solver
+
+    def __init__(self, maze: str, board_type: type[Board] = Board):
+        """
+        :raises NoSolutionError: if the puzzle contradicts itself as given
+        """
+        self.solver = Solver(maze, board_type, probing=False)
+        self.solver.engine.propagate(None)
+        self._edits: list[_Edit] = []
+        self._history: list[tuple[int, int, Optional[CellType], Optional[CellType]]] = []
+        """The (row, column) of each cell set or cleared, and what it was before and after."""
+        self._hint = None
+        self._stale = True
+
+    @property
+    def board(self) -> Board:
+        """
+        The board with every deduction made, including the ones not hinted at yet.
+        """
+        return self.solver.board
+
+    @property
+    def placed(self) -> dict[tuple[int, int], CellType]:
+        """
+        The cells the player has set, by (row, column).
+        """
+        return {(edit.row, edit.column): edit.value for edit in self._edits}
+
+    def set(self, row: int, column: int, value: CellType) -> None:
+        """
+        Sets a cell, as the player has, in place of anything they set it to before.
+
+        :raises NoSolutionError: if the cell can't be that, as far as the rules can
+            tell. Nothing is changed.
+        :raises ValueError: if the value is :attr:`CellType.UNKNOWN`
+        """
+        if value == CellType.UNKNOWN:
+            raise ValueError("Cannot set a cell to unknown, clear it instead.")
+        before = self.placed.get((row, column))
+        if before == value:
+            return
+        if before is not None:
+            self._remove(row, column)
+        try:
+            self._place(row, column, value)
+        except NoSolutionError:
+            if before is not None:
+                self._place(row, column, before)
+            raise
+        self._history.append((row, column, before, value))
+
+    def clear(self, row: int, column: int) -> None:
+        """
+        Clears a cell the player set.
+
+        :raises KeyError: if the player hasn't set it
+        :raises NoSolutionError: if a cell set after it can't be kept without it, as
+            far as the rules can tell. Nothing is changed.
+        """
+        before = self.placed[(row, column)]
+        self._remove(row, column)
+        self._history.append((row, column, before, None))
+
+    def undo(self) -> bool:
+        """
+        Takes back the last :meth:`set` or :meth:`clear`.
+
+        :return: False if there was nothing to undo
+        :raises NoSolutionError: if the cells set since can't be kept with it taken
+            back, as far as the rules can tell. Nothing is changed.
+        """
+        if not self._history:
+            return False
+        row, column, before, after = self._history[-1]
+        if after is not None:
+            self._remove(row, column)
+        if before is not None:
+            try:
+                self._place(row, column, before)
+            except NoSolutionError:
+                if after is not None:
+                    self._place(row, column, after)
+                raise
+        self._history.pop()
+        return True
+
+    def hint(self) -> Optional[Hint]:
+        """
+        The next cell that follows from the player's board, or None if the rules can't
+        take it any further. Of the cells the player hasn't set, the one deduced
+        earliest is given, so the cells it follows from are all given or set already.
+        """
+        if self._stale:
+            self._hint = self._find_hint()
+            self._stale = False
+        return self._hint
+
+    def _place(self, row: int, column: int, value: CellType) -> None:
+        self._place_all([_Edit(row, column, value, None)])
+
+    def _place_all(self, edits: list[_Edit]) -> None:
+        """
+        Sets cells for the player, and propagates them all together.
+
+        :raises NoSolutionError: if they contradict the board, which is left as it was
+        """
+        board = self.board
+        start = board.checkpoint()
+        try:
+            for edit in edits:
+                edit.checkpoint = board.checkpoint()
+                cell = board.get_cell(column=edit.column, row=edit.row)
+                if edit.value not in cell.candidates:
+                    raise NoSolutionError(self._reason_for(edit.row, edit.column))
+                if not cell.resolved:
+                    board.trail.reason = DECISION
+                    cell.resolve(edit.value)
+            self.solver.engine.propagate(start)
+        except NoSolutionError as e:
+            board.rollback(start)
+            raise NoSolutionError(e.constraint)
+        self._edits.extend(edits)
+        self._stale = True
+
+    def _remove(self, row: int, column: int) -> None:
+        """
+        Takes a cell the player set back off the board, along with everything that
+        followed from it, and makes the cells they set after it again.
+
+        :raises NoSolutionError: if a cell set after it contradicts the board without
+            it. Nothing is changed.
+        """
+        edits = self._edits
+        index = next(i for i, edit in enumerate(edits) if (edit.row, edit.column) == (row, column))
+        later = edits[index + 1:]
+        self._edits = edits[:index]
+        self.board.rollback(edits[index].checkpoint)
+        if later:
+            try:
+                self._place_all(later)
+            except NoSolutionError:
+                # Put the cell back, so the board still matches the player's cells
+                self._place_all(edits[index:])
+                raise
+        self._stale = True
+
+    def _reason_for(self, row: int, column: int) -> Optional[tuple]:
+        """
+        The constraint that last changed a cell, if a rule did.
+        """
+        trail = self.board.trail
+        for entry in range(len(trail) - 1, -1, -1):
+            if self.board.entry_position(entry) == (row, column):
+                return trail.reasons[entry]
+        return None
+
+    def _find_hint(self) -> Optional[Hint]:
+        board = self.board
+        trail = board.trail
+        # A cell only ever narrows, so the last change to a cell is the one that
+        # resolved it, if it is resolved
+        resolved_at = {}
+        for entry in range(len(trail)):
+            resolved_at[board.entry_position(entry)] = entry
+        placed = self.placed
+
+        best = None
+        for position, entry in resolved_at.items():
+            row, column = position
+            if position in placed or not board.get_cell(column=column, row=row).resolved:
+                continue
+            if trail.reasons[entry] in (None, DECISION):
+                continue
+            if best is None or entry < best[1]:
+                best = position, entry
+        if best is None:
+            return None
+
+        (row, column), entry = best
+        reason = trail.reasons[entry]
+        scope = self.solver.engine.scope(reason)
+        if scope is None:
+            scope = [(r, c) for r in range(board.height) for c in range(board.width)]
+        antecedents = tuple(
+            (r, c) for r, c in scope
+            if (r, c) != (row, column) and board.get_cell(column=c, row=r).resolved
+            and resolved_at.get((r, c), -1) < entry
+        )
+        return Hint(row, column, board.get_cell(column=column, row=row).contents, RULE_NAMES[reason[0]],
+                    antecedents)
@@ -0,0 +1,95 @@
+"""
+Opt-in tracing of what the solver is doing.
+
+A :class:`Solver` given an :class:`Observer` reports structured :class:`Event` objects
+to it as it works. Without one, no events are built at all, so the default costs nothing.
+"""
+from collections import Counter
+from dataclasses import dataclass, field
+from enum import Enum
+
+from cell import CellType
+
+
+class EventType(Enum):
+    CELL_RESOLVED = 0
+    """A rule resolved or narrowed down a cell."""
+    RULE_FIRED = 1
+    """A rule was checked. ``changed`` says how many cells it changed, often none."""
+    VALIDITY_FAILED = 2
+    """The board was found to be invalid. ``reason`` says why."""
+    BRANCH = 3
+    """The search guessed ``contents`` for a cell."""
+    BACKTRACK = 4
+    """The search ran out of values to try for the guess at ``depth``."""
+
+
+@dataclass
+class Event:
+    type: EventType
+    rule: str = None
+    row: int = None
+    column: int = None
+    contents: CellType = None
+    reason: str = None
+    depth: int = None
+    changed: int = None
+    seconds: float = None
+
+
+class Observer:
+    """
+    Receives events from a solver. Subclass and override :meth:`on_event`.
+    """
+
+    def on_event(self, event: Event) -> None:
+        pass
+
+
+@dataclass
+class RuleCounter:
+    checks: int = 0
+    fires: int = 0
+    """Checks that changed at least one cell."""
+    cells: int = 0
+    seconds: float = 0.0
+
+
+@dataclass
+class CountingObserver(Observer):
+    """
+    Keeps running totals: per rule, and of each kind of event.
+    """
+    rules: dict[str, RuleCounter] = field(default_factory=dict)
+    events: Counter = field(default_factory=Counter)
+    validity_failures: Counter = field(default_factory=Counter)
+
+    def on_event(self, event: Event) -> None:
+        self.events[event.type] += 1
+        if event.type == EventType.RULE_FIRED:
+            counter = self.rules.setdefault(event.rule, RuleCounter())
+            counter.checks += 1
+            counter.fires += bool(event.changed)
+            counter.cells += event.changed
+            counter.seconds += event.seconds
+        elif event.type == EventType.VALIDITY_FAILED:
+            self.validity_failures[event.reason] += 1
+
+
+class PrintObserver(Observer):
+    """
+    Prints every event, for following a solve by eye.
+    """
+
+    def on_event(self, event: Event) -> None:
+        match event.type:
+            case EventType.CELL_RESOLVED:
+                print(f"({event.row}, {event.column}) -> {event.contents} by {event.rule}")
+            case EventType.RULE_FIRED if event.changed:
+                print(f"Resolved {event.rule}!")
+            case EventType.VALIDITY_FAILED:
+                print(f"INVALID ({event.reason})")
+            case EventType.BRANCH:
+                print(f"Guessing ({event.row}, {event.column}) is {event.contents} at depth {event.depth}")
+            case EventType.BACKTRACK:
+                print(f" --- Backtracking from depth {event.depth} ---")
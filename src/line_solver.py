@@ -0,0 +1,160 @@
+"""
+Nonogram-style solving of a single row or column.
+
+Every way of placing a line's walls is tried against what is already known about the
+line and the cells either side of it; whatever all of the surviving placements agree on
+is forced. Placements are bitmasks over the line, with bit ``i`` set when the ``i``-th
+cell of the line is a wall.
+"""
+from functools import cache
+from itertools import combinations
+from math import comb
+
+from bit_board import BitBoard
+from board import Board
+from board_vector import BoardVector
+from cell import CellType
+from errors import NoSolutionError
+
+MAX_TABLE_SIZE = 1 << 16
+"""Lines with more wall placements than this are not enumerated."""
+
+
+def has_placement_table(length: int, count: int) -> bool:
+    return 0 <= count <= length and comb(length, count) <= MAX_TABLE_SIZE
+
+
+@cache
+def placements(length: int, count: int) -> tuple[int, ...]:
+    """
+    Every way to place ``count`` walls in a line of ``length`` cells. Built once per
+    (length, count) and shared between all puzzles.
+    """
+    return tuple(sum(1 << i for i in walls) for walls in combinations(range(length), count))
+
+
+def _perpendicular_neighbors(board: Board, vector: BoardVector, i: int) -> list:
+    if vector.row is not None:
+        r, c = vector.row, i
+        return [board.get_cell(column=c, row=n) for n in (r - 1, r + 1) if 0 <= n < board.height]
+    r, c = i, vector.column
+    return [board.get_cell(column=n, row=r) for n in (c - 1, c + 1) if 0 <= n < board.width]
+
+
+def _line_masks(board: Board, vector: BoardVector) -> tuple:
+    """
+    What is known about a line and the cells either side of it, cell by cell: its
+    walls, the cells that can't be walls, the cells that can only be floor or wall, its
+    monsters, the cells with zero, one or two perpendicular neighbors that could be
+    open, and the cells with none or some perpendicular neighbors already open.
+    """
+    known_walls = 0
+    known_open = 0
+    floor_only = 0
+    monsters = 0
+    perpendicular_open = [0, 0, 0]
+    perpendicular_known_open = [0, 0]
+    for i, cell in enumerate(vector.cells):
+        bit = 1 << i
+        if cell.contents == CellType.WALL:
+            known_walls |= bit
+        elif CellType.WALL not in cell.candidates:
+            known_open |= bit
+        if cell.candidates <= {CellType.FLOOR, CellType.WALL}:
+            floor_only |= bit
+        if cell.contents == CellType.MONSTER:
+            monsters |= bit
+
+        neighbors = _perpendicular_neighbors(board, vector, i)
+        perpendicular_open[len([n for n in neighbors if n.contents != CellType.WALL])] |= bit
+        known_open_neighbors = len([n for n in neighbors if CellType.WALL not in n.candidates])
+        perpendicular_known_open[min(known_open_neighbors, 1)] |= bit
+    return known_walls, known_open, floor_only, monsters, perpendicular_open, perpendicular_known_open
+
+
+def _line_masks_from_bits(board: BitBoard, vector: BoardVector) -> tuple:
+    """
+    The same as :func:`_line_masks`, read off a :class:`BitBoard`'s masks a whole line
+    at a time.
+    """
+    full = (1 << len(vector.cells)) - 1
+    walls = board.walls
+    not_walls = board.full_mask & ~walls
+    known_open_cells = board.full_mask & ~board.candidate_masks[CellType.WALL]
+    if vector.row is not None:
+        axis, index, size = "row", vector.row, board.height
+    else:
+        axis, index, size = "column", vector.column, board.width
+
+    def line(mask: int, n: int) -> int:
+        return board.line_bits(mask, **{axis: n}) if 0 <= n < size else 0
+
+    known_walls = line(walls, index)
+    known_open = line(known_open_cells, index)
+    floor_only = full & ~line(board.candidate_masks[CellType.MONSTER] | board.candidate_masks[CellType.CHEST], index)
+    monsters = line(board.monsters, index)
+
+    before, after = line(not_walls, index - 1), line(not_walls, index + 1)
+    perpendicular_open = [full & ~(before | after), before ^ after, before & after]
+    known_open_either = line(known_open_cells, index - 1) | line(known_open_cells, index + 1)
+    perpendicular_known_open = [full & ~known_open_either, known_open_either]
+    return known_walls, known_open, floor_only, monsters, perpendicular_open, perpendicular_known_open
+
+
+def solve_line(board: Board, vector: BoardVector) -> bool:
+    """
+    Resolves the cells of ``vector`` that every wall placement fitting it agrees on.
+
+    A placement fits when it puts walls on every known wall and nowhere that can't be a
+    wall, leaves no floor as a dead end, and gives every monster exactly one way out.
+    The cells either side of the line only count as open when they could be.
+
+    :return: True if any cell was resolved
+    :raises NoSolutionError: if no placement fits
+    """
+    length = len(vector.cells)
+    full = (1 << length) - 1
+
+    line_masks = _line_masks_from_bits if isinstance(board, BitBoard) else _line_masks
+    known_walls, known_open, floor_only, monsters, perpendicular_open, perpendicular_known_open = \
+        line_masks(board, vector)
+
+    must_have_two = floor_only & perpendicular_open[0]
+    must_have_one = (floor_only & perpendicular_open[1]) | (monsters & perpendicular_open[0])
+    at_most_one = monsters & perpendicular_known_open[0]
+    must_have_none = monsters & perpendicular_known_open[1]
+
+    fits = False
+    always_walls = full
+    ever_walls = 0
+    for walls in placements(length, vector.wall_count):
+        if walls & known_walls != known_walls or walls & known_open:
+            continue
+        open_cells = full & ~walls
+        open_before = (open_cells << 1) & full
+        open_after = open_cells >> 1
+        both = open_before & open_after
+        either = open_before | open_after
+        if open_cells & ((must_have_two & ~both) | (must_have_one & ~either)):
+            continue
+        if (at_most_one & both) | (must_have_none & either):
+            continue
+        fits = True
+        always_walls &= walls
+        ever_walls |= walls
+
+    if not fits:
+        raise NoSolutionError()
+
+    resolved = False
+    for i, cell in enumerate(vector.cells):
+        if cell.resolved:
+            continue
+        bit = 1 << i
+        if always_walls & bit:
+            cell.resolve(CellType.WALL)
+            resolved = True
+        elif not ever_walls & bit and CellType.WALL in cell.candidates:
+            cell.eliminate(CellType.WALL)
+            resolved = True
+    return resolved
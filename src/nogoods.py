@@ -0,0 +1,57 @@
+"""
+Nogoods: sets of cell values that have been proven to admit no solution together.
+"""
+from collections import OrderedDict
+from typing import Iterator
+
+from cell import CellType
+
+Literal = tuple[int, int, CellType]
+"""A cell's (row, column) and contents."""
+
+DEFAULT_CAPACITY = 10000
+
+
+class NogoodStore:
+    """
+    A bounded store of nogoods, indexed by the literals in them. When full, the nogood
+    that has gone longest without pruning anything is forgotten first.
+    """
+    capacity: int
+    hits: int
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.hits = 0
+        self._nogoods: OrderedDict[frozenset[Literal], None] = OrderedDict()
+        self._index: dict[Literal, set[frozenset[Literal]]] = {}
+
+    def add(self, literals: frozenset[Literal]) -> None:
+        if literals in self._nogoods or not self.capacity:
+            return
+        while len(self._nogoods) >= self.capacity:
+            evicted, _ = self._nogoods.popitem(last=False)
+            for literal in evicted:
+                self._index[literal].discard(evicted)
+        self._nogoods[literals] = None
+        for literal in literals:
+            self._index.setdefault(literal, set()).add(literals)
+
+    def containing(self, literal: Literal) -> Iterator[frozenset[Literal]]:
+        """
+        The nogoods that ``literal`` is part of.
+        """
+        yield from list(self._index.get(literal, ()))
+
+    def used(self, literals: frozenset[Literal]) -> None:
+        """
+        Notes that a nogood just pruned something, so it is kept for longer.
+        """
+        self.hits += 1
+        self._nogoods.move_to_end(literals)
+
+    def __len__(self) -> int:
+        return len(self._nogoods)
+
+    def __contains__(self, literals: frozenset[Literal]) -> bool:
+        return literals in self._nogoods
@@ -0,0 +1,215 @@
+"""
+Searches one puzzle on several worker processes at once.
+
+The top of the search tree is split into subtrees, each named by the guesses that lead
+to it, and handed out to a process pool. Whenever a worker sits idle, the next busy
+worker to notice gives away the untried values of its shallowest guess
+(:meth:`SearchEngine.split_off`), which go back through a queue to be handed out in
+turn. As soon as enough solutions have been found, a shared event tells every worker
+to stop.
+
+Each worker keeps a :class:`TranspositionTable` for the puzzle it's on, so subtrees it
+is handed that lead back to boards it has already searched are given up on early.
+"""
+import multiprocessing
+import queue
+from time import monotonic
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Optional
+
+from board import Board
+from cell import SYMBOL_TYPES
+from errors import NoSolutionError
+from nogoods import Literal
+from search import SearchLimitError
+from trail import DECISION
+from zobrist import TranspositionTable
+
+TASKS_PER_WORKER = 4
+"""How many subtrees to start with for each worker, so they share the work out evenly."""
+
+MAX_SPLIT_DEPTH = 6
+"""How many guesses deep to go splitting the tree up front, at most."""
+
+SPLIT_INTERVAL = 50
+"""Nodes a worker searches between giving work away."""
+
+POLL_SECONDS = 0.01
+
+# Set in each worker process by _init_worker
+_cancel = None
+_idle = None
+_donations = None
+_transpositions: dict[str, TranspositionTable] = {}
+
+
+def _init_worker(cancel, idle, donations) -> None:
+    global _cancel, _idle, _donations
+    _cancel = cancel
+    _idle = idle
+    _donations = donations
+
+
+def _start(solver, path: list[Literal]) -> None:
+    """
+    Puts a solver's board back to the puzzle as loaded, and makes the guesses on
+    ``path``.
+    """
+    board = solver.board
+    board.rollback(0)
+    for r, c, value in path:
+        board.trail.reason = DECISION
+        board.get_cell(column=c, row=r).resolve(value)
+
+
+def split_tree(solver, count: int) -> list[list[Literal]]:
+    """
+    Splits the top of the search tree into at least ``count`` subtrees, where it goes
+    deep enough. Subtrees found to have no solution on the way are left out.
+
+    :return: The guesses leading to each subtree
+    """
+    engine = solver.engine
+    frontier = [[]]
+    for _ in range(MAX_SPLIT_DEPTH):
+        if len(frontier) >= count:
+            break
+        expanded = []
+        for path in frontier:
+            _start(solver, path)
+            try:
+                engine.propagate(None)
+            except NoSolutionError:
+                continue
+            if all(cell.resolved for cell in solver.board.enumerate_cells()):
+                expanded.append(path)
+                continue
+            row, column = engine.choose_cell()
+            cell = solver.board.get_cell(column=column, row=row)
+            expanded.extend(path + [(row, column, value)] for value in engine.order_values(cell))
+        if expanded == frontier:
+            break
+        frontier = expanded
+    solver.board.rollback(0)
+    return frontier
+
+
+def _search(solver_type: type, maze: str, board_type: type[Board], path: list[Literal], limit: Optional[int],
+            max_nodes: Optional[int], deadline: Optional[float], probing: bool) -> tuple[list[str], int, int]:
+    """
+    Searches one subtree, in a worker process.
+
+    :return: The solutions found, each as a string of cell symbols, the nodes searched,
+        and how many subtrees were given away
+    """
+    solver = solver_type(maze, board_type, max_nodes=max_nodes, probing=probing)
+    engine = solver.engine
+    engine.deadline = deadline
+    if maze not in _transpositions:
+        _transpositions.clear()
+        _transpositions[maze] = TranspositionTable()
+    engine.transpositions = _transpositions[maze]
+    _start(solver, path)
+
+    given_away = 0
+    next_split = SPLIT_INTERVAL
+
+    def interrupt():
+        nonlocal given_away, next_split
+        if _cancel.is_set():
+            raise SearchLimitError("cancelled")
+        if engine.nodes >= next_split and _idle.value > 0:
+            next_split = engine.nodes + SPLIT_INTERVAL
+            for given in engine.split_off():
+                _donations.put(path + given)
+                given_away += 1
+                with _idle.get_lock():
+                    _idle.value -= 1
+
+    engine.interrupt = interrupt
+    solutions = []
+    try:
+        for board in engine.solutions():
+            solutions.append("".join(str(cell) for cell in board.enumerate_cells()))
+            if limit is not None and len(solutions) >= limit:
+                break
+    except SearchLimitError as e:
+        if e.reason != "cancelled":
+            raise
+    return solutions, engine.nodes, given_away
+
+
+def parallel_solutions(solver, workers: int, limit: int = None) -> tuple[list[str], int]:
+    """
+    Searches a solver's puzzle on a pool of worker processes, each running a solver of
+    the same type on the same kind of board. The solver's board is left as loaded.
+    Observers and the depth limit aren't used by the workers, but the deadline is.
+
+    :param solver: The :class:`Solver` whose puzzle to search, used to split the tree.
+    :param workers: How many worker processes to use.
+    :param limit: Stop once this many solutions have been found.
+    :return: The solutions, each as a string of cell symbols in cell order, and the
+        total nodes searched
+    :raises SearchLimitError: if the deadline passed, or the node limit was hit,
+        counting the nodes of every worker together
+    """
+    maze = solver.board.source
+    max_nodes = solver.engine.max_nodes
+    deadline = solver.engine.deadline
+    context = multiprocessing.get_context()
+    cancel = context.Event()
+    idle = context.Value("i", 0)
+    donations = context.Queue()
+
+    solutions = []
+    nodes = 0
+    given_away = 0
+    received = 0
+    pool = ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker,
+                               initargs=(cancel, idle, donations))
+    running = set()
+
+    def submit(path: list[Literal]) -> None:
+        running.add(pool.submit(_search, type(solver), maze, type(solver.board), path, limit, max_nodes, deadline,
+                                 solver.probing))
+
+    try:
+        for path in split_tree(solver, workers * TASKS_PER_WORKER):
+            submit(path)
+        # Work given away might still be on its way after the worker that gave it is done
+        while running or received < given_away:
+            idle.value = max(workers - len(running), 0)
+            done, _ = wait(running, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+            for future in done:
+                running.discard(future)
+                found, task_nodes, task_given_away = future.result()
+                solutions.extend(found)
+                nodes += task_nodes
+                given_away += task_given_away
+            while True:
+                try:
+                    path = donations.get_nowait()
+                except queue.Empty:
+                    break
+                received += 1
+                submit(path)
+            if limit is not None and len(solutions) >= limit:
+                break
+            if max_nodes is not None and nodes > max_nodes:
+                raise SearchLimitError("node limit")
+            if deadline is not None and monotonic() >= deadline:
+                raise SearchLimitError("deadline")
+    finally:
+        cancel.set()
+        pool.shutdown(wait=True, cancel_futures=True)
+    return solutions[:limit], nodes
+
+
+def write_solution(board: Board, solution: str) -> None:
+    """
+    Fills in a board as loaded with a solution from :func:`parallel_solutions`.
+    """
+    board.rollback(0)
+    for cell, symbol in zip(board.enumerate_cells(), solution):
+        if not cell.resolved:
+            cell.resolve(SYMBOL_TYPES[symbol])
@@ -0,0 +1,206 @@
+"""
+Races several configurations of the solver against each other on one puzzle.
+
+Puzzles differ in what cracks them: some fall to the rules and probing alone, some to
+branching on the tightest line, and ones with many chests to checking treasure rooms
+first. A portfolio starts each :class:`Configuration` in a process of its own, takes
+the first answer, and stops the rest. Which configuration won is reported with the
+answer, so the defaults can be tuned from what wins in practice::
+
+    python src/portfolio.py tests/testdata/input_*.txt --timeout 10 > wins.jsonl
+"""
+import argparse
+import json
+import multiprocessing
+import queue
+import sys
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from random import Random
+from typing import Iterable, Optional
+
+from batch import read_inputs
+from board import Board
+from cdcl import luby
+from errors import NoSolutionError
+from parallel import write_solution
+from search import SearchLimitError
+from solver import RULE_PRIORITIES, Solver
+
+
+@dataclass(frozen=True)
+class Configuration:
+    name: str
+    probing: bool = True
+    branching: str = "fewest"
+    """One of :data:`search.BRANCHING`."""
+    rule_priorities: dict[str, int] = field(default_factory=lambda: RULE_PRIORITIES, hash=False)
+    seed: Optional[int] = None
+    """Breaks ties between cells and shuffles the values tried, if set."""
+    restart_nodes: Optional[int] = None
+    """Start the search over after this many nodes times the next term of the Luby
+    sequence, carrying on with the same random choices, nogoods and transposition
+    table. Needs a seed to go a different way each time."""
+
+    def apply(self, solver: Solver) -> None:
+        solver.rule_priorities = self.rule_priorities
+        solver.engine.branching = self.branching
+        if self.seed is not None:
+            solver.engine.rng = Random(self.seed)
+
+
+DEFAULT_PORTFOLIO = (
+    Configuration("default"),
+    Configuration("search", probing=False),
+    Configuration("tightest_line", probing=False, branching="tightest"),
+    Configuration("rooms_first", rule_priorities={**RULE_PRIORITIES, "treasure": 0, "connectivity": 1}),
+    Configuration("restarts", probing=False, seed=1, restart_nodes=32),
+)
+
+
+POLL_INTERVAL = 0.1
+"""Seconds between checks that the configurations still running haven't died."""
+
+
+@dataclass
+class PortfolioResult:
+    status: str
+    """``solved``, ``no_solution``, or ``timeout`` if no configuration finished in time."""
+    board: Optional[Board]
+    """The solution, if solved."""
+    winner: Optional[str]
+    """The name of the configuration that answered first."""
+    seconds: float
+
+
+def solve_with(configuration: Configuration, maze: str, board_type: type[Board] = Board,
+               deadline: float = None) -> Board:
+    """
+    Solves a puzzle with one configuration.
+
+    :raises NoSolutionError: if the puzzle has no solution
+    :raises SearchLimitError: if the deadline passed first
+    """
+    solver = Solver(maze, board_type, probing=configuration.probing)
+    configuration.apply(solver)
+    if configuration.restart_nodes is None:
+        return solver.solve(deadline=deadline)
+
+    restart = 1
+    while True:
+        budget = solver.engine.nodes + configuration.restart_nodes * luby(restart)
+        try:
+            return solver.solve(deadline=deadline, max_nodes=budget)
+        except SearchLimitError as e:
+            if e.reason != "node limit":
+                raise
+        restart += 1
+
+
+def _race(answers, index: int, configuration: Configuration, maze: str, board_type: type[Board],
+          deadline: Optional[float]) -> None:
+    """
+    Runs one configuration, in a process of its own, and puts its answer on
+    ``answers``: its index, a status, and the solution as a string of cell symbols.
+    """
+    try:
+        board = solve_with(configuration, maze, board_type, deadline)
+        answers.put((index, "solved", "".join(str(cell) for cell in board.enumerate_cells())))
+    except NoSolutionError:
+        answers.put((index, "no_solution", None))
+    except SearchLimitError:
+        answers.put((index, "timeout", None))
+    except Exception as e:
+        answers.put((index, "error", f"{type(e).__name__}: {e}"))
+
+
+def race(maze: str, configurations: Iterable[Configuration] = DEFAULT_PORTFOLIO, *,
+         board_type: type[Board] = Board, deadline: float = None) -> PortfolioResult:
+    """
+    Solves a puzzle with every configuration at once, each in its own process, and
+    returns the first answer. The others are stopped as soon as there is one.
+
+    :param deadline: Give up at this :func:`time.monotonic` time.
+    :raises RuntimeError: if every configuration failed with an error, or died
+    """
+    configurations = list(configurations)
+    if not configurations:
+        raise ValueError("No configurations to race")
+    start = time.perf_counter()
+    context = multiprocessing.get_context()
+    answers = context.Queue()
+    processes = [context.Process(target=_race, args=(answers, i, configuration, maze, board_type, deadline),
+                                 daemon=True)
+                 for i, configuration in enumerate(configurations)]
+    for process in processes:
+        process.start()
+
+    errors = []
+    answered = set()
+    try:
+        while len(answered) < len(processes):
+            timeout = POLL_INTERVAL if deadline is None else min(max(deadline - time.monotonic(), 0), POLL_INTERVAL)
+            try:
+                index, status, answer = answers.get(timeout=timeout)
+            except queue.Empty:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                if not any(process.is_alive() for process in processes) and answers.empty():
+                    # Some died without answering
+                    errors += [f"{configurations[i].name}: exited with code {process.exitcode}"
+                               for i, process in enumerate(processes) if i not in answered]
+                    break
+                continue
+            answered.add(index)
+            if status == "error":
+                errors.append(f"{configurations[index].name}: {answer}")
+                continue
+            if status == "timeout":
+                continue
+            board = None
+            if status == "solved":
+                board = board_type()
+                board.load(maze)
+                write_solution(board, answer)
+            return PortfolioResult(status, board, configurations[index].name, time.perf_counter() - start)
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        for process in processes:
+            process.join()
+        answers.close()
+    if len(errors) == len(processes):
+        raise RuntimeError("Every configuration failed: " + "; ".join(errors))
+    return PortfolioResult("timeout", None, None, time.perf_counter() - start)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Race solver configurations on each puzzle.")
+    parser.add_argument("inputs", nargs="+", help="puzzle files, directories, glob patterns, or - for stdin")
+    parser.add_argument("-t", "--timeout", type=float, default=None, help="seconds allowed per puzzle")
+    parser.add_argument("-c", "--configuration", action="append", dest="configurations",
+                        choices=[c.name for c in DEFAULT_PORTFOLIO],
+                        help="only race these configurations (default: all of them)")
+    args = parser.parse_args(argv)
+    configurations = [c for c in DEFAULT_PORTFOLIO if not args.configurations or c.name in args.configurations]
+
+    wins = Counter()
+    for source, maze in read_inputs(args.inputs):
+        deadline = time.monotonic() + args.timeout if args.timeout else None
+        result = race(maze, configurations, deadline=deadline)
+        if result.winner is not None:
+            wins[result.winner] += 1
+        solution = None
+        if result.board is not None:
+            solution = [" ".join(str(c) for c in result.board.get_row(r)) for r in range(result.board.height)]
+        sys.stdout.write(json.dumps({"source": source, "status": result.status, "winner": result.winner,
+                                     "solution": solution, "seconds": round(result.seconds, 6)}) + "\n")
+        sys.stdout.flush()
+    sys.stderr.write("Wins: " + ", ".join(f"{name}: {count}" for name, count in wins.most_common()) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
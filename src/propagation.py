@@ -0,0 +1,38 @@
+from collections import deque
+from typing import Hashable
+
+
+class PropagationQueue:
+    """
+    Constraints waiting to be re-checked because a cell they touch has changed.
+
+    Each constraint is queued at most once at a time, and constraints with a lower
+    priority number are always taken first, so cheap local checks run to a standstill
+    before more expensive ones get a turn.
+    """
+    queues: list[deque]
+    queued: set
+
+    def __init__(self, priorities: int):
+        self.queues = [deque() for _ in range(priorities)]
+        self.queued = set()
+
+    def push(self, constraint: Hashable, priority: int) -> None:
+        if constraint in self.queued:
+            return
+        self.queued.add(constraint)
+        self.queues[priority].append(constraint)
+
+    def pop(self) -> Hashable:
+        for queue in self.queues:
+            if queue:
+                constraint = queue.popleft()
+                self.queued.remove(constraint)
+                return constraint
+        raise IndexError("pop from an empty PropagationQueue")
+
+    def __len__(self) -> int:
+        return len(self.queued)
+
+    def __bool__(self) -> bool:
+        return bool(self.queued)
@@ -0,0 +1,236 @@
+"""
+Solves a board by encoding it as CNF for the built-in :class:`CDCLSolver`.
+
+There is one variable per cell, true where the cell is a wall, and one per place each
+chest's room could go. The clauses say:
+
+- each row and column has exactly its wall count of walls (totalizers)
+- each monster has exactly one open neighbor
+- an open cell that could be a floor has at least two open neighbors
+- each chest has exactly one room around it, all open, with exactly one exit
+- any 2x2 open area is inside a room
+
+Connectivity isn't encoded up front. Instead, whenever the SAT solver comes back with
+walls that split the dungeon, a cut is added for every piece cut off from the rest:
+one of the walls around it must be open, or one of the two sides must be closed off.
+"""
+import time
+from typing import Optional
+
+from board import Board
+from cdcl import CDCLSolver
+from cell import CellType
+from connectivity import flood_fill, neighbor_table
+from search import SearchLimitError
+from treasure import room_placements
+
+
+def totalizer(sat: CDCLSolver, literals: list[int], limit: int) -> list[int]:
+    """
+    Builds a totalizer counting how many of ``literals`` are true, in unary.
+
+    :param limit: The most outputs to build. Counts past the limit all show as the limit.
+    :return: Outputs, where the ``j``-th (from 0) is true exactly when at least ``j + 1``
+        of the literals are true
+    """
+    if len(literals) == 1:
+        return list(literals)
+    middle = len(literals) // 2
+    left = totalizer(sat, literals[:middle], limit)
+    right = totalizer(sat, literals[middle:], limit)
+    # A side that was cut short can't say its count is no more than its last output
+    left_exact = len(left) == middle
+    right_exact = len(right) == len(literals) - middle
+    outputs = [sat.new_var() for _ in range(min(len(literals), limit))]
+    for i in range(len(left) + 1):
+        for j in range(len(right) + 1):
+            # At least i on the left and j on the right makes at least i + j
+            if i + j:
+                clause = [outputs[min(i + j, len(outputs)) - 1]]
+                if i:
+                    clause.append(-left[i - 1])
+                if j:
+                    clause.append(-right[j - 1])
+                sat.add_clause(clause)
+            # At most i on the left and j on the right makes at most i + j
+            if i + j < len(outputs):
+                if (i == len(left) and not left_exact) or (j == len(right) and not right_exact):
+                    continue
+                clause = [-outputs[i + j]]
+                if i < len(left):
+                    clause.append(left[i])
+                if j < len(right):
+                    clause.append(right[j])
+                sat.add_clause(clause)
+    return outputs
+
+
+def exactly(sat: CDCLSolver, literals: list[int], k: int) -> None:
+    """
+    Adds clauses for exactly ``k`` of ``literals`` being true.
+    """
+    if k < 0 or k > len(literals):
+        sat.add_clause([])
+        return
+    if k == 0 or k == len(literals):
+        for lit in literals:
+            sat.add_clause([lit if k else -lit])
+        return
+    outputs = totalizer(sat, literals, k + 1)
+    sat.add_clause([outputs[k - 1]])
+    if len(outputs) > k:
+        sat.add_clause([-outputs[k]])
+
+
+class SatBackend:
+    board: Board
+    sat: CDCLSolver
+    walls: list[int]
+    """The variable for each cell index, true when the cell is a wall."""
+    cuts: int
+    """Connectivity cuts added so far."""
+
+    def __init__(self, board: Board, *, max_conflicts: int = None, deadline: float = None):
+        """
+        :param board: The board to solve. Every monster and chest has to be known.
+        :param max_conflicts: Give up after the SAT solver has hit this many conflicts.
+        :param deadline: Give up at this :func:`time.monotonic` time.
+        """
+        self.board = board
+        self.max_conflicts = max_conflicts
+        self.deadline = deadline
+        self.sat = CDCLSolver()
+        self.cuts = 0
+        self.neighbors = neighbor_table(board.width, board.height)
+        self.cells = list(board.enumerate_cells())
+        self.walls = [self.sat.new_var() for _ in self.cells]
+        self._encode()
+
+    def solve(self) -> bool:
+        """
+        :return: True with the board solved, or False if there is no solution.
+        :raises SearchLimitError: if the conflict limit or the deadline was hit first
+        """
+        while True:
+            remaining = None if self.max_conflicts is None else max(self.max_conflicts - self.sat.conflicts, 0)
+            found = self.sat.solve(max_conflicts=remaining, deadline=self.deadline)
+            if found is None:
+                if self.deadline is not None and time.monotonic() >= self.deadline:
+                    raise SearchLimitError("deadline")
+                raise SearchLimitError("conflict limit")
+            if not found:
+                return False
+            is_open = bytearray(not self.sat.model[v] for v in self.walls)
+            components = self._components(is_open)
+            if len(components) <= 1:
+                self._write_solution(is_open)
+                return True
+            self._add_cuts(is_open, components)
+
+    def _encode(self) -> None:
+        board = self.board
+        for index, cell in enumerate(self.cells):
+            if cell.contents == CellType.WALL:
+                self.sat.add_clause([self.walls[index]])
+            elif CellType.WALL not in cell.candidates:
+                self.sat.add_clause([-self.walls[index]])
+            if not cell.resolved and (CellType.MONSTER in cell.candidates or CellType.CHEST in cell.candidates):
+                raise ValueError("The SAT backend needs every monster and chest to be given")
+
+        for r in range(board.height):
+            exactly(self.sat, [self.walls[r * board.width + c] for c in range(board.width)],
+                    board.get_wall_count(row=r))
+        for c in range(board.width):
+            exactly(self.sat, [self.walls[r * board.width + c] for r in range(board.height)],
+                    board.get_wall_count(column=c))
+
+        for index, cell in enumerate(self.cells):
+            open_neighbors = [-self.walls[n] for n in self.neighbors[index]]
+            if cell.contents == CellType.MONSTER:
+                # A dead end: exactly one way out
+                self.sat.add_clause(open_neighbors)
+                for i, a in enumerate(open_neighbors):
+                    for b in open_neighbors[i + 1:]:
+                        self.sat.add_clause([-a, -b])
+            elif CellType.FLOOR in cell.candidates:
+                # Open, so not a dead end: at least two ways out
+                for skipped in open_neighbors:
+                    self.sat.add_clause([self.walls[index]] + [n for n in open_neighbors if n != skipped])
+
+        self._encode_rooms()
+
+    def _encode_rooms(self) -> None:
+        board = self.board
+        width = board.width
+        rooms = []
+        for index, cell in enumerate(self.cells):
+            if cell.contents != CellType.CHEST:
+                continue
+            r, c = divmod(index, width)
+            selectors = []
+            for placement in room_placements(board.width, board.height, r, c):
+                interior = [ir * width + ic for ir, ic in placement.interior]
+                if any(self.cells[i].contents in (CellType.WALL, CellType.MONSTER)
+                       or (self.cells[i].contents == CellType.CHEST and i != index) for i in interior):
+                    continue
+                selector = self.sat.new_var()
+                selectors.append(selector)
+                rooms.append((placement, selector))
+                for i in interior:
+                    self.sat.add_clause([-selector, -self.walls[i]])
+                exits = [-self.walls[pr * width + pc] for pr, pc in placement.perimeter]
+                self.sat.add_clause([-selector] + exits)
+                for i, a in enumerate(exits):
+                    for b in exits[i + 1:]:
+                        self.sat.add_clause([-selector, -a, -b])
+            self.sat.add_clause(selectors)
+            for i, a in enumerate(selectors):
+                for b in selectors[i + 1:]:
+                    self.sat.add_clause([-a, -b])
+
+        for r in range(board.height - 1):
+            for c in range(board.width - 1):
+                window = [self.walls[wr * width + wc] for wr, wc in ((r, c), (r, c + 1), (r + 1, c), (r + 1, c + 1))]
+                inside = [selector for placement, selector in rooms
+                          if placement.contains(r, c) and placement.contains(r + 1, c + 1)]
+                self.sat.add_clause(window + inside)
+
+    def _components(self, is_open: bytearray) -> list[list[int]]:
+        components = []
+        reached = bytearray(len(is_open))
+        for start in range(len(is_open)):
+            if is_open[start] and not reached[start]:
+                fill = flood_fill(is_open, start, self.neighbors)
+                component = [i for i, r in enumerate(fill) if r]
+                for i in component:
+                    reached[i] = 1
+                components.append(component)
+        return components
+
+    def _representative(self, component: list[int]) -> Optional[int]:
+        """
+        A cell of the component to name in a cut, or None if one of its cells is
+        known to be open, which makes the cut stronger.
+        """
+        for i in component:
+            if CellType.WALL not in self.cells[i].candidates:
+                return None
+        return self.walls[component[0]]
+
+    def _add_cuts(self, is_open: bytearray, components: list[list[int]]) -> None:
+        components.sort(key=len, reverse=True)
+        largest = self._representative(components[0])
+        for component in components[1:]:
+            members = set(component)
+            boundary = {n for i in component for n in self.neighbors[i] if n not in members}
+            clause = [-self.walls[b] for b in sorted(boundary)]
+            for side in (largest, self._representative(component)):
+                if side is not None:
+                    clause.append(side)
+            self.sat.add_clause(clause)
+            self.cuts += 1
+
+    def _write_solution(self, is_open: bytearray) -> None:
+        for index, cell in enumerate(self.cells):
+            if not cell.resolved:
+                cell.resolve(CellType.FLOOR if is_open[index] else CellType.WALL)
@@ -0,0 +1,461 @@
+from bisect import bisect_right
+from time import monotonic
+from dataclasses import dataclass, field
+from random import Random
+from typing import Callable, Iterator, Optional
+
+from board import Board
+from cell import Cell, CellType
+from errors import NoSolutionError
+from instrumentation import Event, EventType, Observer
+from nogoods import DEFAULT_CAPACITY, Literal, NogoodStore
+from trail import DECISION
+from zobrist import TranspositionTable
+
+BRANCH_ORDER = (CellType.WALL, CellType.FLOOR, CellType.MONSTER, CellType.CHEST)
+
+BRANCHING = ("fewest", "tightest")
+"""How :meth:`SearchEngine.choose_cell` ranks cells: by fewest candidates first, or by
+the tightest line through them first."""
+
+MAX_NOGOOD_SIZE = 8
+"""Nogoods of more guesses than this are too specific to be worth keeping."""
+
+PROGRESS_INTERVAL = 0.5
+"""Seconds between progress reports."""
+
+
+class SearchLimitError(Exception):
+    board: Optional[Board]
+    """The board as far as it could be deduced without guessing, where known."""
+
+    def __init__(self, reason: str, board: Board = None):
+        super().__init__(f"Search gave up: {reason}")
+        self.reason = reason
+        self.board = board
+
+
+@dataclass
+class Progress:
+    """
+    How far a search has got, as reported to an ``on_progress`` callback.
+    """
+    resolved: int
+    """Cells resolved on the board, counting the ones guessed."""
+    cells: int
+    nodes: int
+    depth: int
+    seconds: float
+
+
+@dataclass
+class _Frame:
+    """
+    One decision on the search stack: the cell guessed, the values still to try for
+    it, and the board checkpoint to roll back to before each try.
+    """
+    checkpoint: int
+    state: int
+    """The board's Zobrist hash before any of the values were tried."""
+    row: int
+    column: int
+    values: list[CellType] = field(default_factory=list)
+    value: CellType = None
+    """The value being tried."""
+    conflict: set[int] = field(default_factory=set)
+    """The levels of the earlier guesses that the values tried so far failed because of."""
+    proven: bool = True
+    """False once a value has not been shown to fail, by finding a solution below it or
+    by hitting the depth limit, so the frame can't be backjumped over or learnt from."""
+
+
+class SearchEngine:
+    """
+    Iterative depth-first search over a board, with conflict-directed backjumping.
+
+    At every node the engine picks the unresolved cell with the fewest options left,
+    tries each of its values in turn, and runs ``propagate`` on what each guess
+    changed. The search stack is an explicit list of :class:`_Frame`, and undoing a
+    guess is a rollback of the board's trail.
+
+    Given a ``scope`` for each constraint, a failed guess is traced back through the
+    reasons on the trail to the earlier guesses it actually depends on. Guesses that
+    played no part are jumped straight back over, and the ones that did are stored as
+    a nogood, which stops the same combination being tried again elsewhere.
+
+    Boards searched without finding a solution are remembered by their Zobrist hash in
+    a transposition table, and met again are given up on straight away. Within one
+    search every node differs from the others in a guessed cell, so the states come
+    round again when the table outlives a search, or is shared between engines that
+    search the same puzzle in different orders.
+    """
+    board: Board
+    propagate: Callable[[int], None]
+    scope: Callable[[tuple], Optional[list[tuple[int, int]]]]
+    max_nodes: int
+    max_depth: int
+    observer: Optional[Observer]
+    deadline: Optional[float]
+    """The :func:`time.monotonic` time to give up at."""
+    on_progress: Optional[Callable[[Progress], None]]
+    branching: str
+    """One of :data:`BRANCHING`."""
+    rng: Optional[Random]
+    """Breaks ties between cells and shuffles the values tried when set, so searches
+    with different seeds go different ways."""
+    interrupt: Optional[Callable[[], None]]
+    """Called before every guess. It can stop the search by raising
+    :class:`SearchLimitError`, or give work away with :meth:`split_off`."""
+    nogoods: NogoodStore
+    transpositions: TranspositionTable
+    nodes: int
+    backtracks: int
+    backjumps: int
+    """Guesses jumped back over without trying the rest of their values."""
+    depth: int
+
+    def __init__(self, board: Board, propagate: Callable[[int], None], *,
+                 scope: Callable[[tuple], Optional[list[tuple[int, int]]]] = None,
+                 max_nodes: int = None, max_depth: int = None, observer: Observer = None,
+                 max_nogoods: int = DEFAULT_CAPACITY, max_nogood_size: int = MAX_NOGOOD_SIZE,
+                 transpositions: TranspositionTable = None, deadline: float = None,
+                 on_progress: Callable[[Progress], None] = None):
+        """
+        :param board: The board to search. On success it is left holding the solution.
+        :param propagate: Applies deductions to the board until none are left, raising
+            :class:`NoSolutionError` on a contradiction. It is passed the checkpoint the
+            board was last propagated at, or None the first time.
+        :param scope: The cells a constraint's rule looks at, or None if it looks at the
+            whole board. Without it, every failure is blamed on every guess.
+        :param max_nodes: Give up after trying this many guesses.
+        :param max_depth: Don't guess more than this many cells deep.
+        :param observer: Told about every guess and backtrack.
+        :param max_nogoods: How many nogoods to keep.
+        :param max_nogood_size: Don't keep nogoods of more guesses than this.
+        :param transpositions: Where to remember boards with no solution, which can be
+            shared with other engines on the same puzzle. A new table by default.
+        :param deadline: Give up at this :func:`time.monotonic` time. It is checked
+            before every guess, and by ``propagate`` if it calls :meth:`check_budget`.
+        :param on_progress: Called every :data:`PROGRESS_INTERVAL` seconds with how far
+            the search has got, from the same places the deadline is checked.
+        """
+        self.board = board
+        self.propagate = propagate
+        self.scope = scope or (lambda constraint: None)
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+        self.observer = observer
+        self.deadline = deadline
+        self.on_progress = on_progress
+        self.branching = "fewest"
+        self.rng = None
+        self.interrupt = None
+        self.nogoods = NogoodStore(max_nogoods)
+        self.max_nogood_size = max_nogood_size
+        self.transpositions = TranspositionTable() if transpositions is None else transpositions
+        self.nodes = 0
+        self.backtracks = 0
+        self.backjumps = 0
+        self.depth = 0
+        self._stack: list[_Frame] = []
+        self._started = monotonic()
+        self._next_progress = self._started + PROGRESS_INTERVAL
+
+    def search(self) -> bool:
+        """
+        :return: True with the board solved, or False if there is no solution.
+        :raises SearchLimitError: if the node limit was hit, or no solution was found
+            but part of the tree was cut off by the depth limit.
+        """
+        for _ in self.solutions():
+            return True
+        return False
+
+    def solutions(self) -> Iterator[Board]:
+        """
+        Yields the board each time it holds a solution, then carries on searching from
+        there for the next one. The board must be left as it is between solutions.
+
+        :raises SearchLimitError: if the node limit was hit, or part of the tree was cut
+            off by the depth limit, so that not every solution was seen.
+        """
+        self._started = monotonic()
+        self._next_progress = self._started + PROGRESS_INTERVAL
+        try:
+            self.propagate(None)
+        except NoSolutionError:
+            return
+        if self._known_dead():
+            return
+
+        stack: list[_Frame] = []
+        self._stack = stack
+        cut_off = False
+        while True:
+            if self._is_resolved():
+                # Nothing above a solution has been shown to fail
+                for frame in stack:
+                    frame.proven = False
+                yield self.board
+            elif self.max_depth is not None and len(stack) >= self.max_depth:
+                cut_off = True
+                if stack:
+                    stack[-1].proven = False
+            else:
+                row, column = self.choose_cell()
+                values = self.order_values(self.board.get_cell(column=column, row=row))
+                stack.append(_Frame(self.board.checkpoint(), self.board.trail.zobrist, row, column, values))
+
+            if not self._next_guess(stack):
+                if cut_off:
+                    raise SearchLimitError("depth limit")
+                return
+
+    def _next_guess(self, stack: list[_Frame]) -> bool:
+        """
+        Makes the next guess on the stack that propagates without a contradiction,
+        backtracking as needed.
+
+        :return: False once every guess has been tried
+        """
+        while stack:
+            if self.interrupt is not None:
+                self.interrupt()
+            frame = stack[-1]
+            level = len(stack)
+            if not frame.values:
+                self._backtrack(stack)
+                continue
+
+            self.board.rollback(frame.checkpoint)
+            self.nodes += 1
+            if self.max_nodes is not None and self.nodes > self.max_nodes:
+                raise SearchLimitError("node limit")
+            self.check_budget()
+            self.depth = level
+            frame.value = frame.values.pop(0)
+
+            pruned = self._pruned_by(frame, stack)
+            if pruned is not None:
+                frame.conflict |= pruned
+                continue
+
+            if self.observer is not None:
+                self.observer.on_event(Event(EventType.BRANCH, row=frame.row, column=frame.column,
+                                             contents=frame.value, depth=self.depth))
+            try:
+                self.board.trail.reason = DECISION
+                self.board.get_cell(column=frame.column, row=frame.row).resolve(frame.value)
+                self.propagate(frame.checkpoint)
+            except NoSolutionError as e:
+                levels = self._explain(self.scope(e.constraint) if e.constraint else None, stack)
+                if level not in levels:
+                    # The failure didn't depend on this guess, so every other value
+                    # would fail the same way
+                    frame.values = []
+                frame.conflict |= levels - {level}
+                continue
+            if self._known_dead():
+                # Nothing is known about which guesses got the board here
+                frame.conflict.update(range(1, level))
+                continue
+            return True
+        return False
+
+    def check_budget(self) -> None:
+        """
+        Gives up if the deadline has passed, and reports progress when it's due. Cheap
+        enough to call after every rule, and free when neither is asked for.
+
+        :raises SearchLimitError: once the deadline has passed
+        """
+        if self.deadline is None and self.on_progress is None:
+            return
+        now = monotonic()
+        if self.deadline is not None and now >= self.deadline:
+            raise SearchLimitError("deadline")
+        if self.on_progress is not None and now >= self._next_progress:
+            self._next_progress = now + PROGRESS_INTERVAL
+            self.on_progress(self.progress())
+
+    def progress(self) -> Progress:
+        cells = list(self.board.enumerate_cells())
+        return Progress(resolved=sum(cell.resolved for cell in cells), cells=len(cells), nodes=self.nodes,
+                        depth=len(self._stack), seconds=monotonic() - self._started)
+
+    def rewind(self) -> None:
+        """
+        Undoes every guess, leaving the board with only what was deduced before the
+        first of them. Meant for after the search has given up.
+        """
+        if self._stack:
+            self.board.rollback(self._stack[0].checkpoint)
+            self._stack.clear()
+
+    def _known_dead(self) -> bool:
+        state = self.board.trail.zobrist
+        if state in self.transpositions:
+            self.transpositions.used(state)
+            return True
+        return False
+
+    def split_off(self) -> list[list[Literal]]:
+        """
+        Gives away the values not tried yet for the shallowest guess that has any, for
+        another search to take on. That guess can't be learnt from any more, since it
+        is no longer tried in full here.
+
+        :return: For each value given away, the guesses from the top of the search that
+            lead to it, ending with the value itself
+        """
+        for i, frame in enumerate(self._stack):
+            if frame.values:
+                path = [(f.row, f.column, f.value) for f in self._stack[:i]]
+                given = [path + [(frame.row, frame.column, value)] for value in frame.values]
+                frame.values = []
+                frame.proven = False
+                return given
+        return []
+
+    def _backtrack(self, stack: list[_Frame]) -> None:
+        """
+        Pops a frame that has run out of values, and jumps back to the most recent
+        guess its failures depended on.
+        """
+        frame = stack.pop()
+        self.backtracks += 1
+        if self.observer is not None:
+            self.observer.on_event(Event(EventType.BACKTRACK, depth=len(stack)))
+        if not frame.proven:
+            if stack:
+                stack[-1].proven = False
+            return
+
+        self.transpositions.add(frame.state)
+        if len(frame.conflict) <= self.max_nogood_size:
+            self.nogoods.add(frozenset((stack[l - 1].row, stack[l - 1].column, stack[l - 1].value)
+                                       for l in frame.conflict))
+        if not frame.conflict:
+            # Fails whatever was guessed before it
+            stack.clear()
+            return
+
+        target = max(frame.conflict)
+        while len(stack) > target:
+            # Fails too, as it still has every guess the failure depended on
+            jumped = stack.pop()
+            if jumped.proven:
+                self.transpositions.add(jumped.state)
+            self.backjumps += 1
+        stack[-1].conflict |= frame.conflict - {target}
+
+    def _pruned_by(self, frame: _Frame, stack: list[_Frame]) -> Optional[set[int]]:
+        """
+        Checks the value about to be tried against the nogoods.
+        :return: The levels of the guesses that led to the cells the matching nogood
+            needs, or None if no nogood rules the value out
+        """
+        for nogood in self.nogoods.containing((frame.row, frame.column, frame.value)):
+            others = [(r, c, value) for r, c, value in nogood if (r, c) != (frame.row, frame.column)]
+            if all(self.board.get_cell(column=c, row=r).contents == value for r, c, value in others):
+                self.nogoods.used(nogood)
+                return self._explain([(r, c) for r, c, _ in others], stack)
+        return None
+
+    def _explain(self, positions: Optional[list[tuple[int, int]]], stack: list[_Frame]) -> set[int]:
+        """
+        Works out which guesses the current state of some cells follows from, by
+        following the reasons on the trail back to guesses.
+
+        :param positions: The cells, or None for the whole board
+        :return: The levels of the guesses, from 1 for the bottom of the stack
+        """
+        if positions is None or not stack:
+            return set(range(1, len(stack) + 1))
+
+        # One pass back along the trail: a change matters if a cell it touched was
+        # needed by the failure, or by a later change that matters
+        checkpoints = [frame.checkpoint for frame in stack]
+        reasons = self.board.trail.reasons
+        needed = set(positions)
+        levels = set()
+        for entry in range(len(reasons) - 1, checkpoints[0] - 1, -1):
+            if self.board.entry_position(entry) not in needed:
+                continue
+            level = bisect_right(checkpoints, entry)
+            reason = reasons[entry]
+            if reason == DECISION:
+                levels.add(level)
+                continue
+            scope = self.scope(reason)
+            if scope is None:
+                # Everything up to here, which is everything still to come
+                levels.update(range(1, level + 1))
+                break
+            needed.update(scope)
+        return levels
+
+    def _is_resolved(self) -> bool:
+        return all(cell.resolved for cell in self.board.enumerate_cells())
+
+    def _slack(self, cells: list[Cell], wall_count: int) -> int:
+        """
+        How far a line is from being forced: the smaller of the walls it still needs
+        and the open cells it still needs.
+        """
+        placed = len([c for c in cells if c.contents == CellType.WALL])
+        placeable = len([c for c in cells if not c.resolved and CellType.WALL in c.candidates])
+        remaining = wall_count - placed
+        return min(remaining, placeable - remaining)
+
+    def choose_cell(self) -> tuple[int, int]:
+        """
+        Picks the unresolved cell with the fewest candidates, breaking ties by the
+        slack of the tightest line through it, or the other way round when
+        :attr:`branching` is ``"tightest"``.
+        :return: The (row, column) of the cell
+        """
+        best = None
+        best_key = None
+        ties = 0
+        for key, position in self._cell_keys():
+            if best_key is None or key < best_key:
+                best, best_key, ties = position, key, 1
+            elif key == best_key and self.rng is not None:
+                # Each of the cells tied so far is as likely as the others to be kept
+                ties += 1
+                if self.rng.randrange(ties) == 0:
+                    best = position
+        return best
+
+    def rank_cells(self) -> list[tuple[int, int]]:
+        """
+        Every unresolved cell, in the order :meth:`choose_cell` prefers them.
+        :return: The (row, column) of each cell
+        """
+        return [position for _, position in sorted(self._cell_keys())]
+
+    def _cell_keys(self) -> Iterator[tuple[tuple[int, int], tuple[int, int]]]:
+        """
+        Yields how constrained each unresolved cell is, as a key that sorts the most
+        constrained first, along with its (row, column), in reading order.
+        """
+        row_slack = [self._slack(self.board.get_row(r), self.board.get_wall_count(row=r))
+                     for r in range(self.board.height)]
+        column_slack = [self._slack(self.board.get_column(c), self.board.get_wall_count(column=c))
+                        for c in range(self.board.width)]
+        for r in range(self.board.height):
+            for c in range(self.board.width):
+                cell = self.board.get_cell(column=c, row=r)
+                if cell.resolved:
+                    continue
+                if self.branching == "tightest":
+                    yield (min(row_slack[r], column_slack[c]), len(cell.candidates)), (r, c)
+                else:
+                    yield (len(cell.candidates), min(row_slack[r], column_slack[c])), (r, c)
+
+    def order_values(self, cell: Cell) -> list[CellType]:
+        values = [t for t in BRANCH_ORDER if t in cell.candidates]
+        if self.rng is not None:
+            self.rng.shuffle(values)
+        return values
@@ -0,0 +1,244 @@
+"""
+A long-running solving service, over HTTP on localhost.
+
+Puzzles are posted in the text format of :meth:`Board.load`, and solved on a bounded
+pool of worker processes that stay up between requests::
+
+    python src/service.py --port 8080 --workers 4
+    curl --data-binary @tests/testdata/input_hard.txt 'localhost:8080/solve?timeout=5'
+    curl localhost:8080/metrics
+
+The reply to ``POST /solve`` is the JSON result of :func:`batch.solve_puzzle`.
+Requests for a puzzle that is already being solved wait for that solve rather than
+starting another. Every request has a deadline, counted from when it arrives: a worker
+that gets to a puzzle after its deadline skips it, and one still solving at the
+deadline gives up. ``GET /metrics`` reports the number of requests in flight, the queue
+depth and recent latencies.
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from batch import solve_puzzle
+
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_MAX_QUEUE = 1000
+LATENCY_WINDOW = 1000
+"""How many of the most recent requests the latency metrics cover."""
+
+GRACE_SECONDS = 1.0
+"""How long past a deadline to wait for a worker to report that it gave up."""
+
+STATUS_CODES = {"timeout": 504, "error": 400}
+"""The HTTP status for a solve's status, where it isn't 200."""
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class ServiceBusy(Exception):
+    pass
+
+
+def _solve_before(maze: str, deadline: float) -> dict:
+    """
+    Solves a puzzle in a worker process, giving up at ``deadline`` (wall clock time).
+    """
+    remaining = deadline - time.time()
+    if remaining <= 0:
+        return {"source": "request", "comment": None, "status": "timeout", "solution": None, "seconds": 0.0}
+    return solve_puzzle("request", maze, remaining)
+
+
+def _key(maze: str) -> str:
+    """
+    The puzzle with the layout evened out, so the same puzzle sent twice is seen as one.
+    """
+    return "\n".join(" ".join(line.split()) for line in maze.strip().splitlines())
+
+
+class SolveService:
+    """
+    Solves puzzles on a process pool, for any number of concurrent callers.
+    """
+    workers: int
+    max_queue: int
+    default_timeout: float
+    requests: int
+    coalesced: int
+    """Requests that waited on a solve already running for the same puzzle."""
+    timeouts: int
+    rejected: int
+
+    def __init__(self, *, workers: int = None, max_queue: int = DEFAULT_MAX_QUEUE,
+                 default_timeout: float = DEFAULT_TIMEOUT):
+        """
+        :param workers: Worker processes to solve on (default: one per core).
+        :param max_queue: Turn requests away once this many solves are waiting for a
+            worker.
+        :param default_timeout: Seconds allowed for requests that don't give a timeout.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        self.default_timeout = default_timeout
+        self.requests = 0
+        self.coalesced = 0
+        self.timeouts = 0
+        self.rejected = 0
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        # Start the workers up front, so the first request doesn't wait for them, and
+        # so they aren't forked holding a client's connection open
+        self._pool.submit(int).result()
+        self._solving: dict[str, asyncio.Future] = {}
+        self._latencies: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    @property
+    def queue_depth(self) -> int:
+        """
+        Solves waiting for a worker to be free.
+        """
+        return max(len(self._solving) - self.workers, 0)
+
+    async def solve(self, maze: str, timeout: float = None) -> dict:
+        """
+        Solves a puzzle, or waits for the solve of the same puzzle already running.
+
+        :param timeout: Seconds from now to give up at. A request that joins a solve
+            already running keeps to that solve's deadline too.
+        :raises ServiceBusy: if the queue is full
+        """
+        start = time.perf_counter()
+        self.requests += 1
+        key = _key(maze)
+        solving = self._solving.get(key)
+        if solving is not None:
+            self.coalesced += 1
+        else:
+            if self.queue_depth >= self.max_queue:
+                self.rejected += 1
+                raise ServiceBusy()
+            deadline = time.time() + (self.default_timeout if timeout is None else timeout)
+            solving = asyncio.get_running_loop().run_in_executor(self._pool, _solve_before, maze, deadline)
+            self._solving[key] = solving
+            solving.add_done_callback(lambda _: self._solving.pop(key, None))
+
+        wait = self.default_timeout if timeout is None else timeout
+        try:
+            # Shielded, so one caller giving up doesn't cancel the solve for the others
+            result = dict(await asyncio.wait_for(asyncio.shield(solving), wait + GRACE_SECONDS))
+        except asyncio.TimeoutError:
+            result = {"source": "request", "comment": None, "status": "timeout", "solution": None}
+        if result["status"] == "timeout":
+            self.timeouts += 1
+        result["seconds"] = round(time.perf_counter() - start, 6)
+        self._latencies.append(result["seconds"])
+        return result
+
+    def metrics(self) -> dict:
+        latencies = sorted(self._latencies)
+        return {
+            "requests": self.requests,
+            "coalesced": self.coalesced,
+            "timeouts": self.timeouts,
+            "rejected": self.rejected,
+            "in_flight": len(self._solving),
+            "queue_depth": self.queue_depth,
+            "workers": self.workers,
+            "latency": {
+                "count": len(latencies),
+                "mean": round(statistics.fmean(latencies), 6) if latencies else None,
+                "p50": latencies[len(latencies) // 2] if latencies else None,
+                "p95": latencies[int(len(latencies) * 0.95)] if latencies else None,
+                "max": latencies[-1] if latencies else None,
+            },
+        }
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Serves one HTTP request on a connection, then closes it.
+        """
+        try:
+            status, body = await self._respond(reader)
+        except (ValueError, asyncio.IncompleteReadError):
+            status, body = 400, {"error": "bad request"}
+        payload = json.dumps(body).encode()
+        writer.write(f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                     f"Content-Type: application/json\r\n"
+                     f"Content-Length: {len(payload)}\r\n"
+                     f"Connection: close\r\n\r\n".encode() + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _respond(self, reader: asyncio.StreamReader) -> tuple[int, dict]:
+        method, target, _ = (await reader.readline()).decode("latin-1").split(" ", 2)
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+        url = urlsplit(target)
+        if url.path == "/metrics" and method == "GET":
+            return 200, self.metrics()
+        if url.path == "/solve" and method == "POST":
+            query = parse_qs(url.query)
+            timeout = float(query["timeout"][0]) if "timeout" in query else None
+            try:
+                result = await self.solve(body.decode("utf-8"), timeout)
+            except ServiceBusy:
+                return 503, {"error": "too many puzzles queued"}
+            return STATUS_CODES.get(result["status"], 200), result
+        return 404, {"error": "not found"}
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8080) -> asyncio.Server:
+        """
+        Starts listening. The port the server ended up on is in its ``sockets``.
+        """
+        return await asyncio.start_server(self.handle, host, port)
+
+    def close(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(args) -> None:
+    service = SolveService(workers=args.workers, max_queue=args.max_queue, default_timeout=args.timeout)
+    server = await service.serve(args.host, args.port)
+    print(f"Listening on {args.host}:{server.sockets[0].getsockname()[1]}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve the solver over HTTP on localhost.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default: 127.0.0.1)")
+    parser.add_argument("-p", "--port", type=int, default=8080, help="port to listen on (default: 8080)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: one per core)")
+    parser.add_argument("-t", "--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"seconds allowed per request that doesn't give its own (default: {DEFAULT_TIMEOUT})")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE,
+                        help="turn requests away once this many puzzles are waiting for a worker")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,187 @@
+"""
+An on-disk cache of solutions, shared by every rotation and reflection of a puzzle.
+
+A puzzle is put in canonical form by trying all eight ways of turning and flipping it,
+wall counts included, and keeping the one that sorts first. The cache is keyed by a
+hash of that form, so a puzzle seen before in any orientation is answered straight from
+the store, and the solution turned back to match. The store is SQLite, and holds at most
+``max_entries`` solutions, forgetting the least recently used first.
+"""
+import hashlib
+import sqlite3
+from dataclasses import dataclass
+from functools import cache
+from typing import Optional
+
+from board import Board
+from cell import SYMBOL_TYPES, CellType
+from errors import NoSolutionError
+from solver import Solver
+
+DEFAULT_MAX_ENTRIES = 100000
+
+
+@dataclass(frozen=True)
+class Orientation:
+    """
+    One of the eight ways of turning and flipping a board: the rows and columns are
+    reversed as given, then swapped over if ``transpose`` is set.
+    """
+    flip_rows: bool
+    flip_columns: bool
+    transpose: bool
+
+    @cache
+    def source(self, width: int, height: int) -> tuple[int, ...]:
+        """
+        For each cell index of the turned board, the index of the original cell it
+        comes from.
+        """
+        new_height, new_width = (width, height) if self.transpose else (height, width)
+        indices = []
+        for r in range(new_height):
+            for c in range(new_width):
+                row, column = (c, r) if self.transpose else (r, c)
+                if self.flip_rows:
+                    row = height - 1 - row
+                if self.flip_columns:
+                    column = width - 1 - column
+                indices.append(row * width + column)
+        return tuple(indices)
+
+    def counts(self, rows: list[int], columns: list[int]) -> tuple[list[int], list[int]]:
+        """
+        The row and column wall counts of the turned board.
+        """
+        rows = rows[::-1] if self.flip_rows else list(rows)
+        columns = columns[::-1] if self.flip_columns else list(columns)
+        return (columns, rows) if self.transpose else (rows, columns)
+
+
+ORIENTATIONS = tuple(Orientation(flip_rows, flip_columns, transpose)
+                     for transpose in (False, True) for flip_rows in (False, True) for flip_columns in (False, True))
+
+
+def _symbol(cell) -> str:
+    """
+    The cell as it was given: resolved, or ``_`` if it can only be a wall or floor.
+    """
+    if cell.resolved:
+        return str(cell)
+    if cell.candidates == {CellType.FLOOR, CellType.WALL}:
+        return "_"
+    return "?"
+
+
+@dataclass(frozen=True)
+class CanonicalForm:
+    key: str
+    """Hash of the puzzle in canonical orientation."""
+    orientation: Orientation
+    """How the puzzle was turned to get there."""
+
+
+def canonicalize(board: Board) -> CanonicalForm:
+    """
+    Finds the orientation of a freshly loaded board that sorts first.
+    """
+    cells = [_symbol(cell) for cell in board.enumerate_cells()]
+    best = None
+    for orientation in ORIENTATIONS:
+        rows, columns = orientation.counts(board.wall_counts_rows, board.wall_counts_columns)
+        text = " ".join(map(str, rows)) + "|" + " ".join(map(str, columns)) + "|" + \
+            "".join(cells[i] for i in orientation.source(board.width, board.height))
+        if best is None or text < best[0]:
+            best = (text, orientation)
+    text, orientation = best
+    return CanonicalForm(hashlib.sha256(text.encode()).hexdigest(), orientation)
+
+
+class SolutionCache:
+    """
+    A size-bounded LRU cache of solutions in SQLite, in front of :meth:`Solver.solve`.
+    """
+    max_entries: int
+    hits: int
+    misses: int
+
+    def __init__(self, path: str = ":memory:", max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        :param path: The database file, created if it doesn't exist.
+        """
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._db = sqlite3.connect(path)
+        # Losing the last few entries in a crash is fine for a cache, so don't wait
+        # for the disk on every write
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.execute("PRAGMA synchronous = NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS solutions "
+                         "(key TEXT PRIMARY KEY, solution TEXT, used INTEGER NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS solutions_used ON solutions (used)")
+        self._db.commit()
+        self._clock = self._db.execute("SELECT COALESCE(MAX(used), 0) FROM solutions").fetchone()[0]
+        # Counted once here and kept up to date by _put, since COUNT(*) scans the table
+        self._entries = self._db.execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def solve(self, maze: str, board_type: type[Board] = Board, **kwargs) -> Board:
+        """
+        Solves a puzzle, from the cache if it has been seen before in any orientation.
+        Other arguments are passed on to :class:`Solver`.
+
+        :raises NoSolutionError: if the puzzle has no solution
+        """
+        board = board_type()
+        board.load(maze)
+        form = canonicalize(board)
+        found, solution = self._get(form.key)
+        if found:
+            self.hits += 1
+            if solution is None:
+                raise NoSolutionError()
+            source = form.orientation.source(board.width, board.height)
+            cells = list(board.enumerate_cells())
+            for i, symbol in zip(source, solution):
+                if not cells[i].resolved:
+                    cells[i].resolve(SYMBOL_TYPES[symbol])
+            return board
+
+        self.misses += 1
+        solver = Solver(maze, board_type, **kwargs)
+        try:
+            board = solver.solve()
+        except NoSolutionError:
+            self._put(form.key, None)
+            raise
+        cells = [str(cell) for cell in board.enumerate_cells()]
+        self._put(form.key, "".join(cells[i] for i in form.orientation.source(board.width, board.height)))
+        return board
+
+    def _get(self, key: str) -> tuple[bool, Optional[str]]:
+        row = self._db.execute("SELECT solution FROM solutions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return False, None
+        self._clock += 1
+        self._db.execute("UPDATE solutions SET used = ? WHERE key = ?", (self._clock, key))
+        self._db.commit()
+        return True, row[0]
+
+    def _put(self, key: str, solution: Optional[str]) -> None:
+        self._clock += 1
+        if self._db.execute("SELECT 1 FROM solutions WHERE key = ?", (key,)).fetchone() is None:
+            self._entries += 1
+        self._db.execute("INSERT OR REPLACE INTO solutions (key, solution, used) VALUES (?, ?, ?)",
+                         (key, solution, self._clock))
+        excess = self._entries - self.max_entries
+        if excess > 0:
+            deleted = self._db.execute("DELETE FROM solutions WHERE key IN "
+                                       "(SELECT key FROM solutions ORDER BY used LIMIT ?)", (excess,))
+            self._entries -= deleted.rowcount
+        self._db.commit()
+
+    def __len__(self) -> int:
+        return self._entries
+
+    def close(self) -> None:
+        self._db.close()
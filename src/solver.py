@@ -1,83 +1,397 @@
-from copy import deepcopy
+from time import perf_counter
+from typing import Callable, Optional
 
 from board import Board
 from board_vector import BoardVector
 from cell import CellType
-
-
-class NoSolutionError(Exception):
-    def __init__(self):
-        super().__init__("No solutions found")
+from connectivity import find_separation, neighbor_table
+from errors import NoSolutionError
+from instrumentation import Event, EventType, Observer
+from line_solver import has_placement_table, solve_line
+from nogoods import Literal
+from parallel import parallel_solutions, write_solution
+from propagation import PropagationQueue
+from sat_backend import SatBackend
+from search import Progress, SearchEngine, SearchLimitError
+from trail import DECISION
+from treasure import deduce_rooms
+
+RULE_PRIORITIES = {
+    "monster": 0,
+    "dead_end": 0,
+    "row": 1,
+    "column": 1,
+    "connectivity": 2,
+    "treasure": 2,
+}
+
+BACKENDS = ("native", "sat")
+"""How :meth:`Solver.solve` can go about solving: rules and search, or the SAT solver."""
+
+RULE_NAMES = {
+    "monster": "monsters",
+    "dead_end": "dead_ends",
+    "row": "wall_counts",
+    "column": "wall_counts",
+    "connectivity": "articulation_points",
+    "treasure": "treasure_rooms",
+    "probe": "failed_literals",
+}
+"""The rule each kind of constraint is reported as to an :class:`Observer`."""
+
+PROBE = ("probe",)
+"""The reason recorded for a change made by :meth:`Solver._probe`, which can depend on
+any cell on the board."""
 
 
 class Solver:
     board: Board
-
-    def __init__(self, maze):
-        self.board = Board()
+    engine: SearchEngine
+    observer: Optional[Observer]
+    workers: int
+    probing: bool
+    rule_priorities: dict[str, int]
+    """The order rules are checked in, lowest first. :data:`RULE_PRIORITIES` by default."""
+    probes: int
+    """Values tried by probing."""
+
+    def __init__(self, maze, board_type: type[Board] = Board, *, max_nodes: int = None, max_depth: int = None,
+                 observer: Observer = None, workers: int = 1, probing: bool = True):
+        """
+        :param maze: The puzzle, in the text format read by :meth:`Board.load`.
+        :param board_type: The board implementation to solve on, e.g. :class:`BitBoard`.
+        :param max_nodes: Give up searching after this many guesses.
+        :param max_depth: Don't guess more than this many cells deep.
+        :param observer: Told about every rule, deduction, failure and guess. Solving
+            is silent without one.
+        :param workers: How many processes to search in. With more than one, the native
+            search is split between a pool of worker processes, which don't report to
+            the observer or keep to ``max_depth``, and ``max_nodes`` counts the nodes of
+            every worker together.
+        :param probing: Before guessing, try each value of each unknown cell with the
+            rules alone, and keep what that proves. See :meth:`_probe`.
+        """
+        self.board = board_type()
         self.board.load(maze)
-
-    def solve(self) -> Board:
+        self.observer = observer
+        self.workers = workers
+        self.probing = probing
+        self.rule_priorities = RULE_PRIORITIES
+        self.probes = 0
+        self._scopes = {}
+        self.engine = SearchEngine(self.board, self._propagate_and_probe if probing else self._propagate,
+                                   scope=self._scope, max_nodes=max_nodes, max_depth=max_depth, observer=observer)
+
+    def solve(self, backend: str = "native", *, deadline: float = None, max_nodes: int = None,
+              on_progress: Callable[[Progress], None] = None) -> Board:
         """
         Returns the solution, as a :class:`Board`.
+
+        :param backend: One of :data:`BACKENDS`. The SAT backend counts each conflict
+            as a node, both against ``max_nodes`` and in the engine's ``nodes``, and
+            needs every monster and chest to be given.
+        :param deadline: Give up at this :func:`time.monotonic` time, checked after every
+            rule and before every guess, or every few conflicts by the SAT backend.
+        :param max_nodes: Give up after this many guesses, in place of the limit the
+            solver was made with.
+        :param on_progress: Called every so often with the cells resolved, the nodes
+            searched and the depth of the search. Not called from worker processes.
+        :raises NoSolutionError: if the puzzle has no solution
+        :raises SearchLimitError: if the search hit its deadline, node or depth limit
+            first. Its ``board`` is this solver's board, with everything that was
+            deduced before the first guess, and the guesses undone.
         """
+        if max_nodes is not None:
+            self.engine.max_nodes = max_nodes
+        self.engine.deadline = deadline
+        self.engine.on_progress = on_progress
+        try:
+            if backend == "native" and self.workers > 1:
+                solutions, self.engine.nodes = parallel_solutions(self, self.workers, limit=1)
+                found = bool(solutions)
+                if found:
+                    write_solution(self.board, solutions[0])
+            elif backend == "native":
+                found = self.engine.search()
+            elif backend == "sat":
+                sat = SatBackend(self.board, max_conflicts=self.engine.max_nodes, deadline=deadline)
+                try:
+                    found = sat.solve()
+                finally:
+                    self.engine.nodes = sat.sat.conflicts
+            else:
+                raise ValueError(f"Unknown backend: {backend}")
+        except SearchLimitError as e:
+            self.engine.rewind()
+            e.board = self.board
+            raise
+        if found:
+            return self.board
+        raise NoSolutionError()
 
-        solving = True
-        while solving:
-            if not self.board.is_valid():
-                raise NoSolutionError()
-            if self._is_resolved() and self.board.is_valid():
-                # Solved
-                solving = False
+    def count(self, limit: int = None) -> int:
+        """
+        Counts the solutions in a single search, stopping as soon as ``limit`` have been
+        found. Deductions made above a guess are shared by every branch below it.
+
+        :raises SearchLimitError: if the search hit its node or depth limit first
+        """
+        if self.workers > 1:
+            solutions, self.engine.nodes = parallel_solutions(self, self.workers, limit=limit)
+            return len(solutions)
+        count = 0
+        for _ in self.engine.solutions():
+            count += 1
+            if limit is not None and count >= limit:
                 break
-            # Apply rules until no resolutions are made from
-            # easier to more complex
-            if self._resolve_wall_counts():
-                print("Resolved wall counts!")
-                print(self.board)
-                continue
-            if self._resolve_floor_in_front_of_monsters():
-                print("Resolved floor in front of monsters!")
-                print(self.board)
-                continue
-            if self._resolve_walls_around_monsters():
-                print("Resolved walls around monsters!")
-                print(self.board)
-                continue
-            if self._resolve_dead_ends_with_no_monsters():
-                print("Resolved dead ends with no monsters!")
-                print(self.board)
-                continue
-            if self._try_most_constrained():
-                continue
-            solving = False
-
-        if self._is_resolved() and self.board.is_valid():
-            return self.board
+        return count
+
+    def is_unique(self) -> bool:
+        """
+        Whether the puzzle has exactly one solution.
+        """
+        return self.count(limit=2) == 1
+
+    def _propagate(self, since: int = None) -> None:
+        """
+        Applies the rules until none of them resolve anything more. Only the
+        constraints touching a cell that has changed are re-checked.
+
+        :param since: Board checkpoint to propagate the changes from, or None to check
+            every constraint on the board.
+        :raises NoSolutionError: if the board is found to be invalid
+        """
+        queue = PropagationQueue(max(self.rule_priorities.values()) + 1)
+        if since is None:
+            for r in range(self.board.height):
+                queue.push(("row", r), self.rule_priorities["row"])
+            for c in range(self.board.width):
+                queue.push(("column", c), self.rule_priorities["column"])
+            queue.push(("connectivity",), self.rule_priorities["connectivity"])
+            queue.push(("treasure",), self.rule_priorities["treasure"])
+            for r in range(self.board.height):
+                for c in range(self.board.width):
+                    self._queue_cell(queue, r, c)
         else:
+            for r, c in self.board.changes_since(since):
+                self._queue_change(queue, r, c)
+
+        constraint = None
+        try:
+            while queue:
+                self.engine.check_budget()
+                constraint = queue.pop()
+                checkpoint = self.board.checkpoint()
+                self.board.trail.reason = constraint
+                if self.observer is None:
+                    fired = self._apply(constraint)
+                else:
+                    fired = self._apply_observed(constraint, checkpoint)
+                if fired:
+                    for r, c in self.board.changes_since(checkpoint):
+                        self._queue_change(queue, r, c)
+        except NoSolutionError:
+            # A rule found a contradiction, or a cell ran out of candidates
+            if self.observer is not None:
+                self.observer.on_event(Event(EventType.VALIDITY_FAILED, rule=RULE_NAMES[constraint[0]],
+                                             reason=RULE_NAMES[constraint[0]]))
+            raise NoSolutionError(constraint)
+
+        reason = self.board.validate()
+        if reason is not None:
+            if self.observer is not None:
+                self.observer.on_event(Event(EventType.VALIDITY_FAILED, reason=reason))
             raise NoSolutionError()
 
-    def _is_resolved(self):
-        for row in range(self.board.height):
-            for column in range(self.board.width):
-                if not self.board.get_cell(column=column, row=row).resolved:
-                    return False
-        return True
+    def _propagate_and_probe(self, since: int = None) -> None:
+        """
+        Propagates, and then probes when starting a search, before the first guess.
+        """
+        self._propagate(since)
+        if since is None:
+            self._probe()
 
-    def _resolve_wall_counts(self) -> bool:
+    def _probe(self) -> bool:
         """
-        Goes through and finds rows/columns where the wall count is equal to the number of
-        walls placed, or the difference between the two is equal to the number of cells left
-        that walls could go.
+        Failed literal probing. Each unknown cell, most constrained first, is set to
+        each of its values in turn and propagated, then rolled back. A value that
+        leads to a contradiction is ruled out, and any cell that comes out the same
+        whichever of the remaining values is tried is resolved to that. Goes round
+        until a pass over every cell proves nothing new.
 
-        :return: true if any cell was resolved, false otherwise
+        A value that an earlier probe led to can't lead to a contradiction itself, as
+        long as nothing has been resolved since, so it isn't tried again. Cells with
+        every value skipped that way are passed over.
+
+        :return: True if any cell was resolved
+        :raises NoSolutionError: if every value of a cell leads to a contradiction
+        """
+        board = self.board
+        resolved = False
+        progress = True
+        while progress:
+            progress = False
+            consistent: set[Literal] = set()
+            for row, column in self.engine.rank_cells():
+                cell = board.get_cell(column=column, row=row)
+                if cell.resolved:
+                    continue
+                values = [v for v in self.engine.order_values(cell) if (row, column, v) not in consistent]
+                if not values:
+                    continue
+                start = perf_counter()
+                failed = []
+                # Cells only agree between values if every value was tried
+                agreed = None if len(values) == len(cell.candidates) else {}
+                for value in values:
+                    self.probes += 1
+                    checkpoint = board.checkpoint()
+                    try:
+                        board.trail.reason = DECISION
+                        cell.resolve(value)
+                        self._propagate(checkpoint)
+                        outcome = {(r, c): board.get_cell(column=c, row=r).contents
+                                   for r, c in board.changes_since(checkpoint)
+                                   if board.get_cell(column=c, row=r).resolved}
+                    except NoSolutionError:
+                        outcome = None
+                    finally:
+                        board.rollback(checkpoint)
+                    if outcome is None:
+                        failed.append(value)
+                        continue
+                    consistent.update((r, c, v) for (r, c), v in outcome.items())
+                    agreed = outcome if agreed is None else {p: v for p, v in agreed.items() if outcome.get(p) == v}
+                if len(failed) == len(cell.candidates):
+                    raise NoSolutionError(PROBE)
+                if not failed and not agreed:
+                    continue
+
+                checkpoint = board.checkpoint()
+                board.trail.reason = PROBE
+                for value in failed:
+                    cell.eliminate(value)
+                for (r, c), value in agreed.items():
+                    forced = board.get_cell(column=c, row=r)
+                    if not forced.resolved:
+                        forced.resolve(value)
+                if self.observer is not None:
+                    self._report_probe(checkpoint, perf_counter() - start)
+                self._propagate(checkpoint)
+                progress = resolved = True
+                consistent.clear()
+        return resolved
+
+    def _report_probe(self, checkpoint: int, seconds: float) -> None:
+        """
+        Reports what probing a cell proved to the observer, as a rule firing.
+        """
+        changes = sorted(self.board.changes_since(checkpoint))
+        rule = RULE_NAMES[PROBE[0]]
+        self.observer.on_event(Event(EventType.RULE_FIRED, rule=rule, changed=len(changes), seconds=seconds))
+        for r, c in changes:
+            self.observer.on_event(Event(EventType.CELL_RESOLVED, rule=rule, row=r, column=c,
+                                         contents=self.board.get_cell(column=c, row=r).contents))
+
+    def _apply_observed(self, constraint: tuple, checkpoint: int) -> bool:
+        """
+        Runs the rule for one queued constraint, and reports it and what it resolved
+        to the observer.
+        """
+        rule = RULE_NAMES[constraint[0]]
+        start = perf_counter()
+        fired = self._apply(constraint)
+        seconds = perf_counter() - start
+        changes = sorted(self.board.changes_since(checkpoint)) if fired else []
+        self.observer.on_event(Event(EventType.RULE_FIRED, rule=rule, changed=len(changes), seconds=seconds))
+        for r, c in changes:
+            self.observer.on_event(Event(EventType.CELL_RESOLVED, rule=rule, row=r, column=c,
+                                         contents=self.board.get_cell(column=c, row=r).contents))
+        return fired
+
+    def _scope(self, constraint: tuple) -> Optional[list[tuple[int, int]]]:
+        """
+        The (row, column) of every cell a constraint's rule looks at, or None if it
+        looks at the whole board. The line solver looks at the lines either side too.
+        """
+        if constraint in self._scopes:
+            return self._scopes[constraint]
+        match constraint:
+            case ("row", r):
+                scope = [(rr, c) for rr in range(max(r - 1, 0), min(r + 2, self.board.height))
+                         for c in range(self.board.width)]
+            case ("column", c):
+                scope = [(r, cc) for r in range(self.board.height)
+                         for cc in range(max(c - 1, 0), min(c + 2, self.board.width))]
+            case ("monster", r, c) | ("dead_end", r, c):
+                scope = [(r, c)] + self._neighbor_positions(r, c)
+            case _:
+                scope = None
+        self._scopes[constraint] = scope
+        return scope
+
+    def _queue_cell(self, queue: PropagationQueue, row: int, column: int) -> None:
         """
-        resolved_a_cell = False
+        Queues the checks centred on one cell.
+        """
+        if self.board.get_cell(column=column, row=row).contents == CellType.MONSTER:
+            queue.push(("monster", row, column), self.rule_priorities["monster"])
+        queue.push(("dead_end", row, column), self.rule_priorities["dead_end"])
 
-        for v in self.board.enumerate_vectors():
-            resolved_a_cell |= self._resolve_wall_count_single(v)
+    def _queue_change(self, queue: PropagationQueue, row: int, column: int) -> None:
+        """
+        Queues every constraint that can see the cell at (row, column). The lines either
+        side of the cell's own row and column are included, since the line solver looks
+        at the cells next to a line.
+        """
+        for r in range(max(row - 1, 0), min(row + 2, self.board.height)):
+            queue.push(("row", r), self.rule_priorities["row"])
+        for c in range(max(column - 1, 0), min(column + 2, self.board.width)):
+            queue.push(("column", c), self.rule_priorities["column"])
+        queue.push(("connectivity",), self.rule_priorities["connectivity"])
+        queue.push(("treasure",), self.rule_priorities["treasure"])
+        self._queue_cell(queue, row, column)
+        for r, c in self._neighbor_positions(row, column):
+            self._queue_cell(queue, r, c)
+
+    def _neighbor_positions(self, row: int, column: int) -> list[tuple[int, int]]:
+        return [
+            (r, c) for r, c in ((row - 1, column), (row + 1, column), (row, column - 1), (row, column + 1))
+            if 0 <= r < self.board.height and 0 <= c < self.board.width
+        ]
+
+    def _apply(self, constraint: tuple) -> bool:
+        """
+        Runs the rule for one queued constraint.
+        :return: True if any cell was resolved
+        """
+        match constraint:
+            case ("row", r):
+                return self._resolve_wall_count(self.board.get_vector(row=r))
+            case ("column", c):
+                return self._resolve_wall_count(self.board.get_vector(column=c))
+            case ("monster", r, c):
+                return self._resolve_floor_in_front_of_monster(r, c) | self._resolve_walls_around_monster(r, c)
+            case ("dead_end", r, c):
+                return self._resolve_dead_end_with_no_monster(r, c)
+            case ("connectivity",):
+                return self._resolve_articulation_points()
+            case ("treasure",):
+                return self._resolve_treasure_rooms()
+        raise ValueError(f"Unknown constraint: {constraint}")
+
+    def _resolve_wall_count(self, v: BoardVector) -> bool:
+        """
+        Resolves the cells of a row or column that all wall placements fitting it agree
+        on. Lines too long to enumerate fall back to finding where the wall count is
+        equal to the number of walls placed, or the difference between the two is equal
+        to the number of cells left that walls could go.
 
-        return resolved_a_cell
+        :return: true if any cell was resolved, false otherwise
+        """
+        if has_placement_table(len(v.cells), v.wall_count):
+            return solve_line(self.board, v)
+        return self._resolve_wall_count_single(v)
 
     def _resolve_wall_count_single(self, v: BoardVector) -> bool:
         """
@@ -103,90 +417,99 @@ class Solver:
                     resolved_cells = True
         return resolved_cells
 
-    def _try_most_constrained(self) -> bool:
-        print("Warning --- I'm trying random stuff now!")
-        backup = deepcopy(self.board)
-
-        for r in range(self.board.height):
-            for c in range(self.board.width):
-                cell = self.board.get_cell(column=c, row=r)
-                if cell.resolved:
-                    continue
-                cell.resolve(CellType.WALL)
-                try:
-                    self.solve()
-                    if self.board.is_valid():
-                        return True
-                except NoSolutionError:
-                    pass  # No biggie, keep trying
-
-                # we messed up, restore
-                print(" --- Reverting and trying something else ---")
-                self.board = deepcopy(backup)
-                print(self.board)
-
-        return False
-
-    def _resolve_floor_in_front_of_monsters(self):
+    def _resolve_floor_in_front_of_monster(self, row: int, column: int) -> bool:
         """
         When all but one of a monster's neighbors are walls, the remaining
         cell must be floor
         """
-        resolved = False
-        for r in range(self.board.height):
-            row = self.board.get_row(r)
-            for c in range(self.board.width):
-                cell = row[c]
-                if cell.contents == CellType.MONSTER:
-                    non_wall_neighbors = [n for n in self.board.get_neighbors(column=c, row=r) if n.contents != CellType.WALL]
-                    if len(non_wall_neighbors) == 1:
-                        non_wall_neighbor = non_wall_neighbors[0]
-                        if not non_wall_neighbor.resolved:
-                            non_wall_neighbor.resolve(CellType.FLOOR)
-                            resolved = True
-        return resolved
+        non_wall_neighbors = [n for n in self.board.get_neighbors(column=column, row=row)
+                              if n.contents != CellType.WALL]
+        if not non_wall_neighbors:
+            # Walled in, with no way out at all
+            raise NoSolutionError()
+        if len(non_wall_neighbors) == 1:
+            non_wall_neighbor = non_wall_neighbors[0]
+            if not non_wall_neighbor.resolved:
+                non_wall_neighbor.resolve(CellType.FLOOR)
+                return True
+        return False
 
-    def _resolve_walls_around_monsters(self):
+    def _resolve_walls_around_monster(self, row: int, column: int) -> bool:
         """
         When there is a floor in front of a monsters, all of its other neighbors must be walls
         """
         resolved = False
-        for r in range(self.board.height):
-            row = self.board.get_row(r)
-            for c in range(self.board.width):
-                cell = row[c]
-                if cell.contents == CellType.MONSTER:
-                    neighbors = self.board.get_neighbors(column=c, row=r)
-                    floor_neighbors = len([n for n in neighbors if n.contents == CellType.FLOOR])
-                    if floor_neighbors == 1:
-                        # All other neighbors are walls
-                        for n in neighbors:
-                            if n.contents == CellType.FLOOR:
-                                continue
-                            if not n.resolved:
-                                n.resolve(CellType.WALL)
-                                resolved = True
-                    elif floor_neighbors > 1:
-                        raise ValueError(f"Invalid state!\n\n{self.board}")
-
+        neighbors = self.board.get_neighbors(column=column, row=row)
+        floor_neighbors = len([n for n in neighbors if n.contents == CellType.FLOOR])
+        if floor_neighbors == 1:
+            # All other neighbors are walls
+            for n in neighbors:
+                if n.contents == CellType.FLOOR:
+                    continue
+                if not n.resolved:
+                    n.resolve(CellType.WALL)
+                    resolved = True
+        elif floor_neighbors > 1:
+            raise NoSolutionError()
         return resolved
 
-    def _resolve_dead_ends_with_no_monsters(self):
+    def _resolve_dead_end_with_no_monster(self, row: int, column: int) -> bool:
         """
         If an unknown cell is at a dead end, it cannot be a floor
         """
-        resolved = False
-        for r in range(self.board.height):
-            row = self.board.get_row(r)
-            for c in range(self.board.width):
-                cell = row[c]
-                if not cell.resolved:
-                    neighbors = self.board.get_neighbors(column=c, row=r)
-                    wall_neighbors = len([n for n in neighbors if n.contents == CellType.WALL])
+        cell = self.board.get_cell(column=column, row=row)
+        if cell.resolved and cell.contents != CellType.FLOOR:
+            return False
+        wall_neighbors, neighbors = self.board.count_wall_neighbors(column=column, row=row)
+        if wall_neighbors < neighbors - 1:
+            return False
+        if cell.resolved:
+            # A floor with one way out is a dead end without a monster
+            raise NoSolutionError()
+        if CellType.FLOOR not in cell.candidates:
+            return False
+        cell.eliminate(CellType.FLOOR)
+        return True
 
-                    if wall_neighbors == len(neighbors) - 1:
-                        cell.resolve(CellType.WALL)
-                        resolved = True
+    def _resolve_articulation_points(self) -> bool:
+        """
+        If an unknown cell becoming a wall would cut known open cells off from each
+        other, it must be open. Unknown cells that can't reach any known open cell
+        at all must be walls.
+        """
+        cells = list(self.board.enumerate_cells())
+        is_open = bytearray(c.contents != CellType.WALL for c in cells)
+        is_known = bytearray(CellType.WALL not in c.candidates for c in cells)
+        separation = find_separation(is_open, is_known, neighbor_table(self.board.width, self.board.height))
+        if separation.disconnected:
+            raise NoSolutionError()
+
+        for index in separation.cut_cells:
+            cells[index].eliminate(CellType.WALL)
+        for index in separation.stranded_cells:
+            cells[index].resolve(CellType.WALL)
+        return bool(separation.cut_cells or separation.stranded_cells)
+
+    def _resolve_treasure_rooms(self) -> bool:
+        """
+        Resolves the cells that every room placement left for each chest agrees on,
+        including the walls around a room whose exit is known, and walls off any cell
+        that would open up a 2x2 area outside of a room.
+        """
+        deductions = deduce_rooms(self.board)
+        resolved = False
+        for r, c in sorted(deductions.open):
+            cell = self.board.get_cell(column=c, row=r)
+            if CellType.WALL in cell.candidates:
+                cell.eliminate(CellType.WALL)
+                resolved = True
+        for r, c in sorted(deductions.walls):
+            cell = self.board.get_cell(column=c, row=r)
+            if not cell.resolved:
+                cell.resolve(CellType.WALL)
+                resolved = True
+            elif cell.contents != CellType.WALL:
+                raise NoSolutionError()
         return resolved
 
 
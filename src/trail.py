@@ -0,0 +1,57 @@
+DECISION = ("decision",)
+"""The reason recorded for a change made by a search guess, rather than deduced."""
+
+
+class Trail:
+    """
+    An undo journal for a board. Before a cell changes, it pushes the object that owns
+    the change along with the state needed to put it back, so a search can return to
+    any earlier :meth:`mark` in time proportional to the changes made since.
+
+    Every entry also records the :attr:`reason` in effect when it was pushed: the
+    constraint whose rule made the change, :data:`DECISION` for a guess, or None.
+
+    The trail also carries the board's :attr:`zobrist` hash, which the owners update as
+    they change, and which is put back along with them on rollback.
+    """
+    entries: list[tuple[object, object]]
+    reasons: list[tuple]
+    reason: tuple
+    zobrist: int
+    hashes: list[int]
+    """The hash before each entry's change."""
+
+    def __init__(self):
+        self.entries = []
+        self.reasons = []
+        self.reason = None
+        self.zobrist = 0
+        self.hashes = []
+
+    def push(self, owner, state) -> None:
+        """
+        Records that ``owner`` is about to change. On rollback, ``owner.undo(state)``
+        is called.
+        """
+        self.entries.append((owner, state))
+        self.reasons.append(self.reason)
+        self.hashes.append(self.zobrist)
+
+    def mark(self) -> int:
+        return len(self.entries)
+
+    def rollback(self, mark: int) -> None:
+        """
+        Undoes every change recorded since ``mark``, most recent first.
+        """
+        entries = self.entries
+        while len(entries) > mark:
+            owner, state = entries.pop()
+            owner.undo(state)
+        if mark < len(self.hashes):
+            self.zobrist = self.hashes[mark]
+        del self.reasons[mark:]
+        del self.hashes[mark:]
+
+    def __len__(self) -> int:
+        return len(self.entries)
@@ -0,0 +1,172 @@
+"""
+Treasure rooms.
+
+Every chest sits in a 3x3 room of open cells with exactly one exit: of the cells
+orthogonally next to the room, just one is open. Outside of treasure rooms, hallways
+are one cell wide, so any 2x2 block of open cells has to be part of a room.
+"""
+from dataclasses import dataclass, field
+from functools import cache
+
+from board import Board
+from cell import CellType
+from errors import NoSolutionError
+
+ROOM_SIZE = 3
+
+
+@dataclass(frozen=True)
+class RoomPlacement:
+    """
+    One position a 3x3 treasure room could be in.
+    """
+    top: int
+    left: int
+    interior: tuple[tuple[int, int], ...]
+    """The (row, column) of the nine cells of the room."""
+    perimeter: tuple[tuple[int, int], ...]
+    """The (row, column) of the on-board cells next to the room, one of which is its exit."""
+
+    def contains(self, row: int, column: int) -> bool:
+        return self.top <= row < self.top + ROOM_SIZE and self.left <= column < self.left + ROOM_SIZE
+
+
+@cache
+def room_placements(width: int, height: int, row: int, column: int) -> tuple[RoomPlacement, ...]:
+    """
+    Every placement of a room on a ``width`` by ``height`` board that contains the cell
+    at (row, column). Built once per board size and cell, and shared between puzzles.
+    """
+    placements = []
+    for top in range(max(row - ROOM_SIZE + 1, 0), min(row, height - ROOM_SIZE) + 1):
+        for left in range(max(column - ROOM_SIZE + 1, 0), min(column, width - ROOM_SIZE) + 1):
+            interior = tuple((top + r, left + c) for r in range(ROOM_SIZE) for c in range(ROOM_SIZE))
+            perimeter = []
+            for i in range(ROOM_SIZE):
+                perimeter += [(top - 1, left + i), (top + ROOM_SIZE, left + i),
+                              (top + i, left - 1), (top + i, left + ROOM_SIZE)]
+            perimeter = tuple((r, c) for r, c in perimeter if 0 <= r < height and 0 <= c < width)
+            placements.append(RoomPlacement(top, left, interior, perimeter))
+    return tuple(placements)
+
+
+@dataclass
+class RoomDeductions:
+    """
+    Cells that every surviving room placement agrees on.
+    """
+    open: set[tuple[int, int]] = field(default_factory=set)
+    walls: set[tuple[int, int]] = field(default_factory=set)
+
+
+def _fits(board: Board, placement: RoomPlacement, chest: tuple[int, int]) -> bool:
+    """
+    Whether a room for ``chest`` could go at ``placement`` given what is already known.
+    """
+    for r, c in placement.interior:
+        cell = board.get_cell(column=c, row=r)
+        if cell.contents in (CellType.WALL, CellType.MONSTER):
+            return False
+        if cell.contents == CellType.CHEST and (r, c) != chest:
+            return False
+
+    # The rows and columns through the room still need room for their walls
+    for r in range(placement.top, placement.top + ROOM_SIZE):
+        placeable = len([c for c in range(board.width)
+                         if not placement.contains(r, c)
+                         and CellType.WALL in board.get_cell(column=c, row=r).candidates])
+        if placeable < board.get_wall_count(row=r):
+            return False
+    for c in range(placement.left, placement.left + ROOM_SIZE):
+        placeable = len([r for r in range(board.height)
+                         if not placement.contains(r, c)
+                         and CellType.WALL in board.get_cell(column=c, row=r).candidates])
+        if placeable < board.get_wall_count(column=c):
+            return False
+
+    # Exactly one exit
+    perimeter = [board.get_cell(column=c, row=r) for r, c in placement.perimeter]
+    known_open = len([p for p in perimeter if CellType.WALL not in p.candidates])
+    could_be_open = len([p for p in perimeter if p.contents != CellType.WALL])
+    return known_open <= 1 and could_be_open >= 1
+
+
+def _placement_deductions(board: Board, placement: RoomPlacement) -> RoomDeductions:
+    """
+    The cells a room at ``placement`` would force.
+    """
+    deductions = RoomDeductions(open=set(placement.interior))
+    perimeter = [(p, board.get_cell(column=p[1], row=p[0])) for p in placement.perimeter]
+    exits = [p for p, cell in perimeter if CellType.WALL not in cell.candidates]
+    if not exits:
+        exits = [p for p, cell in perimeter if cell.contents != CellType.WALL]
+    if len(exits) == 1:
+        deductions.open.add(exits[0])
+        deductions.walls = {p for p, _ in perimeter if p != exits[0]}
+    return deductions
+
+
+def find_rooms(board: Board) -> dict[tuple[int, int], list[RoomPlacement]]:
+    """
+    For every known chest, the room placements that still fit.
+
+    :raises NoSolutionError: if some chest has nowhere left for its room
+    """
+    rooms = {}
+    for r in range(board.height):
+        for c in range(board.width):
+            if board.get_cell(column=c, row=r).contents != CellType.CHEST:
+                continue
+            fitting = [p for p in room_placements(board.width, board.height, r, c) if _fits(board, p, (r, c))]
+            if not fitting:
+                raise NoSolutionError()
+            rooms[(r, c)] = fitting
+    return rooms
+
+
+def deduce_rooms(board: Board) -> RoomDeductions:
+    """
+    Works out which cells are forced by the treasure rooms, and by the rule that
+    hallways outside of them are one cell wide.
+
+    :raises NoSolutionError: if the rooms or hallways can't be satisfied
+    """
+    rooms = find_rooms(board)
+
+    deductions = RoomDeductions()
+    for placements in rooms.values():
+        agreed = None
+        for placement in placements:
+            forced = _placement_deductions(board, placement)
+            if agreed is None:
+                agreed = forced
+            else:
+                agreed.open &= forced.open
+                agreed.walls &= forced.walls
+        deductions.open |= agreed.open
+        deductions.walls |= agreed.walls
+
+    # Hidden chests could put a room anywhere, so hallways can only be checked once
+    # every chest is known
+    if any(CellType.CHEST in cell.candidates and not cell.resolved for cell in board.enumerate_cells()):
+        return deductions
+
+    all_placements = [p for placements in rooms.values() for p in placements]
+    for r in range(board.height - 1):
+        for c in range(board.width - 1):
+            window = [((wr, wc), board.get_cell(column=wc, row=wr))
+                      for wr, wc in ((r, c), (r, c + 1), (r + 1, c), (r + 1, c + 1))]
+            if any(cell.contents == CellType.WALL for _, cell in window):
+                continue
+            if any(p.contains(r, c) and p.contains(r + 1, c + 1) for p in all_placements):
+                continue
+            unknown = [position for position, cell in window if CellType.WALL in cell.candidates]
+            if not unknown:
+                # A 2x2 open area with no room to be part of
+                raise NoSolutionError()
+            if len(unknown) == 1:
+                deductions.walls.add(unknown[0])
+
+    if deductions.open & deductions.walls:
+        raise NoSolutionError()
+    return deductions
@@ -0,0 +1,64 @@
+"""
+Zobrist hashing of board states, and a table of states proven to have no solution.
+
+Every (cell, candidate) pair gets a fixed random 64-bit key, and a board's hash is the
+XOR of the keys of every candidate still open on every cell. Removing or putting back a
+candidate is one XOR, so the hash is kept up to date as cells change, and two boards
+with the same candidates left everywhere hash the same however they got there.
+"""
+import random
+from collections import OrderedDict
+from functools import cache
+
+from cell import CellType
+
+ZOBRIST_SEED = 0x5EED
+DEFAULT_CAPACITY = 100000
+
+ZobristKeys = dict[CellType, int]
+
+
+@cache
+def zobrist_keys(size: int) -> tuple[ZobristKeys, ...]:
+    """
+    The keys for a board of ``size`` cells, by cell index. The same cell index always
+    gets the same keys, whatever the size of the board.
+    """
+    rng = random.Random(ZOBRIST_SEED)
+    return tuple({t: rng.getrandbits(64) for t in (CellType.FLOOR, CellType.WALL, CellType.MONSTER, CellType.CHEST)}
+                 for _ in range(size))
+
+
+class TranspositionTable:
+    """
+    A bounded set of board hashes that have been searched exhaustively without finding
+    a solution. When full, the state that has gone longest without being met again is
+    forgotten first.
+    """
+    capacity: int
+    hits: int
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self.hits = 0
+        self._states: OrderedDict[int, None] = OrderedDict()
+
+    def add(self, state: int) -> None:
+        if state in self._states or not self.capacity:
+            return
+        while len(self._states) >= self.capacity:
+            self._states.popitem(last=False)
+        self._states[state] = None
+
+    def used(self, state: int) -> None:
+        """
+        Notes that a state was just met again, so it is kept for longer.
+        """
+        self.hits += 1
+        self._states.move_to_end(state)
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def __contains__(self, state: int) -> bool:
+        return state in self._states
@@ -0,0 +1,25 @@
+import os
+from typing import Callable
+
+from pytest import fixture
+
+from generator import generate_puzzles
+
+
+@fixture(scope="session")
+def read() -> Callable[[str], str]:
+    """
+    Reads a puzzle from the test data by file name.
+    """
+    def read(filename: str) -> str:
+        with open(os.path.join("testdata", filename), "r") as f:
+            return f.read()
+    return read
+
+
+@fixture(scope="session")
+def generated_maze() -> str:
+    """
+    A generated 10x10 puzzle with a treasure room, which takes some search to solve.
+    """
+    return list(generate_puzzles(10, 10, count=4, seed=3, rooms=1))[-1]
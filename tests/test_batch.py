@@ -0,0 +1,46 @@
+import io
+import json
+import os
+
+from batch import main, read_inputs, solve_puzzle, split_puzzles
+
+
+class TestBatch:
+    def test_split_puzzles(self, read):
+        text = read("input_simple.txt") + "\n" + read("input_tutorial.txt")
+        puzzles = list(split_puzzles(text))
+        assert len(puzzles) == 2
+        assert puzzles[0].strip().startswith("// No chests")
+        assert puzzles[1].strip().startswith("// Tutorial level")
+
+    def test_split_puzzles_without_comments(self):
+        text = "* 0 1\n0 _ _\n1 _ m\n* 1 0\n1 _ _\n0 _ _\n"
+        assert len(list(split_puzzles(text))) == 2
+
+    def test_read_inputs(self, read):
+        puzzles = list(read_inputs([os.path.join("testdata", "input_*.txt")]))
+        assert [os.path.basename(source) for source, _ in puzzles] == [
+            "input_1_1.txt", "input_hard.txt", "input_simple.txt", "input_tutorial.txt",
+        ]
+
+        stdin = io.StringIO(read("input_simple.txt") + "\n" + read("input_hard.txt"))
+        assert [source for source, _ in read_inputs(["-"], stdin)] == ["<stdin>:0", "<stdin>:1"]
+
+    def test_solve_puzzle(self, read):
+        result = solve_puzzle("simple", read("input_simple.txt"))
+        assert result["status"] == "solved"
+        assert result["comment"] == "No chests"
+        assert result["solution"] == ["_ _ _ _", "_ # # m", "_ _ _ #", "m # _ m"]
+
+        assert solve_puzzle("invalid", read("invalid_wall_count.txt"))["status"] == "no_solution"
+
+    def test_timeout(self, read):
+        result = solve_puzzle("hard", read("input_hard.txt"), timeout=0.00001)
+        assert result["status"] == "timeout"
+        assert len(result["partial"]) == 8
+
+    def test_main(self, capsys):
+        assert main([os.path.join("testdata", "input_*.txt"), "--workers", "2", "--timeout", "30"]) == 0
+        results = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert len(results) == 4
+        assert all(r["status"] == "solved" for r in results)
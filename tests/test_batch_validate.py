@@ -0,0 +1,66 @@
+import os
+import random
+
+import pytest
+
+from board import Board
+from cell import CellType
+from generator import format_puzzle, generate_dungeon
+
+np = pytest.importorskip("numpy")
+
+from batch_validate import board_arrays, validate_boards  # noqa: E402
+
+
+class TestBatchValidate:
+    def load_solved(self, filename: str) -> Board:
+        with open(os.path.join("testdata", filename), "r") as f:
+            board = Board()
+            board.load(f.read())
+            for c in board.enumerate_cells():
+                if len(c.candidates) == 2:
+                    c.resolve(CellType.FLOOR)
+            return board
+
+    def test_reasons(self):
+        names = ["valid.txt", "invalid_wall_count.txt", "deadend_no_monster.txt", "monster_no_deadend.txt",
+                 "non_contiguous.txt"]
+        for name in names:
+            board = self.load_solved(name)
+            valid, reasons = validate_boards(*board_arrays([board]))
+            assert reasons[0] == (board.validate() or "")
+            assert valid[0] == board.is_valid()
+
+    def test_matches_board(self):
+        rng = random.Random(1)
+        boards = []
+        for _ in range(300):
+            cells = generate_dungeon(6, 6, rooms=1, rng=rng)
+            for _ in range(rng.choice([0, 1, 2])):
+                cells[rng.randrange(6)][rng.randrange(6)] = rng.choice([CellType.WALL, CellType.FLOOR, CellType.MONSTER])
+            board = Board()
+            board.load(format_puzzle(cells, solved=True))
+            for r, row in enumerate(cells):
+                for c, contents in enumerate(row):
+                    if rng.random() < 0.95:
+                        board.get_cell(column=c, row=r).resolve(contents)
+            boards.append(board)
+
+        valid, reasons = validate_boards(*board_arrays(boards))
+        expected = [board.validate() or "" for board in boards]
+        assert list(reasons) == expected
+        assert list(valid) == [reason == "" for reason in expected]
+        assert {"", "dnm", "mnd", "nc"} <= set(expected)
+
+    def test_shared_counts(self):
+        cells = np.full((3, 2, 3), CellType.FLOOR.value)
+        cells[1, 0, 0] = CellType.WALL.value
+        cells[2, :, 1] = CellType.WALL.value
+        valid, reasons = validate_boards(cells, [0, 0], [0, 0, 0])
+        assert list(valid) == [True, False, False]
+        assert list(reasons) == ["", "wcc", "wcc"]
+
+        split = np.full((1, 2, 5), CellType.FLOOR.value)
+        split[0, :, 2] = CellType.WALL.value
+        valid, reasons = validate_boards(split, [1, 1], [0, 0, 2, 0, 0])
+        assert list(reasons) == ["nc"]
@@ -0,0 +1,48 @@
+import os
+from pytest import raises
+
+from benchmark import benchmark_puzzle, find_regressions, load_baseline, main, save_baseline
+
+
+class TestBenchmark:
+    def test_benchmark_puzzle(self, read):
+        result = benchmark_puzzle("hard", read("input_hard.txt"), repeat=1)
+        assert result["status"] == "solved"
+        assert result["seconds"] > 0
+        assert result["nodes"] >= 0
+        assert result["rules"]["wall_counts"]["checks"] > 0
+
+    def test_sat_counts_conflicts(self, read):
+        result = benchmark_puzzle("hard", read("input_hard.txt"), repeat=1, backend="sat")
+        assert result["status"] == "solved"
+        assert result["nodes"] > 0
+
+    def test_repeat_at_least_once(self, read):
+        with raises(ValueError):
+            benchmark_puzzle("simple", read("input_simple.txt"), repeat=0)
+        with raises(SystemExit):
+            main([os.path.join("testdata", "input_simple.txt"), "-r", "0"])
+
+    def test_baseline_round_trip(self, read, tmp_path):
+        results = [benchmark_puzzle("simple", read("input_simple.txt"), repeat=1)]
+        path = str(tmp_path / "baseline.json")
+        save_baseline(path, results)
+        baseline = load_baseline(path)
+        assert baseline["simple"] == results[0]
+        assert find_regressions(results, baseline) == []
+
+    def test_regressions(self):
+        before = {"status": "solved", "seconds": 0.1, "nodes": 10, "backtracks": 0, "rules": {}}
+        baseline = {"p": before}
+        assert find_regressions([{**before, "seconds": 0.12, "source": "p"}], baseline) == []
+        assert len(find_regressions([{**before, "seconds": 0.5, "source": "p"}], baseline)) == 1
+        assert len(find_regressions([{**before, "nodes": 100, "source": "p"}], baseline)) == 1
+        assert len(find_regressions([{**before, "status": "gave_up", "source": "p"}], baseline)) == 1
+        assert find_regressions([{**before, "seconds": 9.0, "source": "new"}], baseline) == []
+
+    def test_main(self, tmp_path, capsys):
+        path = str(tmp_path / "baseline.json")
+        puzzle = os.path.join("testdata", "input_tutorial.txt")
+        assert main([puzzle, "--repeat", "1", "--save", path]) == 0
+        assert main([puzzle, "--repeat", "1", "--baseline", path, "--threshold", "1000"]) == 0
+        assert "wall_counts" in capsys.readouterr().out
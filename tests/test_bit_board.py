@@ -0,0 +1,140 @@
+import os
+from pytest import fixture
+from bit_board import BitBoard
+from board import Board
+from cell import CellType
+from line_solver import _line_masks, _line_masks_from_bits
+
+
+class TestBitBoard:
+    @fixture
+    def board(self) -> BitBoard:
+        return BitBoard()
+
+    @fixture
+    def maze(self) -> str:
+        with open(os.path.join("testdata", "input_hard.txt"), "r") as f:
+            return f.read()
+
+    def load_solved(self, filename: str) -> BitBoard:
+        with open(os.path.join("testdata", filename), "r") as f:
+            board = BitBoard()
+            board.load(f.read())
+            for c in board.enumerate_cells():
+                if len(c.candidates) == 2:
+                    c.resolve(CellType.FLOOR)
+            return board
+
+    def test_load(self, board: BitBoard, maze: str):
+        board.load(maze)
+
+        assert board.width == 8
+        assert board.height == 8
+
+        assert board.get_wall_count(column=1) == 6
+        assert board.get_wall_count(row=2) == 5
+        cell = board.get_cell(column=3, row=0)
+
+        assert cell.resolved
+        assert cell.contents == CellType.MONSTER
+        assert board.monsters & (1 << 3)
+
+        cell = board.get_cell(column=7, row=3)
+        assert not cell.resolved
+        assert board.unknowns & (1 << (3 * 8 + 7))
+
+    def test_get_row(self, board: BitBoard, maze: str):
+        board.load(maze)
+        row = board.get_row(7)
+        assert len(row) == 8
+        assert row[3].contents == CellType.MONSTER
+
+    def test_get_column(self, board: BitBoard, maze: str):
+        board.load(maze)
+        column = board.get_column(0)
+        assert len(column) == 8
+        assert column[0].contents == CellType.MONSTER
+        assert column[4].contents == CellType.MONSTER
+        assert column[6].contents == CellType.MONSTER
+
+    def test_cell_view(self, board: BitBoard, maze: str):
+        board.load(maze)
+        cell = board.get_cell(column=1, row=1)
+        assert cell.candidates == {CellType.FLOOR, CellType.WALL}
+
+        cell.eliminate(CellType.FLOOR)
+        assert cell.resolved
+        assert cell.contents == CellType.WALL
+        assert board.get_cell(column=1, row=1).contents == CellType.WALL
+        assert board.walls == 1 << 9
+
+    def test_shifts(self, board: BitBoard, maze: str):
+        board.load(maze)
+        middle = 1 << (2 * 8 + 3)
+        assert board.shift_up(middle) == 1 << (1 * 8 + 3)
+        assert board.shift_down(middle) == 1 << (3 * 8 + 3)
+        assert board.shift_left(middle) == 1 << (2 * 8 + 2)
+        assert board.shift_right(middle) == 1 << (2 * 8 + 4)
+
+        # Nothing wraps around the edges
+        assert board.shift_left(board.column_mask(0)) == 0
+        assert board.shift_right(board.column_mask(7)) == 0
+        assert board.shift_up(board.row_mask(0)) == 0
+        assert board.shift_down(board.row_mask(7)) == 0
+
+    def test_reload(self):
+        solved_board = self.load_solved("valid.txt")
+        assert solved_board.get_cell(column=0, row=0).contents == CellType.WALL
+        solved_board.get_cell(column=0, row=0).resolve(CellType.FLOOR)
+        assert solved_board.get_cell(column=0, row=0).contents == CellType.FLOOR
+        solved_board.reload()
+        assert solved_board.get_cell(column=0, row=0).contents == CellType.WALL
+
+    def test_str(self):
+        with open(os.path.join("testdata", "valid.txt"), "r") as f:
+            maze = f.read()
+        board = BitBoard()
+        board.load(maze)
+        assert "│ 3 │ # # # ? ? c │" in str(board)
+
+    def test_rollback(self, board: BitBoard, maze: str):
+        board.load(maze)
+        assert len(board.trail) == 0
+        checkpoint = board.checkpoint()
+        board.get_cell(column=1, row=1).resolve(CellType.WALL)
+        board.get_cell(column=2, row=1).eliminate(CellType.WALL)
+        assert board.get_cell(column=2, row=1).contents == CellType.FLOOR
+
+        board.rollback(checkpoint)
+        assert board.unknowns & (1 << 9)
+        assert not board.get_cell(column=1, row=1).resolved
+        assert not board.get_cell(column=2, row=1).resolved
+        assert board.get_cell(column=2, row=1).candidates == {CellType.FLOOR, CellType.WALL}
+        assert len(board.trail) == 0
+
+    def test_is_valid(self):
+        assert self.load_solved("valid.txt").is_valid()
+        assert self.load_solved("unknown_wall_count.txt").is_valid()
+        assert self.load_solved("monster_no_deadend_unknown.txt").is_valid()
+
+        assert not self.load_solved("invalid_wall_count.txt").is_valid()
+        assert not self.load_solved("non_contiguous.txt").is_valid()
+        assert not self.load_solved("deadend_no_monster.txt").is_valid()
+        assert not self.load_solved("monster_no_deadend.txt").is_valid()
+
+    def test_is_valid_with_unknowns(self):
+        assert self.load_solved("incomplete.txt").is_valid()
+
+    def test_line_masks(self, board: BitBoard, maze: str):
+        board.load(maze)
+        plain = Board()
+        plain.load(maze)
+        for b in (board, plain):
+            b.get_cell(column=1, row=1).resolve(CellType.WALL)
+            b.get_cell(column=2, row=1).eliminate(CellType.WALL)
+            b.get_cell(column=1, row=2).resolve(CellType.FLOOR)
+        for vector, plain_vector in zip(board.enumerate_vectors(), plain.enumerate_vectors()):
+            assert _line_masks_from_bits(board, vector) == _line_masks(plain, plain_vector)
+        for r in range(8):
+            for c in range(8):
+                assert board.count_wall_neighbors(column=c, row=r) == plain.count_wall_neighbors(column=c, row=r)
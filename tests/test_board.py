@@ -39,6 +39,15 @@ class TestBoard:
         cell = board.get_cell(column=7, row=3)
         assert not cell.resolved
 
+    def test_load_column_counts_without_spaces(self, board: Board):
+        board.load("* 12\n1 ??\n2 ??\n")
+        assert board.wall_counts_columns == [1, 2]
+
+        # A single column with a two-digit count is one count, not one per digit
+        board.load("* 12\n" + "".join(f"{int(r < 12)} ?\n" for r in range(19)))
+        assert (board.width, board.height) == (1, 19)
+        assert board.wall_counts_columns == [12]
+
     def test_get_row(self, board: Board, maze: str):
         board.load(maze)
         row = board.get_row(7)
@@ -61,6 +70,20 @@ class TestBoard:
         solved_board.reload()
         assert solved_board.get_cell(column=0, row=0).contents == CellType.WALL
 
+    def test_rollback(self, board: Board, maze: str):
+        board.load(maze)
+        assert len(board.trail) == 0
+        checkpoint = board.checkpoint()
+        board.get_cell(column=1, row=1).resolve(CellType.WALL)
+        board.get_cell(column=2, row=1).eliminate(CellType.WALL)
+        assert board.get_cell(column=2, row=1).contents == CellType.FLOOR
+
+        board.rollback(checkpoint)
+        assert not board.get_cell(column=1, row=1).resolved
+        assert not board.get_cell(column=2, row=1).resolved
+        assert board.get_cell(column=2, row=1).candidates == {CellType.FLOOR, CellType.WALL}
+        assert len(board.trail) == 0
+
     def test_is_valid(self):
         assert self.load_solved("valid.txt").is_valid()
         assert self.load_solved("unknown_wall_count.txt").is_valid()
@@ -0,0 +1,64 @@
+import itertools
+import random
+import time
+
+from cdcl import CDCLSolver, luby
+
+
+class TestCDCL:
+    def brute_force(self, num_vars: int, clauses: list[list[int]]) -> bool:
+        for values in itertools.product((False, True), repeat=num_vars):
+            if all(any(values[abs(lit) - 1] == (lit > 0) for lit in clause) for clause in clauses):
+                return True
+        return False
+
+    def test_luby(self):
+        assert [luby(i) for i in range(1, 16)] == [1, 1, 2, 1, 1, 2, 4, 1, 1, 2, 1, 1, 2, 4, 8]
+
+    def test_random_formulas(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            num_vars = rng.randint(3, 10)
+            clauses = [[rng.choice((1, -1)) * v for v in rng.sample(range(1, num_vars + 1), 3)]
+                       for _ in range(rng.randint(1, num_vars * 5))]
+            sat = CDCLSolver()
+            for _ in range(num_vars):
+                sat.new_var()
+            for clause in clauses:
+                sat.add_clause(clause)
+            found = sat.solve()
+            assert found == self.brute_force(num_vars, clauses)
+            if found:
+                assert all(any(sat.model[abs(lit)] == (lit > 0) for lit in clause) for clause in clauses)
+
+    def test_pigeonhole(self):
+        sat = CDCLSolver()
+        holes = {(p, h): sat.new_var() for p in range(5) for h in range(4)}
+        for p in range(5):
+            sat.add_clause([holes[p, h] for h in range(4)])
+        for h in range(4):
+            for a, b in itertools.combinations(range(5), 2):
+                sat.add_clause([-holes[a, h], -holes[b, h]])
+        assert sat.solve() is False
+
+    def test_incremental(self):
+        sat = CDCLSolver()
+        a, b = sat.new_var(), sat.new_var()
+        sat.add_clause([a, b])
+        assert sat.solve()
+        sat.add_clause([-a])
+        assert sat.solve()
+        assert sat.model[b] and not sat.model[a]
+        sat.add_clause([-b])
+        assert sat.solve() is False
+
+    def test_conflict_limit(self):
+        sat = CDCLSolver()
+        holes = {(p, h): sat.new_var() for p in range(8) for h in range(7)}
+        for p in range(8):
+            sat.add_clause([holes[p, h] for h in range(7)])
+        for h in range(7):
+            for a, b in itertools.combinations(range(8), 2):
+                sat.add_clause([-holes[a, h], -holes[b, h]])
+        assert sat.solve(max_conflicts=10) is None
+        assert sat.solve(deadline=time.monotonic()) is None
@@ -1,5 +1,7 @@
 from pytest import raises
 from cell import Cell, CellType
+from errors import NoCandidatesError
+from trail import Trail
 
 
 class TestCell:
@@ -45,5 +47,21 @@ class TestCell:
         cell.resolve(CellType.FLOOR)
         cell.eliminate(CellType.MONSTER)  # Shouldn't complain
 
-        with raises(ValueError):
+        with raises(NoCandidatesError):
             cell.eliminate(CellType.FLOOR)
+
+    def test_trail(self):
+        cell = Cell()
+        cell.trail = Trail()
+        cell.eliminate(CellType.MONSTER)
+        mark = cell.trail.mark()
+        cell.eliminate(CellType.CHEST)
+        cell.resolve(CellType.WALL)
+        assert len(cell.trail) == 3
+
+        cell.trail.rollback(mark)
+        assert not cell.resolved
+        assert cell.candidates == {CellType.FLOOR, CellType.WALL, CellType.CHEST}
+
+        cell.trail.rollback(0)
+        assert CellType.MONSTER in cell.candidates
@@ -0,0 +1,79 @@
+from connectivity import Connectivity, find_separation, flood_fill, neighbor_table, open_flags
+
+
+class TestConnectivity:
+    def test_neighbor_table(self):
+        table = neighbor_table(3, 2)
+        assert sorted(table[0]) == [1, 3]
+        assert sorted(table[4]) == [1, 3, 5]
+        assert neighbor_table(3, 2) is table
+
+    def test_flood_fill(self):
+        # . # .
+        # . # .
+        walls = (1 << 1) | (1 << 4)
+        reached = flood_fill(open_flags(walls, 6), 0, neighbor_table(3, 2))
+        assert list(reached) == [1, 0, 0, 1, 0, 0]
+
+    def test_non_walls_reachable(self):
+        connectivity = Connectivity(3, 2)
+        assert connectivity.non_walls_reachable(0) == 6
+        assert connectivity.non_walls_reachable((1 << 1) | (1 << 4)) == 2
+        assert connectivity.non_walls_reachable((1 << 6) - 1) == 0
+
+    def test_reruns_only_when_walls_change(self, monkeypatch):
+        connectivity = Connectivity(3, 2)
+        fills = []
+        fill = connectivity._fill
+        monkeypatch.setattr(connectivity, "_fill", lambda walls: fills.append(walls) or fill(walls))
+
+        connectivity.non_walls_reachable(1 << 1)
+        connectivity.non_walls_reachable(1 << 1)
+        assert len(fills) == 1
+        connectivity.non_walls_reachable((1 << 1) | (1 << 4))
+        assert len(fills) == 2
+
+    def test_large_board(self):
+        # A single corridor snaking through every row, far deeper than the recursion limit
+        width, height = 100, 100
+        walls = 0
+        for r in range(1, height, 2):
+            gap = width - 1 if r % 4 == 1 else 0
+            for c in range(width):
+                if c != gap:
+                    walls |= 1 << (r * width + c)
+        open_cells = width * height - walls.bit_count()
+        assert Connectivity(width, height).non_walls_reachable(walls) == open_cells
+
+    def test_cut_cells(self):
+        # k . . . k  -- every cell between the two known cells holds them together
+        is_open = bytearray([1] * 5)
+        is_known = bytearray([1, 0, 0, 0, 1])
+        separation = find_separation(is_open, is_known, neighbor_table(5, 1))
+        assert not separation.disconnected
+        assert separation.cut_cells == [1, 2, 3]
+        assert separation.stranded_cells == []
+
+    def test_cut_cells_around_a_loop(self):
+        # k . .
+        # . # .
+        # . . k  -- two ways round, so no single cell is essential
+        is_open = bytearray([1, 1, 1, 1, 0, 1, 1, 1, 1])
+        is_known = bytearray([1, 0, 0, 0, 0, 0, 0, 0, 1])
+        separation = find_separation(is_open, is_known, neighbor_table(3, 3))
+        assert separation.cut_cells == []
+
+    def test_stranded_cells(self):
+        # k # .
+        # . # .
+        is_open = bytearray([1, 0, 1, 1, 0, 1])
+        is_known = bytearray([1, 0, 0, 0, 0, 0])
+        separation = find_separation(is_open, is_known, neighbor_table(3, 2))
+        assert not separation.disconnected
+        assert separation.stranded_cells == [2, 5]
+
+    def test_disconnected(self):
+        # k # k
+        is_open = bytearray([1, 0, 1])
+        is_known = bytearray([1, 0, 1])
+        assert find_separation(is_open, is_known, neighbor_table(3, 1)).disconnected
@@ -0,0 +1,90 @@
+import glob
+import os
+
+from pytest import raises
+
+from batch import read_inputs
+from bit_board import BitBoard
+from board import Board
+from corpus import _HEADER, MAGIC, VERSION, Corpus, decode_puzzle, encode_puzzle, iter_puzzles, read_boards, write_corpus
+
+
+class TestCorpus:
+    def all_puzzles(self, read) -> list[str]:
+        return [read(os.path.basename(path)) for path in sorted(glob.glob(os.path.join("testdata", "*.txt")))]
+
+    def same_puzzle(self, first: str, second: str) -> bool:
+        a, b = Board(), Board()
+        a.load(first)
+        b.load(second)
+        return str(a) == str(b) and a.comment == b.comment and \
+            [c.candidates for c in a.enumerate_cells()] == [c.candidates for c in b.enumerate_cells()]
+
+    def test_iter_puzzles_streams(self, read):
+        text = read("input_simple.txt") + "\n" + read("input_tutorial.txt")
+        consumed = []
+
+        def lines():
+            for line in text.split("\n"):
+                consumed.append(line)
+                yield line + "\n"
+
+        puzzles = iter_puzzles(lines())
+        first = next(puzzles)
+        assert first.startswith("// No chests")
+        # Only as far as the start of the next puzzle
+        assert consumed[-1].startswith("// Tutorial level")
+        assert len(list(puzzles)) == 1
+
+    def test_round_trip(self, read):
+        for maze in self.all_puzzles(read):
+            record = encode_puzzle(maze)
+            assert self.same_puzzle(decode_puzzle(record), maze)
+
+    def test_cell_bits(self, read):
+        # 8x8 puzzle: 5 bytes of header, comment, 16 counts, 2 bits for each of 64 cells
+        maze = read("input_hard.txt")
+        assert len(encode_puzzle(maze)) == 5 + len("62840382") + 16 + 16
+        # A ? cell needs 3 bits for every cell
+        maze = read("incomplete.txt")
+        assert len(encode_puzzle(maze)) == 5 + len("Incomplete") + 12 + (36 * 3 + 7) // 8
+
+    def test_random_access(self, read, tmp_path):
+        puzzles = self.all_puzzles(read)
+        path = str(tmp_path / "puzzles.ddc")
+        with open(path, "wb") as f:
+            assert write_corpus(f, puzzles) == len(puzzles)
+
+        with Corpus(path) as corpus:
+            assert len(corpus) == len(puzzles)
+            for i in reversed(range(len(puzzles))):
+                assert self.same_puzzle(corpus[i], puzzles[i])
+            assert isinstance(corpus.board(3, BitBoard), BitBoard)
+            with raises(IndexError):
+                corpus[len(puzzles)]
+
+    def test_read_boards(self, read, tmp_path):
+        puzzles = self.all_puzzles(read)
+        text_path = tmp_path / "puzzles.txt"
+        text_path.write_text("\n".join(puzzles))
+        corpus_path = str(tmp_path / "puzzles.ddc")
+        with open(corpus_path, "wb") as f:
+            write_corpus(f, puzzles)
+
+        for path in (str(text_path), corpus_path):
+            boards = list(read_boards(path))
+            assert len(boards) == len(puzzles)
+            assert all(self.same_puzzle(board.source, maze) for board, maze in zip(boards, puzzles))
+
+    def test_read_inputs(self, read, tmp_path):
+        path = str(tmp_path / "puzzles.ddc")
+        with open(path, "wb") as f:
+            write_corpus(f, [read("input_simple.txt"), read("input_hard.txt")])
+        assert [source for source, _ in read_inputs([path])] == [f"{path}:0", f"{path}:1"]
+
+    def test_not_a_corpus(self, tmp_path):
+        path = tmp_path / "puzzles.ddc"
+        for contents in (b"\0" * 32, b"", MAGIC[:3], _HEADER.pack(MAGIC, VERSION, 10, 0)):
+            path.write_bytes(contents)
+            with raises(ValueError, match="Not a puzzle corpus"):
+                Corpus(str(path))
@@ -0,0 +1,55 @@
+import random
+from pytest import raises
+
+from board import Board
+from cell import CellType
+from generator import format_puzzle, generate_dungeon, generate_puzzles, main
+from solver import Solver
+
+
+class TestGenerator:
+    def test_dungeon_is_valid(self):
+        rng = random.Random(1)
+        for _ in range(20):
+            cells = generate_dungeon(8, 8, rooms=1, rng=rng)
+            board = Board()
+            board.load(format_puzzle(cells, solved=True))
+            for r, row in enumerate(cells):
+                for c, contents in enumerate(row):
+                    assert board.get_cell(column=c, row=r).contents in (contents, CellType.UNKNOWN)
+                    board.get_cell(column=c, row=r).resolve(contents)
+            assert board.is_valid()
+
+    def test_puzzles_solve(self):
+        for maze in generate_puzzles(8, 8, count=5, seed=2, rooms=1):
+            assert Solver(maze).solve().is_valid()
+
+    def test_seed_is_reproducible(self):
+        assert list(generate_puzzles(8, 6, count=3, seed=5)) == list(generate_puzzles(8, 6, count=3, seed=5))
+        assert list(generate_puzzles(8, 6, count=3, seed=5)) != list(generate_puzzles(8, 6, count=3, seed=6))
+
+    def test_large_counts_load(self):
+        maze = next(generate_puzzles(16, 12, count=1, seed=3, rooms=2))
+        board = Board()
+        board.load(maze)
+        assert board.width == 16
+        assert board.height == 12
+        assert max(board.wall_counts_rows + board.wall_counts_columns) >= 10
+
+    def test_unique(self):
+        for maze in generate_puzzles(6, 6, count=3, seed=4, unique=True, max_nodes=1000):
+            assert Solver(maze).count() == 1
+
+    def test_degenerate_sizes(self):
+        for width, height in ((1, 1), (1, 2), (0, 5), (5, -1)):
+            with raises(ValueError):
+                generate_dungeon(width, height)
+            with raises(ValueError):
+                next(generate_puzzles(width, height))
+        with raises(ValueError):
+            generate_dungeon(8, 8, rooms=-1)
+        with raises(SystemExit):
+            main(["1", "1"])
+        # The smallest boards that can hold a dungeon still get one
+        assert next(generate_puzzles(1, 3, seed=1))
+        assert next(generate_puzzles(2, 2, seed=1))
@@ -0,0 +1,152 @@
+from pytest import raises
+
+from cell import CellType
+from errors import NoSolutionError
+from hints import HintEngine
+from solver import Solver
+from trail import DECISION
+
+
+class TestHints:
+    def test_first_hint(self, read):
+        engine = HintEngine(read("input_simple.txt"))
+        hint = engine.hint()
+        assert hint.rule == "wall_counts"
+        assert (hint.row, hint.column, hint.contents) == (0, 0, CellType.FLOOR)
+        # Only given cells have been resolved before it
+        for r, c in hint.antecedents:
+            assert engine.board.get_cell(column=c, row=r).contents == CellType.MONSTER
+
+    def test_follow_hints(self, read):
+        maze = read("input_hard.txt")
+        solution = Solver(maze).solve()
+        engine = HintEngine(maze)
+
+        def follow():
+            while (hint := engine.hint()) is not None:
+                assert solution.get_cell(column=hint.column, row=hint.row).contents == hint.contents
+                engine.set(hint.row, hint.column, hint.contents)
+
+        follow()
+        unknown = [(r, c) for r in range(8) for c in range(8) if not engine.board.get_cell(column=c, row=r).resolved]
+        assert unknown
+        # The rules are stuck until the player makes a move of their own
+        r, c = unknown[0]
+        engine.set(r, c, solution.get_cell(column=c, row=r).contents)
+        follow()
+        assert all(cell.resolved for cell in engine.board.enumerate_cells())
+        assert engine.board.is_valid()
+
+    def test_contradiction(self, read):
+        engine = HintEngine(read("input_simple.txt"))
+        hint = engine.hint()
+        state = engine.board.trail.zobrist
+        with raises(NoSolutionError):
+            engine.set(hint.row, hint.column, CellType.WALL)
+        assert engine.placed == {}
+        assert engine.board.trail.zobrist == state
+        assert engine.hint() == hint
+
+    def test_clear_and_undo(self, read):
+        maze = read("input_hard.txt")
+        solution = Solver(maze).solve()
+        engine = HintEngine(maze)
+        start = engine.board.trail.zobrist
+        first = engine.hint()
+
+        moves = [(r, c) for r in range(8) for c in range(8) if not engine.board.get_cell(column=c, row=r).resolved]
+        for r, c in moves[:5]:
+            engine.set(r, c, solution.get_cell(column=c, row=r).contents)
+        after = engine.board.trail.zobrist
+
+        # Clearing the first move keeps the others, and what follows from them
+        r, c = moves[0]
+        engine.clear(r, c)
+        assert (r, c) not in engine.placed
+        assert len(engine.placed) == 4
+        with raises(KeyError):
+            engine.clear(r, c)
+
+        assert engine.undo()
+        assert engine.placed[(r, c)] == solution.get_cell(column=c, row=r).contents
+        assert engine.board.trail.zobrist == after
+
+        while engine.undo():
+            pass
+        assert engine.placed == {}
+        assert engine.board.trail.zobrist == start
+        assert engine.hint() == first
+
+    def test_clear_keeps_later_cells(self, read):
+        maze = read("input_hard.txt")
+        solution = Solver(maze).solve()
+        engine = HintEngine(maze)
+        (r1, c1), (r2, c2) = [(r, c) for r in range(8) for c in range(8)
+                              if not engine.board.get_cell(column=c, row=r).resolved][:2]
+        engine.set(r1, c1, solution.get_cell(column=c1, row=r1).contents)
+        engine.set(r2, c2, solution.get_cell(column=c2, row=r2).contents)
+        placed = engine.placed
+        state = engine.board.trail.zobrist
+
+        # A rule that only finds the second cell contradictory while the first is unset
+        propagate = engine.solver.engine.propagate
+        board = engine.board
+
+        def stricter(checkpoint):
+            propagate(checkpoint)
+            if not any(board.trail.reasons[e] == DECISION and board.entry_position(e) == (r1, c1)
+                       for e in range(len(board.trail))):
+                raise NoSolutionError()
+        engine.solver.engine.propagate = stricter
+
+        with raises(NoSolutionError):
+            engine.clear(r1, c1)
+        assert engine.placed == placed
+        assert engine.board.trail.zobrist == state
+        with raises(NoSolutionError):
+            engine.set(r1, c1, CellType.CHEST)
+        assert engine.placed == placed
+        assert engine.board.trail.zobrist == state
+
+    def test_not_a_candidate(self, read):
+        engine = HintEngine(read("input_hard.txt"))
+        r, c = next((r, c) for r in range(8) for c in range(8) if not engine.board.get_cell(column=c, row=r).resolved)
+        assert CellType.CHEST not in engine.board.get_cell(column=c, row=r).candidates
+        state = engine.board.trail.zobrist
+        with raises(NoSolutionError):
+            engine.set(r, c, CellType.CHEST)
+        assert engine.placed == {}
+        assert engine.board.trail.zobrist == state
+        with raises(ValueError):
+            engine.set(r, c, CellType.UNKNOWN)
+
+    def test_failed_undo_can_be_tried_again(self, read):
+        maze = read("input_hard.txt")
+        solution = Solver(maze).solve()
+        engine = HintEngine(maze)
+        r, c = next((r, c) for r in range(8) for c in range(8) if not engine.board.get_cell(column=c, row=r).resolved)
+        engine.set(r, c, solution.get_cell(column=c, row=r).contents)
+        engine.clear(r, c)
+        state = engine.board.trail.zobrist
+
+        # A rule that won't have the cell back
+        propagate = engine.solver.engine.propagate
+        board = engine.board
+
+        def stricter(checkpoint):
+            propagate(checkpoint)
+            if board.get_cell(column=c, row=r).resolved:
+                raise NoSolutionError()
+        engine.solver.engine.propagate = stricter
+
+        with raises(NoSolutionError):
+            engine.undo()
+        assert engine.placed == {}
+        assert engine.board.trail.zobrist == state
+
+        engine.solver.engine.propagate = propagate
+        assert engine.undo()
+        assert (r, c) in engine.placed
+        assert engine.undo()
+        assert engine.placed == {}
+        assert not engine.undo()
@@ -0,0 +1,57 @@
+from board import Board
+from cell import CellType
+from instrumentation import CountingObserver, Event, EventType, Observer
+from solver import Solver
+
+
+class RecordingObserver(Observer):
+    def __init__(self):
+        self.events: list[Event] = []
+
+    def on_event(self, event: Event) -> None:
+        self.events.append(event)
+
+
+class TestInstrumentation:
+    def load_solved(self, read, filename: str) -> Board:
+        board = Board()
+        board.load(read(filename))
+        for c in board.enumerate_cells():
+            if len(c.candidates) == 2:
+                c.resolve(CellType.FLOOR)
+        return board
+
+    def test_solve_is_silent(self, read, capsys):
+        Solver(read("input_hard.txt")).solve()
+        assert capsys.readouterr().out == ""
+
+    def test_counts_rules(self, read):
+        observer = CountingObserver()
+        Solver(read("input_hard.txt"), observer=observer).solve()
+        assert observer.rules["wall_counts"].checks > 0
+        assert observer.rules["wall_counts"].fires > 0
+        resolved = sum(counter.cells for counter in observer.rules.values())
+        assert resolved == observer.events[EventType.CELL_RESOLVED]
+
+    def test_reports_branches(self, read):
+        observer = RecordingObserver()
+        solver = Solver(read("input_hard.txt"), observer=observer)
+        solver.solve()
+        branches = [e for e in observer.events if e.type == EventType.BRANCH]
+        assert len(branches) == solver.engine.nodes
+        assert all(e.row is not None and e.column is not None for e in branches)
+
+    def test_resolved_cells_have_contents(self, read):
+        observer = RecordingObserver()
+        Solver(read("input_1_1.txt"), observer=observer).solve()
+        resolved = [e for e in observer.events if e.type == EventType.CELL_RESOLVED]
+        assert resolved
+        assert all(e.rule for e in resolved)
+
+    def test_validate_reasons(self, read):
+        assert self.load_solved(read, "valid.txt").validate() is None
+        assert self.load_solved(read, "invalid_wall_count.txt").validate() == "wcc"
+        assert self.load_solved(read, "deadend_no_monster.txt").validate() == "dnm"
+        assert self.load_solved(read, "monster_no_deadend.txt").validate() == "mnd"
+        # Its stray floor is a dead end too, which is caught first
+        assert self.load_solved(read, "non_contiguous.txt").validate() == "dnm"
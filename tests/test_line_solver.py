@@ -0,0 +1,53 @@
+from pytest import raises
+
+from board import Board
+from cell import CellType
+from errors import NoSolutionError
+from line_solver import has_placement_table, placements, solve_line
+
+
+class TestLineSolver:
+    def load(self, maze: str) -> Board:
+        board = Board()
+        board.load(maze)
+        return board
+
+    def test_placements(self):
+        assert placements(4, 0) == (0,)
+        assert len(placements(8, 3)) == 56
+        assert all(p.bit_count() == 3 for p in placements(8, 3))
+        assert placements(8, 3) is placements(8, 3)
+
+    def test_has_placement_table(self):
+        assert has_placement_table(8, 4)
+        assert has_placement_table(16, 8)
+        assert not has_placement_table(32, 16)
+        assert not has_placement_table(4, 5)
+
+    def test_forces_agreed_cells(self):
+        # Two of the three unknowns in row 1 are walls, and the wall count alone can't
+        # say which. Boxed in from above and below, the monster needs the cell next to
+        # it open, which leaves the other two as walls.
+        board = self.load("""
+        * 1 1 1 1
+        3 # _ # #
+        2 m _ _ _
+        4 # # # #
+        """)
+        row = next(v for v in board.enumerate_vectors() if v.row == 1)
+        assert solve_line(board, row)
+        assert [c.contents for c in board.get_row(1)] == [
+            CellType.MONSTER, CellType.FLOOR, CellType.WALL, CellType.WALL,
+        ]
+
+    def test_no_fit(self):
+        board = self.load("""
+        * 1 1 1 1
+        4 _ m _ _
+        0 _ _ _ _
+        0 _ _ _ _
+        0 _ _ _ _
+        """)
+        row = next(board.enumerate_vectors())
+        with raises(NoSolutionError):
+            solve_line(board, row)
@@ -0,0 +1,28 @@
+from cell import CellType
+from nogoods import NogoodStore
+
+
+class TestNogoods:
+    def test_containing(self):
+        store = NogoodStore()
+        nogood = frozenset({(0, 0, CellType.WALL), (1, 1, CellType.FLOOR)})
+        store.add(nogood)
+        assert list(store.containing((0, 0, CellType.WALL))) == [nogood]
+        assert list(store.containing((0, 0, CellType.FLOOR))) == []
+        assert nogood in store
+        assert len(store) == 1
+
+    def test_eviction(self):
+        store = NogoodStore(capacity=2)
+        first = frozenset({(0, 0, CellType.WALL)})
+        second = frozenset({(0, 1, CellType.WALL)})
+        third = frozenset({(0, 2, CellType.WALL)})
+        store.add(first)
+        store.add(second)
+        store.used(first)
+        store.add(third)
+        assert first in store
+        assert second not in store
+        assert third in store
+        assert list(store.containing((0, 1, CellType.WALL))) == []
+        assert store.hits == 1
@@ -0,0 +1,48 @@
+from pytest import raises
+
+import parallel
+from generator import generate_puzzles
+from parallel import split_tree
+from search import SearchLimitError
+from solver import Solver
+
+
+class TestParallel:
+    def test_solve(self):
+        maze = next(generate_puzzles(10, 10, count=1, seed=3, rooms=1))
+        solver = Solver(maze, workers=2)
+        board = solver.solve()
+        assert board.is_valid()
+        assert str(board) == str(Solver(maze).solve())
+
+    def test_count(self, read):
+        solver = Solver(read("ambiguous.txt"), workers=2)
+        assert solver.count() == 2
+        assert not Solver(read("ambiguous.txt"), workers=2).is_unique()
+        assert Solver(read("input_hard.txt"), workers=2).is_unique()
+
+    def test_split_tree(self):
+        maze = list(generate_puzzles(10, 10, count=6, seed=3, rooms=1))[-1]
+        solver = Solver(maze, probing=False)
+        paths = split_tree(solver, 4)
+        assert len(paths) >= 4
+
+        # Between them, the subtrees hold every solution
+        found = 0
+        for path in paths:
+            solver = Solver(maze)
+            parallel._start(solver, path)
+            found += solver.count()
+        assert found == Solver(maze).count()
+
+    def test_splits_when_idle(self, monkeypatch):
+        # One subtree to start with, so the other worker only gets work given away
+        monkeypatch.setattr(parallel, "MAX_SPLIT_DEPTH", 0)
+        monkeypatch.setattr(parallel, "SPLIT_INTERVAL", 1)
+        for maze in generate_puzzles(10, 10, count=6, seed=3, rooms=1):
+            assert Solver(maze, workers=2).count() == Solver(maze).count()
+
+    def test_node_limit(self):
+        maze = list(generate_puzzles(10, 10, count=6, seed=3, rooms=1))[-1]
+        with raises(SearchLimitError):
+            Solver(maze, workers=2, max_nodes=5, probing=False).solve()
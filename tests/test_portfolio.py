@@ -0,0 +1,60 @@
+import os
+import time
+
+from pytest import raises
+
+from board import Board
+from generator import generate_puzzles
+from portfolio import DEFAULT_PORTFOLIO, Configuration, main, race, solve_with
+from solver import Solver
+
+
+class DyingBoard(Board):
+    def load(self, maze: str) -> None:
+        os._exit(1)
+
+
+class TestPortfolio:
+    def test_every_configuration_solves(self, generated_maze):
+        expected = str(Solver(generated_maze).solve())
+        for configuration in DEFAULT_PORTFOLIO:
+            assert str(solve_with(configuration, generated_maze)) == expected, configuration.name
+
+    def test_seed_changes_search(self, generated_maze):
+        guesses = set()
+        for seed in range(4):
+            solver = Solver(generated_maze, probing=False)
+            Configuration("random", probing=False, seed=seed).apply(solver)
+            first = []
+            solver.engine.interrupt = lambda: first.append(solver.engine.choose_cell())
+            solver.solve()
+            guesses.add(first[0])
+        assert len(guesses) > 1
+
+    def test_race(self, read):
+        maze = read("input_hard.txt")
+        result = race(maze)
+        assert result.status == "solved"
+        assert str(result.board) == str(Solver(maze).solve())
+        assert result.winner in [c.name for c in DEFAULT_PORTFOLIO]
+
+        assert race(read("invalid_wall_count.txt")).status == "no_solution"
+
+    def test_race_timeout(self):
+        maze = next(generate_puzzles(16, 16, count=1, seed=1, rooms=2))
+        start = time.perf_counter()
+        result = race(maze, deadline=time.monotonic() + 0.2)
+        assert result.status == "timeout"
+        assert result.winner is None
+        assert time.perf_counter() - start < 5
+
+    def test_race_dead_process(self, read):
+        # Without a deadline, a configuration that dies without answering isn't waited on
+        with raises(RuntimeError, match="exited with code 1"):
+            race(read("input_simple.txt"), DEFAULT_PORTFOLIO[:2], board_type=DyingBoard)
+
+    def test_main(self, capsys):
+        assert main([os.path.join("testdata", "input_simple.txt"), "-c", "default", "-c", "search"]) == 0
+        captured = capsys.readouterr()
+        assert '"status": "solved"' in captured.out
+        assert "Wins: " in captured.err
@@ -0,0 +1,75 @@
+from pytest import raises
+
+from cell import CellType
+from errors import NoSolutionError
+from propagation import PropagationQueue
+from solver import Solver
+
+
+class TestPropagationQueue:
+    def test_deduplicates(self):
+        queue = PropagationQueue(1)
+        queue.push(("row", 0), 0)
+        queue.push(("row", 0), 0)
+        assert len(queue) == 1
+        assert queue.pop() == ("row", 0)
+        assert not queue
+
+        queue.push(("row", 0), 0)
+        assert queue
+
+    def test_priority(self):
+        queue = PropagationQueue(2)
+        queue.push(("row", 0), 1)
+        queue.push(("monster", 1, 1), 0)
+        queue.push(("row", 1), 1)
+        assert [queue.pop() for _ in range(3)] == [("monster", 1, 1), ("row", 0), ("row", 1)]
+
+        with raises(IndexError):
+            queue.pop()
+
+
+class TestPropagation:
+    def test_propagates_from_a_change(self, read):
+        solver = Solver(read("input_simple.txt"))
+        checkpoint = solver.board.checkpoint()
+        # The monster in the corner can only be reached from above
+        solver.board.get_cell(column=1, row=3).resolve(CellType.WALL)
+        solver._propagate(checkpoint)
+        assert solver.board.get_cell(column=0, row=2).contents == CellType.FLOOR
+
+    def test_contradiction_from_a_change(self, read):
+        solver = Solver(read("input_simple.txt"))
+        checkpoint = solver.board.checkpoint()
+        # Row 0 has no walls
+        solver.board.get_cell(column=0, row=0).resolve(CellType.WALL)
+        with raises(NoSolutionError):
+            solver._propagate(checkpoint)
+
+    def test_bugs_are_not_contradictions(self, read):
+        solver = Solver(read("input_simple.txt"))
+        solver.rule_priorities = {**solver.rule_priorities, "bogus": 0}
+        queue_cell = solver._queue_cell
+
+        def queue_bogus(queue, row, column):
+            queue_cell(queue, row, column)
+            queue.push(("bogus",), 0)
+        solver._queue_cell = queue_bogus
+        checkpoint = solver.board.checkpoint()
+        solver.board.get_cell(column=1, row=3).resolve(CellType.WALL)
+        # A rule going wrong isn't taken for a dead end
+        with raises(ValueError, match="Unknown constraint"):
+            solver._propagate(checkpoint)
+
+    def test_articulation_points(self):
+        solver = Solver("""
+        * 1 0 1
+        1 m _ _
+        0 _ _ _
+        1 _ _ m
+        """)
+        # The centre is the only way between the two monsters' corners
+        solver.board.get_cell(column=2, row=0).resolve(CellType.WALL)
+        solver.board.get_cell(column=0, row=2).resolve(CellType.WALL)
+        assert solver._resolve_articulation_points()
+        assert solver.board.get_cell(column=1, row=1).contents == CellType.FLOOR
@@ -0,0 +1,68 @@
+import time
+from math import comb
+
+from pytest import raises
+
+from board import Board
+from cdcl import CDCLSolver
+from errors import NoSolutionError
+from sat_backend import SatBackend, exactly
+from search import SearchLimitError
+from solver import Solver
+
+
+class TestSatBackend:
+    def test_exactly(self):
+        for n in range(1, 7):
+            for k in range(n + 1):
+                sat = CDCLSolver()
+                literals = [sat.new_var() for _ in range(n)]
+                exactly(sat, literals, k)
+                count = 0
+                while sat.solve():
+                    values = [sat.model[v] for v in literals]
+                    assert sum(values) == k
+                    count += 1
+                    sat.add_clause([-v if value else v for v, value in zip(literals, values)])
+                assert count == comb(n, k)
+
+    def test_solve(self, read):
+        for filename in ("input_simple.txt", "input_tutorial.txt", "input_hard.txt", "input_1_1.txt"):
+            native = Solver(read(filename)).solve()
+            sat = Solver(read(filename)).solve(backend="sat")
+            assert sat.is_valid()
+            assert [c.contents for c in sat.enumerate_cells()] == [c.contents for c in native.enumerate_cells()]
+
+    def test_connectivity_cuts(self):
+        # Two hallways that each follow the rules, but the wall counts keep them apart
+        board = Board()
+        board.load("* 1 1 1\n0 m _ m\n3 _ _ _\n0 m _ m")
+        backend = SatBackend(board)
+        assert not backend.solve()
+        assert backend.cuts > 0
+
+    def test_no_solution(self, read):
+        with raises(NoSolutionError):
+            Solver(read("invalid_wall_count.txt")).solve(backend="sat")
+
+    def test_conflict_limit(self, read):
+        board = Board()
+        board.load(read("input_hard.txt"))
+        with raises(SearchLimitError):
+            SatBackend(board, max_conflicts=1).solve()
+
+    def test_deadline(self, read):
+        solver = Solver(read("input_hard.txt"))
+        with raises(SearchLimitError) as e:
+            solver.solve(backend="sat", deadline=time.monotonic())
+        assert e.value.reason == "deadline"
+
+    def test_hidden_cells_unsupported(self, read):
+        board = Board()
+        board.load(read("incomplete.txt"))
+        with raises(ValueError):
+            SatBackend(board)
+
+    def test_unknown_backend(self, read):
+        with raises(ValueError):
+            Solver(read("input_simple.txt")).solve(backend="magic")
@@ -0,0 +1,126 @@
+import time
+from pytest import raises
+
+from board import Board
+from cell import CellType
+from errors import NoSolutionError
+import search
+from search import SearchEngine, SearchLimitError
+from solver import Solver
+
+
+class TestSearch:
+    def test_search_hard(self, read):
+        solver = Solver(read("input_hard.txt"), probing=False)
+        assert solver.solve().is_valid()
+        assert solver.engine.nodes > 0
+
+    def test_node_limit(self, read):
+        solver = Solver(read("input_hard.txt"), max_nodes=0, probing=False)
+        with raises(SearchLimitError):
+            solver.solve()
+
+    def test_depth_limit(self, read):
+        solver = Solver(read("input_hard.txt"), max_depth=0, probing=False)
+        with raises(SearchLimitError):
+            solver.solve()
+
+    def test_deadline(self, generated_maze, monkeypatch):
+        monkeypatch.setattr(search, "PROGRESS_INTERVAL", 0)
+        solver = Solver(generated_maze, probing=False)
+
+        def run_out(progress):
+            # Time is up a few guesses into the search
+            if progress.depth > 2:
+                solver.engine.deadline = 0
+
+        with raises(SearchLimitError) as e:
+            solver.solve(deadline=time.monotonic() + 60, on_progress=run_out)
+        assert e.value.reason == "deadline"
+        # Left with what was deduced before guessing, which is all still true
+        partial = e.value.board
+        assert partial is solver.board
+        assert partial.validate() is None
+        assert any(cell.resolved for cell in partial.enumerate_cells())
+
+        solution = Solver(generated_maze).solve()
+        for cell, solved in zip(partial.enumerate_cells(), solution.enumerate_cells()):
+            assert not cell.resolved or cell.contents == solved.contents
+
+    def test_progress(self, generated_maze, monkeypatch):
+        monkeypatch.setattr(search, "PROGRESS_INTERVAL", 0)
+        reports = []
+        Solver(generated_maze, probing=False).solve(on_progress=reports.append)
+        assert reports
+        assert reports[-1].nodes > 0
+        assert all(0 <= report.resolved <= report.cells == 100 for report in reports)
+        assert max(report.depth for report in reports) > 0
+
+    def test_no_limits_needed_without_search(self, read):
+        solver = Solver(read("input_simple.txt"), max_nodes=0, max_depth=0)
+        assert solver.solve()
+        assert solver.engine.nodes == 0
+
+    def test_choose_fewest_candidates(self, read):
+        board = Board()
+        board.load(read("monster_no_deadend_unknown.txt"))
+        board.get_cell(column=0, row=0).eliminate(CellType.MONSTER)
+        board.get_cell(column=0, row=0).eliminate(CellType.CHEST)
+        engine = SearchEngine(board, lambda since: None)
+        assert engine.choose_cell() == (0, 0)
+
+    def test_tries_every_value(self, read):
+        board = Board()
+        board.load(read("input_hard.txt"))
+        engine = SearchEngine(board, lambda since: None)
+        cell = board.get_cell(column=1, row=1)
+        assert engine.order_values(cell) == [CellType.WALL, CellType.FLOOR]
+
+    def test_solutions(self, read):
+        solver = Solver(read("input_hard.txt"))
+        assert len([board.is_valid() for board in solver.engine.solutions()]) == 1
+
+    def test_backjump(self):
+        board = Board()
+        board.load("* 0 0 0\n0 _ _ _")
+
+        def propagate(since):
+            # Walling in the first cell fails, but only once the last has been guessed
+            first = board.get_cell(column=0, row=0)
+            if first.contents == CellType.WALL and board.get_cell(column=2, row=0).resolved:
+                raise NoSolutionError(("first",))
+
+        def scope(constraint):
+            return [(0, 0)] if constraint == ("first",) else None
+
+        chronological = SearchEngine(board, propagate)
+        chronological.choose_cell = lambda: next((0, c) for c in range(3) if not board.get_cell(column=c, row=0).resolved)
+        assert chronological.search()
+        assert chronological.nodes == 10
+
+        board.reload()
+        engine = SearchEngine(board, propagate, scope=scope)
+        engine.choose_cell = lambda: next((0, c) for c in range(3) if not board.get_cell(column=c, row=0).resolved)
+        assert engine.search()
+        assert board.get_cell(column=0, row=0).contents == CellType.FLOOR
+        assert engine.nodes == 6
+        assert engine.backjumps == 1
+        assert frozenset({(0, 0, CellType.WALL)}) in engine.nogoods
+
+    def test_count_matches_chronological(self, read):
+        solver = Solver(read("ambiguous.txt"))
+        chronological = Solver(read("ambiguous.txt"))
+        chronological.engine.scope = lambda constraint: None
+        assert solver.count() == chronological.count() == 2
+
+    def test_transpositions(self, generated_maze):
+        first = Solver(generated_maze, probing=False)
+        assert first.count() == 1
+        assert len(first.engine.transpositions) > 0
+
+        # Searched again with the same table, the dead ends are known already
+        second = Solver(generated_maze, probing=False)
+        second.engine.transpositions = first.engine.transpositions
+        assert second.count() == 1
+        assert second.engine.nodes < first.engine.nodes
+        assert first.engine.transpositions.hits > 0
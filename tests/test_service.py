@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+from generator import generate_puzzles
+from service import SolveService
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+class TestService:
+    def test_solve(self, read):
+        async def scenario():
+            service = SolveService(workers=1)
+            try:
+                result = await service.solve(read("input_simple.txt"))
+                invalid = await service.solve(read("invalid_wall_count.txt"))
+                return result, invalid, service.metrics()
+            finally:
+                service.close()
+
+        result, invalid, metrics = run(scenario())
+        assert result["status"] == "solved"
+        assert result["solution"] == ["_ _ _ _", "_ # # m", "_ _ _ #", "m # _ m"]
+        assert invalid["status"] == "no_solution"
+        assert metrics["requests"] == 2
+        assert metrics["latency"]["count"] == 2
+        assert metrics["in_flight"] == 0
+
+    def test_coalesces(self, read):
+        maze = read("input_hard.txt")
+
+        async def scenario():
+            service = SolveService(workers=1)
+            try:
+                # The same puzzle, laid out differently
+                results = await asyncio.gather(service.solve(maze), service.solve(maze.replace(" ", "  ")),
+                                               service.solve(maze))
+                return results, service.metrics()
+            finally:
+                service.close()
+
+        results, metrics = run(scenario())
+        assert all(r["status"] == "solved" for r in results)
+        assert results[0]["solution"] == results[1]["solution"] == results[2]["solution"]
+        assert metrics["coalesced"] == 2
+
+    def test_deadline_stops_worker(self, read):
+        hard = next(generate_puzzles(16, 16, count=1, seed=1, rooms=2))
+
+        async def scenario():
+            service = SolveService(workers=1)
+            try:
+                slow = await service.solve(hard, timeout=0.2)
+                # The only worker is free again straight away
+                quick = await asyncio.wait_for(service.solve(read("input_simple.txt"), timeout=5), 5)
+                return slow, quick, service.metrics()
+            finally:
+                service.close()
+
+        slow, quick, metrics = run(scenario())
+        assert slow["status"] == "timeout"
+        assert slow["seconds"] < 2
+        assert quick["status"] == "solved"
+        assert metrics["timeouts"] == 1
+
+    def test_http(self, read):
+        maze = read("input_simple.txt").encode()
+
+        async def request(port: int, head: str, body: bytes = b"") -> tuple[int, dict]:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(f"{head}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            status_line, _, payload = response.partition(b"\r\n\r\n")
+            return int(status_line.split()[1]), json.loads(payload)
+
+        async def scenario():
+            service = SolveService(workers=1)
+            server = await service.serve(port=0)
+            port = server.sockets[0].getsockname()[1]
+            try:
+                return (await request(port, "POST /solve?timeout=5 HTTP/1.1", maze),
+                        await request(port, "POST /solve HTTP/1.1", b"not a puzzle"),
+                        await request(port, "GET /metrics HTTP/1.1"),
+                        await request(port, "GET /nowhere HTTP/1.1"))
+            finally:
+                server.close()
+                service.close()
+
+        solved, error, metrics, missing = run(scenario())
+        assert solved[0] == 200
+        assert solved[1]["status"] == "solved"
+        assert error[0] == 400
+        assert metrics[0] == 200
+        assert metrics[1]["requests"] == 2
+        assert missing[0] == 404
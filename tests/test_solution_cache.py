@@ -0,0 +1,90 @@
+import pytest
+
+from board import Board
+from errors import NoSolutionError
+from solution_cache import ORIENTATIONS, SolutionCache, canonicalize, _symbol
+from solver import Solver
+
+
+def _turn(maze: str, orientation) -> str:
+    """
+    Writes the puzzle out again turned and flipped.
+    """
+    board = Board()
+    board.load(maze)
+    rows, columns = orientation.counts(board.wall_counts_rows, board.wall_counts_columns)
+    cells = [_symbol(cell) for cell in board.enumerate_cells()]
+    turned = [cells[i] for i in orientation.source(board.width, board.height)]
+    width = len(columns)
+    lines = ["* " + " ".join(map(str, columns))]
+    for r, count in enumerate(rows):
+        lines.append(f"{count} " + " ".join(turned[r * width:(r + 1) * width]))
+    return "\n".join(lines)
+
+
+def _canonical_key(maze: str) -> str:
+    board = Board()
+    board.load(maze)
+    return canonicalize(board).key
+
+
+class TestSolutionCache:
+    def test_orientations_share_a_key(self, read):
+        maze = read("input_hard.txt")
+        keys = {_canonical_key(_turn(maze, orientation)) for orientation in ORIENTATIONS}
+        assert keys == {_canonical_key(maze)}
+        assert _canonical_key(maze) != _canonical_key(read("input_simple.txt"))
+
+    def test_hit(self, read):
+        cache = SolutionCache()
+        maze = read("input_hard.txt")
+        first = cache.solve(maze)
+        second = cache.solve(maze)
+        assert (cache.hits, cache.misses) == (1, 1)
+        assert second.is_valid()
+        assert str(second) == str(first)
+
+    def test_turned_hit(self, read):
+        cache = SolutionCache()
+        maze = read("input_hard.txt")
+        cache.solve(maze)
+        for orientation in ORIENTATIONS:
+            turned = _turn(maze, orientation)
+            board = cache.solve(turned)
+            assert board.is_valid()
+            assert str(board) == str(Solver(turned).solve())
+        assert (cache.hits, cache.misses) == (8, 1)
+
+    def test_no_solution_is_cached(self, read):
+        cache = SolutionCache()
+        maze = read("invalid_wall_count.txt")
+        for _ in range(2):
+            with pytest.raises(NoSolutionError):
+                cache.solve(maze)
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_evicts_least_recently_used(self, read):
+        cache = SolutionCache(max_entries=2)
+        hard, simple, tutorial = (read(name) for name in ("input_hard.txt", "input_simple.txt", "input_tutorial.txt"))
+        cache.solve(hard)
+        cache.solve(simple)
+        cache.solve(hard)
+        cache.solve(tutorial)
+        assert len(cache) == 2
+        cache.solve(hard)
+        assert cache.hits == 2
+        cache.solve(simple)
+        assert cache.misses == 4
+
+    def test_persists(self, read, tmp_path):
+        path = str(tmp_path / "solutions.db")
+        maze = read("input_hard.txt")
+        cache = SolutionCache(path)
+        cache.solve(maze)
+        cache.close()
+
+        cache = SolutionCache(path)
+        assert len(cache) == 1
+        assert cache.solve(maze).is_valid()
+        assert (cache.hits, cache.misses) == (1, 0)
+        cache.close()
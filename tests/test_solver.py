@@ -1,7 +1,8 @@
 import os
 from pytest import fixture
-from pytest import mark
 
+from bit_board import BitBoard
+from instrumentation import CountingObserver
 from solver import Solver
 
 
@@ -21,14 +22,58 @@ class TestSolver:
             solver = Solver(f.read())
             assert solver.solve()
 
-    @mark.skip
+    def test_solve_simple_bit_board(self):
+        with open(os.path.join("testdata", "input_simple.txt"), "r") as f:
+            solver = Solver(f.read(), board_type=BitBoard)
+            assert solver.solve()
+
+    def test_solve_tutorial_bit_board(self):
+        with open(os.path.join("testdata", "input_tutorial.txt"), "r") as f:
+            solver = Solver(f.read(), board_type=BitBoard)
+            assert solver.solve()
+
     def test_level_one(self):
         with open(os.path.join("testdata", "input_1_1.txt"), "r") as f:
             solver = Solver(f.read())
             assert solver.solve()
 
-    @mark.skip
     def test_solve_hard(self):
         with open(os.path.join("testdata", "input_hard.txt"), "r") as f:
             solver = Solver(f.read())
             assert solver.solve()
+
+    def test_count(self):
+        with open(os.path.join("testdata", "input_hard.txt"), "r") as f:
+            assert Solver(f.read()).count() == 1
+        with open(os.path.join("testdata", "ambiguous.txt"), "r") as f:
+            assert Solver(f.read()).count() == 2
+
+    def test_count_stops_at_limit(self):
+        with open(os.path.join("testdata", "ambiguous.txt"), "r") as f:
+            solver = Solver(f.read())
+            assert solver.count(limit=1) == 1
+            assert solver.board.is_valid()
+
+    def test_is_unique(self):
+        with open(os.path.join("testdata", "input_hard.txt"), "r") as f:
+            assert Solver(f.read()).is_unique()
+        with open(os.path.join("testdata", "ambiguous.txt"), "r") as f:
+            assert not Solver(f.read(), board_type=BitBoard).is_unique()
+
+    def test_probing(self, generated_maze):
+        guessing = Solver(generated_maze, probing=False)
+        guessing.solve()
+        assert guessing.engine.nodes > 0
+
+        observer = CountingObserver()
+        probing = Solver(generated_maze, observer=observer)
+        # Probing alone gets there, without a single guess
+        assert str(probing.solve()) == str(guessing.board)
+        assert probing.engine.nodes == 0
+        assert probing.probes > 0
+        assert observer.rules["failed_literals"].cells > 0
+
+    def test_probing_bit_board(self, generated_maze):
+        solver = Solver(generated_maze, board_type=BitBoard)
+        assert solver.solve().is_valid()
+        assert solver.engine.nodes == 0
@@ -0,0 +1,66 @@
+from pytest import raises
+
+from board import Board
+from cell import CellType
+from errors import NoSolutionError
+from treasure import deduce_rooms, find_rooms, room_placements
+
+
+class TestTreasure:
+    def load(self, maze: str) -> Board:
+        board = Board()
+        board.load(maze)
+        return board
+
+    def test_room_placements(self):
+        assert len(room_placements(6, 6, 0, 0)) == 1
+        assert len(room_placements(6, 6, 2, 2)) == 9
+        assert len(room_placements(6, 6, 0, 5)) == 1
+
+        placement = room_placements(6, 6, 0, 0)[0]
+        assert len(placement.interior) == 9
+        # Only the sides facing the rest of the board
+        assert sorted(placement.perimeter) == [(0, 3), (1, 3), (2, 3), (3, 0), (3, 1), (3, 2)]
+        assert room_placements(6, 6, 0, 0) is room_placements(6, 6, 0, 0)
+
+    def test_find_rooms(self, read):
+        board = self.load(read("input_1_1.txt"))
+        rooms = find_rooms(board)
+        # No room for the chest can cover the monster at row 2, column 2
+        placements = rooms[(5, 1)]
+        assert placements
+        assert all(not p.contains(2, 2) for p in placements)
+
+    def test_deduce_rooms(self, read):
+        board = self.load(read("input_tutorial.txt"))
+        deductions = deduce_rooms(board)
+        # The chest in the corner only fits one room
+        assert {(0, 3), (1, 4), (2, 5)} <= deductions.open
+
+    def test_known_exit_walls_off_the_rest(self, read):
+        board = self.load(read("input_tutorial.txt"))
+        board.get_cell(column=2, row=1).resolve(CellType.FLOOR)
+        deductions = deduce_rooms(board)
+        assert (1, 2) in deductions.open
+        assert {(0, 2), (2, 2), (3, 3), (3, 4), (3, 5)} <= deductions.walls
+
+    def test_no_room(self, read):
+        board = self.load(read("input_tutorial.txt"))
+        board.get_cell(column=4, row=1).resolve(CellType.WALL)
+        with raises(NoSolutionError):
+            find_rooms(board)
+
+    def test_wide_hallway(self):
+        board = self.load("""
+        * 0 0 1
+        0 _ _ _
+        0 _ _ _
+        1 _ _ _
+        """)
+        for r, c in ((0, 0), (0, 1), (1, 0)):
+            board.get_cell(column=c, row=r).resolve(CellType.FLOOR)
+        assert (1, 1) in deduce_rooms(board).walls
+
+        board.get_cell(column=1, row=1).resolve(CellType.FLOOR)
+        with raises(NoSolutionError):
+            deduce_rooms(board)
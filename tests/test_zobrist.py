@@ -0,0 +1,65 @@
+import random
+
+from bit_board import BitBoard
+from board import Board
+from cell import CellType
+from zobrist import TranspositionTable
+
+
+class TestZobrist:
+    def check_incremental(self, read, board: Board):
+        board.load(read("input_hard.txt"))
+        start = board.trail.zobrist
+        assert start == board.zobrist_hash()
+
+        rng = random.Random(1)
+        cells = list(board.enumerate_cells())
+        checkpoints = []
+        for _ in range(20):
+            checkpoints.append((board.checkpoint(), board.trail.zobrist))
+            cell = rng.choice([cell for cell in cells if not cell.resolved])
+            if rng.random() < 0.5:
+                cell.resolve(rng.choice(sorted(cell.candidates, key=lambda t: t.value)))
+            else:
+                cell.eliminate(CellType.WALL)
+            assert board.trail.zobrist == board.zobrist_hash()
+
+        for checkpoint, state in reversed(checkpoints):
+            board.rollback(checkpoint)
+            assert board.trail.zobrist == state == board.zobrist_hash()
+        assert board.trail.zobrist == start
+
+    def test_incremental(self, read):
+        self.check_incremental(read, Board())
+
+    def test_incremental_bit_board(self, read):
+        self.check_incremental(read, BitBoard())
+
+    def test_same_state_same_hash(self, read):
+        first = Board()
+        first.load(read("input_hard.txt"))
+        second = BitBoard()
+        second.load(read("input_hard.txt"))
+        assert first.trail.zobrist == second.trail.zobrist
+
+        # The same cells resolved in a different order
+        first.get_cell(column=1, row=1).resolve(CellType.WALL)
+        first.get_cell(column=2, row=1).resolve(CellType.FLOOR)
+        second.get_cell(column=2, row=1).resolve(CellType.FLOOR)
+        second.get_cell(column=1, row=1).resolve(CellType.WALL)
+        assert first.trail.zobrist == second.trail.zobrist
+
+        first.get_cell(column=3, row=1).resolve(CellType.WALL)
+        assert first.trail.zobrist != second.trail.zobrist
+
+    def test_eviction(self):
+        table = TranspositionTable(capacity=2)
+        table.add(1)
+        table.add(2)
+        table.used(1)
+        table.add(3)
+        assert 1 in table
+        assert 2 not in table
+        assert 3 in table
+        assert len(table) == 2
+        assert table.hits == 1